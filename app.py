@@ -1,24 +1,178 @@
 import argparse
 import os
+import signal
 import sys
+import threading
 
 from stockstalker.common.logging import log
 from stockstalker.parsers.parser_helpers import parser_factory
+from stockstalker.services.coordinator_svc import Coordinator
+from stockstalker.services.fetch_engine import FetchEngine
+from stockstalker.services.notification_dispatcher import NotificationDispatcher
+from stockstalker.services.notification_history_helpers import notification_history_factory, HISTORY_BACKEND_MAP
+from stockstalker.services.metrics_server import MetricsServer
+from stockstalker.services.notification_svc import NotificationSvc
+from stockstalker.services.observation_log import ObservationLog
+from stockstalker.services.parse_pool import ParsePool
+from stockstalker.services.poll_policy import AdaptivePollPolicy
+from stockstalker.services.rate_limiter import HostRateLimiter
+from stockstalker.services.scheduler_svc import StockScheduler
+from stockstalker.services.stock_state_store import StockStateStore
+from stockstalker.services.traffic_meter import TrafficMeter
+from stockstalker.services.worker_svc import run_worker
 from stockstalker.util.helpers import load_configs_from_dir
 
+
+def handle_sigterm(signum, frame):
+    # Unwind like Ctrl+C so buffered state, observations and notifications are written before exiting
+    log.info('Received signal %s.  Shutting down', signum)
+    sys.exit(0)
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="A tool to check stock of products")
     parser.add_argument('--config-dir', default=os.path.join(os.getcwd(), 'configs'), dest='config_dir')
+    parser.add_argument('--max-workers', default=16, type=int, dest='max_workers',
+                        help='Max pages checked at once across all retailers')
+    parser.add_argument('--max-per-retailer', default=4, type=int, dest='max_per_retailer',
+                        help='Max pages checked at once for a single retailer')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Keep running and check each URL on its poll interval instead of a single sweep')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='In daemon mode poll URLs faster after their results change and slower when quiet')
+    parser.add_argument('--min-interval', default=15, type=float, dest='min_interval',
+                        help='Fastest poll interval in seconds for adaptive polling')
+    parser.add_argument('--max-interval', default=3600, type=float, dest='max_interval',
+                        help='Slowest poll interval in seconds for adaptive polling')
+    parser.add_argument('--host-rate', default=2, type=float, dest='host_rate',
+                        help='Max requests per second to a single host.  Lowered automatically on 429 and 503')
+    parser.add_argument('--host-burst', default=4, type=int, dest='host_burst',
+                        help='Requests allowed to a single host at once before pacing kicks in')
+    parser.add_argument('--history-backend', default='file', choices=list(HISTORY_BACKEND_MAP), dest='history_backend',
+                        help='Where to keep the history of sent notifications')
+    parser.add_argument('--history-path', default=None, dest='history_path',
+                        help='History file or database.  Defaults to history.log or history.db')
+    parser.add_argument('--history-ttl', default=None, type=float, dest='history_ttl',
+                        help='Seconds before the same item can be notified about again.  sqlite backend only')
+    parser.add_argument('--history-flush-interval', default=5, type=float, dest='history_flush_interval',
+                        help='In daemon and coordinator modes write new history at most this many seconds later, '
+                             'so it is written in groups.  sqlite backend only')
+    parser.add_argument('--notify-batch-window', default=2, type=float, dest='notify_batch_window',
+                        help='Seconds to wait for more in stock hits to combine into a single notification')
+    parser.add_argument('--notify-workers', default=1, type=int, dest='notify_workers',
+                        help='Notifications sent at once per notification agent')
+    parser.add_argument('--parse-processes', default=0, type=int, dest='parse_processes',
+                        help='Parse pages in this many worker processes.  Parsed in the fetch threads if 0')
+    parser.add_argument('--coordinator', default=None, metavar='HOST:PORT',
+                        help='Hand out URLs to workers on this address instead of checking them here')
+    parser.add_argument('--worker', default=None, metavar='HOST:PORT',
+                        help='Check URLs leased from the coordinator on this address.  No configs needed')
+    parser.add_argument('--lease-time', default=120, type=float, dest='lease_time',
+                        help='Seconds a worker has to report a leased URL before it is leased to another worker')
+    parser.add_argument('--notify-on-change', action='store_true', dest='notify_on_change',
+                        help='Only notify when an item comes back in stock or drops in price.  States are kept per '
+                             'product URL, so a search result that drops off the page when it sells out is never '
+                             'reported as sold out')
+    parser.add_argument('--price-drop', default=0.05, type=float, dest='price_drop',
+                        help='Fraction an in stock item\'s price has to fall by to notify again')
+    parser.add_argument('--state-file', default=None, dest='state_file',
+                        help='File to keep stock states in between runs')
+    parser.add_argument('--observation-log', default=None, dest='observation_log',
+                        help='Append every stock and price observation to this columnar log')
+    parser.add_argument('--metrics-port', default=None, type=int, dest='metrics_port',
+                        help='In daemon mode serve Prometheus metrics on this port at /metrics')
     args = parser.parse_args()
 
+    if args.worker:
+        worker_host, worker_port = args.worker.rsplit(':', 1)
+        run_worker(worker_host, int(worker_port), max_leases=args.max_per_retailer)
+        sys.exit(0)
+
     configs = load_configs_from_dir(args.config_dir)
     if not configs:
         log.error('No configs loaded')
         sys.exit(1)
 
+    rate_limiter = HostRateLimiter(rate=args.host_rate, burst=args.host_burst)
+    # A single sweep batches its own history.  Long running modes hold it for a few seconds instead
+    notification_history = notification_history_factory(
+        args.history_backend,
+        args.history_path,
+        args.history_ttl,
+        flush_interval=args.history_flush_interval if args.daemon or args.coordinator else 0
+    )
+    dispatcher = NotificationDispatcher(workers_per_agent=args.notify_workers, batch_window=args.notify_batch_window)
+    notification_svc = NotificationSvc(notification_history, dispatcher=dispatcher)
+    parse_pool = ParsePool(args.parse_processes) if args.parse_processes > 0 else None
+    state_store = None
+    if args.notify_on_change:
+        state_store = StockStateStore(price_drop_threshold=args.price_drop, path=args.state_file)
+    observation_log = ObservationLog(args.observation_log) if args.observation_log else None
+    traffic_meter = TrafficMeter()
     parsers = []
     for config in configs:
-        parsers.append(parser_factory(config))
+        parsers.append(parser_factory(
+            config,
+            notification_svc=notification_svc,
+            rate_limiter=rate_limiter,
+            parse_pool=parse_pool,
+            state_store=state_store,
+            observation_log=observation_log,
+            traffic_meter=traffic_meter
+        ))
 
-    parsers[0].check_stock()
-    print('')
\ No newline at end of file
+    engine = FetchEngine(max_workers=args.max_workers, max_per_retailer=args.max_per_retailer)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    try:
+        if args.coordinator:
+            coordinator_host, coordinator_port = args.coordinator.rsplit(':', 1)
+            coordinator = Coordinator(
+                configs,
+                parsers,
+                host=coordinator_host,
+                port=int(coordinator_port),
+                lease_time=args.lease_time,
+                repeat=args.daemon,
+                host_rate=args.host_rate,
+                host_burst=args.host_burst
+            )
+            coordinator.start()
+            try:
+                if args.daemon:
+                    # URLs are leased again on their poll interval until stopped
+                    threading.Event().wait()
+                coordinator.wait()
+            except (KeyboardInterrupt, SystemExit):
+                log.info('Stopping coordinator')
+            coordinator.shutdown()
+        elif args.daemon:
+            metrics_server = None
+            if args.metrics_port:
+                metrics_server = MetricsServer(port=args.metrics_port)
+                metrics_server.start()
+            poll_policy = None
+            if args.adaptive:
+                poll_policy = AdaptivePollPolicy(min_interval=args.min_interval, max_interval=args.max_interval)
+            scheduler = StockScheduler(engine, poll_policy=poll_policy)
+            for p in parsers:
+                scheduler.add_parser(p)
+            try:
+                scheduler.start()
+            except (KeyboardInterrupt, SystemExit):
+                log.info('Stopping scheduler')
+            if metrics_server:
+                metrics_server.shutdown()
+        else:
+            engine.check_stock(parsers)
+    finally:
+        if parse_pool:
+            parse_pool.shutdown()
+        if state_store:
+            state_store.save()
+        if observation_log:
+            observation_log.flush()
+        traffic_meter.log_summary()
+        # Deliver anything still queued before exiting
+        dispatcher.shutdown()
+        notification_history.flush()
+        print('')
\ No newline at end of file
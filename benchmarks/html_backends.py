@@ -0,0 +1,67 @@
+"""
+Time parse plus extract for each installed HTML backend over the pages in tests/example_pages.  The embedded JSON
+fast path is turned off so product pages go through the tree builder being compared.
+
+    python -m benchmarks.html_backends --rounds 3
+"""
+import argparse
+import os
+import time
+from unittest.mock import MagicMock
+
+from bs4.builder import builder_registry
+
+from stockstalker.common.logging import log
+from stockstalker.parsers.best_buy_parser import BestBuyParser
+from stockstalker.parsers.newegg_parser import NeweggParser
+from stockstalker.parsers.walmart_parser import WalmartParser
+from stockstalker.util.constants import HTML_BACKENDS
+
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'example_pages')
+
+SEARCH_PAGES = [
+    (NeweggParser, 'newegg_search_page.html'),
+    (BestBuyParser, 'bestbuy_search_page.html'),
+    (WalmartParser, 'walmart_search_page.html'),
+]
+
+PRODUCT_PAGES = [
+    (NeweggParser, 'newegg_product_instock.html'),
+    (BestBuyParser, 'bestbuy_product_instock.html'),
+    (WalmartParser, 'walmart_product_instock.html'),
+]
+
+
+def time_page(parse, page_source, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        parse(page_source)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--rounds', type=int, default=3)
+    args = arg_parser.parse_args()
+    log.setLevel('CRITICAL')
+
+    backends = [b for b in HTML_BACKENDS if builder_registry.lookup(b)]
+    print(f'{"page":<36}' + ''.join(f'{b:>14}' for b in backends))
+    for pages, page_type in ((SEARCH_PAGES, 'search'), (PRODUCT_PAGES, 'product')):
+        for parser_class, page_name in pages:
+            with open(os.path.join(EXAMPLE_PAGE_DIR, page_name), 'r') as f:
+                page_source = f.read()
+            timings = []
+            for backend in backends:
+                parser = parser_class(MagicMock(), 'benchmark', html_backend=backend)
+                parser.product_page_json = False
+                parse = parser.parse_search_page_source if page_type == 'search' else parser.parse_product_page_source
+                timings.append(time_page(parse, page_source, args.rounds))
+            print(f'{page_name:<36}' + ''.join(f'{t * 1000:>12.1f}ms' for t in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Time notification history and ignore list lookups against a large history, comparing the old list scans with the
+set indexes.
+
+    python -m benchmarks.notification_history --entries 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+from stockstalker.common.logging import log
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.services.notification_history_file import NotificationHistoryFile
+
+
+def time_lookups(lookup, identifiers, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for identifier in identifiers:
+            lookup(identifier)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--entries', type=int, default=100000)
+    arg_parser.add_argument('--lookups', type=int, default=1000)
+    arg_parser.add_argument('--rounds', type=int, default=3)
+    args = arg_parser.parse_args()
+    log.setLevel('CRITICAL')
+
+    urls = [f'https://www.example.com/product/{i}' for i in range(args.entries)]
+    # Half hits spread across the history, half misses
+    step = max(args.entries // args.lookups, 1)
+    identifiers = urls[::step * 2][:args.lookups // 2]
+    identifiers += [f'https://www.example.com/missing/{i}' for i in range(args.lookups // 2)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        history_file = os.path.join(temp_dir, 'history.log')
+        with open(history_file, 'w') as f:
+            f.writelines(url + '\n' for url in urls)
+        start = time.perf_counter()
+        history = NotificationHistoryFile(history_file)
+        load_time = time.perf_counter() - start
+
+    history_list = list(history.sent_notifications)
+    parser = ParserBase(MagicMock(), 'benchmark', ignore_urls=urls)
+    ignore_list = list(urls)
+    products = [ProductInfo(title='Widget', url=identifier) for identifier in identifiers]
+
+    print(f'Loaded {args.entries} history entries in {load_time * 1000:.1f}ms')
+    print(f'{"lookup":<24}{"list":>14}{"set":>14}')
+    for name, list_lookup, set_lookup, values in (
+        ('has_been_notified', history_list.__contains__, history.has_been_notified, identifiers),
+        ('is_ignored', lambda p: p.url in ignore_list, parser.is_ignored, products),
+    ):
+        list_time = time_lookups(list_lookup, values, args.rounds)
+        set_time = time_lookups(set_lookup, values, args.rounds)
+        print(f'{name:<24}{list_time * 1000:>12.1f}ms{set_time * 1000:>12.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
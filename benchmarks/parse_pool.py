@@ -0,0 +1,76 @@
+"""
+Parse a large watch list of product pages with the single loop used by check_product_pages, then through the fetch
+engine with parsing in a process pool.  Pages come from tests/example_pages so nothing touches the network and the
+timings are parse cost only.  The speed up is bounded by the number of cores.
+
+    python -m benchmarks.parse_pool --pages 2000 --processes 8
+"""
+import argparse
+import os
+import time
+from typing import Text, Optional
+from unittest.mock import MagicMock
+
+from stockstalker.common.logging import log
+from stockstalker.parsers.best_buy_parser import BestBuyParser
+from stockstalker.parsers.newegg_parser import NeweggParser
+from stockstalker.parsers.walmart_parser import WalmartParser
+from stockstalker.services.fetch_engine import FetchEngine
+from stockstalker.services.parse_pool import ParsePool
+
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'example_pages')
+
+PRODUCT_PAGES = [
+    (NeweggParser, 'newegg_product_instock.html'),
+    (BestBuyParser, 'bestbuy_product_instock.html'),
+    (WalmartParser, 'walmart_product_instock.html'),
+]
+
+
+def build_parsers(pages: int, parse_pool: ParsePool = None):
+    parsers = []
+    for parser_class, page_name in PRODUCT_PAGES:
+        with open(os.path.join(EXAMPLE_PAGE_DIR, page_name), 'r') as f:
+            page_source = f.read()
+        host = parser_class.__name__.lower()
+        urls = [f'https://{host}.example.com/p/{i}' for i in range(pages // len(PRODUCT_PAGES))]
+        parser = parser_class(MagicMock(), parser_class.__name__, product_pages=urls, parse_pool=parse_pool)
+        parser._load_page = _fake_load_page(page_source)
+        parsers.append(parser)
+    return parsers
+
+
+def _fake_load_page(page_source: Text):
+    def load_page(url: Text, *args, **kwargs) -> Optional[Text]:
+        # Vary the body so the page cache digest never skips a parse
+        return page_source + f'<!-- {url} -->'
+    return load_page
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--pages', type=int, default=2000)
+    arg_parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = arg_parser.parse_args()
+    log.setLevel('CRITICAL')
+
+    start = time.perf_counter()
+    for parser in build_parsers(args.pages):
+        parser.check_product_pages()
+    serial = time.perf_counter() - start
+    print(f'single loop            {serial:.2f}s')
+
+    parse_pool = ParsePool(args.processes)
+    # Start the workers before timing so process start up isn't counted
+    parse_pool.executor.submit(int).result()
+    parsers = build_parsers(args.pages, parse_pool=parse_pool)
+    engine = FetchEngine(max_workers=args.processes * 2, max_per_retailer=args.processes * 2)
+    start = time.perf_counter()
+    engine.sweep(parsers)
+    pooled = time.perf_counter() - start
+    parse_pool.shutdown()
+    print(f'{args.processes} parse processes    {pooled:.2f}s  ({serial / pooled:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
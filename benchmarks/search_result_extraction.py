@@ -0,0 +1,73 @@
+"""
+Compare extracting search result fields with one lookup per field against the parser's single pass extraction spec,
+over the results of tests/example_pages/newegg_search_page.html.
+
+    python -m benchmarks.search_result_extraction --rounds 20
+"""
+import argparse
+import os
+import time
+from unittest.mock import MagicMock
+
+from bs4 import Tag
+
+from stockstalker.common.logging import log
+from stockstalker.parsers.newegg_parser import NeweggParser
+
+EXAMPLE_PAGE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'example_pages', 'newegg_search_page.html'
+)
+
+
+def per_field_lookups(item: Tag):
+    """
+    The field by field find() walks the Newegg parser used before the extraction spec
+    """
+    fields = {'title': None, 'url': None, 'in_stock': False, 'price': None}
+    info_box = item.find('div', {'class': 'item-info'})
+    if info_box and info_box.find('a', {'class': 'item-title'}):
+        fields['title'] = info_box.find('a', {'class': 'item-title'}).text
+    info_box = item.find('div', {'class': 'item-info'})
+    if info_box and info_box.find('a', {'class': 'item-title'}):
+        fields['url'] = info_box.find('a', {'class': 'item-title'})['href']
+    btn_box = item.find('div', {'class': 'item-button-area'})
+    btn = btn_box.find('button') if btn_box else None
+    if btn:
+        fields['in_stock'] = btn.text.lower().strip() == 'add to cart'
+    price_box = item.find('li', {'class': 'price-current'})
+    price_strong = price_box.find('strong') if price_box else None
+    if price_strong:
+        fields['price'] = price_strong.text
+    return fields
+
+
+def run(label, extract, results, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for item in results:
+            extract(item)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{label:<20} {len(results)} results  {best * 1000:.2f}ms')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--rounds', type=int, default=20)
+    args = arg_parser.parse_args()
+    log.setLevel('CRITICAL')
+
+    parser = NeweggParser(MagicMock(), 'benchmark')
+    with open(EXAMPLE_PAGE, 'r') as f:
+        page = parser._build_page(f.read(), parse_only=parser.search_page_region)
+    results = parser._get_search_results(page)
+
+    spec = parser.search_result_spec
+    assert all(per_field_lookups(item) == spec.extract(item) for item in results)
+    run('per field lookups', per_field_lookups, results, args.rounds)
+    run('single pass spec', spec.extract, results, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Compare loading pages with a new connection per request against a parser's pooled session.
+
+Runs against a local HTTP/1.1 stand-in server that counts the TCP connections it accepts.
+
+    python -m benchmarks.session_reuse --requests 200
+"""
+import argparse
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import MagicMock
+
+import requests
+
+from stockstalker.common.logging import log
+from stockstalker.parsers.newegg_parser import NeweggParser
+
+PAGE = b'<html><body>' + b'x' * 50000 + b'</body></html>'
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self.lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label, server, load, urls):
+    server.connections = 0
+    start = time.perf_counter()
+    for url in urls:
+        load(url)
+    elapsed = time.perf_counter() - start
+    print(f'{label:<20} {len(urls)} requests  {server.connections:>4} connections  {elapsed:.3f}s')
+
+
+def main():
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument('--requests', type=int, default=200)
+    args = arg_parser.parse_args()
+    log.setLevel('WARNING')
+
+    server = CountingServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f'http://127.0.0.1:{server.server_port}/p/{i}' for i in range(args.requests)]
+
+    parser = NeweggParser(MagicMock(), 'newegg')
+    user_agent = parser._get_user_agent()
+    run('requests.get', server, lambda url: requests.get(url, headers={'User-Agent': user_agent}), urls)
+    run('pooled session', server, parser._load_page, urls)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -13,3 +13,14 @@ class InvalidNotificationAgentConfig(StockStalkerException):
     def __init__(self, message):
         super(InvalidNotificationAgentConfig, self).__init__(message)
 
+
+class PageNotModified(StockStalkerException):
+    def __init__(self, message):
+        super(PageNotModified, self).__init__(message)
+
+
+class NotificationDeliveryFailed(StockStalkerException):
+    def __init__(self, message, delivered: int = 0):
+        super(NotificationDeliveryFailed, self).__init__(message)
+        # Messages at the start of a batch that were delivered before the failure
+        self.delivered = delivered
@@ -0,0 +1,211 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Text, Tuple, Dict, List, NoReturn, Iterator
+
+# Upper bounds in seconds.  Anything slower lands in +Inf
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Metric name, label values and value of a histogram observation made while collecting
+Observation = Tuple[Text, Tuple[Text, ...], float]
+
+_collecting = threading.local()
+
+
+class Metric:
+    """
+    Metric with a fixed set of label names, one value per combination of label values
+    """
+    type_name = ''
+
+    def __init__(self, name: Text, documentation: Text, label_names: Tuple[Text, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._lock = threading.Lock()
+
+    def render(self) -> List[Text]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        with self._lock:
+            lines += self._render_samples()
+        return lines
+
+    def _render_samples(self) -> List[Text]:
+        raise NotImplementedError()
+
+    def _format_labels(self, label_values: Tuple[Text, ...], extra: Dict[Text, Text] = None) -> Text:
+        labels = dict(zip(self.label_names, label_values))
+        labels.update(extra or {})
+        if not labels:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + '}'
+
+    def _check_labels(self, label_values: Tuple[Text, ...]) -> NoReturn:
+        if len(label_values) != len(self.label_names):
+            raise ValueError(f'{self.name} takes labels {", ".join(self.label_names)}')
+
+
+class Counter(Metric):
+    type_name = 'counter'
+
+    def __init__(self, name: Text, documentation: Text, label_names: Tuple[Text, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self.values: Dict[Tuple[Text, ...], float] = {}
+
+    def inc(self, *label_values: Text, amount: float = 1) -> NoReturn:
+        self._check_labels(label_values)
+        with self._lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def get(self, *label_values: Text) -> float:
+        return self.values.get(label_values, 0)
+
+    def _render_samples(self) -> List[Text]:
+        return [f'{self.name}{self._format_labels(labels)} {value}' for labels, value in self.values.items()]
+
+
+class Histogram(Metric):
+    type_name = 'histogram'
+
+    def __init__(
+            self,
+            name: Text,
+            documentation: Text,
+            label_names: Tuple[Text, ...] = (),
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label values: a count for each bucket plus +Inf, the sum and the total count
+        self.values: Dict[Tuple[Text, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, *label_values: Text, value: float) -> NoReturn:
+        self._check_labels(label_values)
+        observations = getattr(_collecting, 'observations', None)
+        if observations is not None:
+            observations.append((self.name, label_values, value))
+            return
+        with self._lock:
+            if label_values not in self.values:
+                self.values[label_values] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            bucket_counts, totals = self.values[label_values]
+            bucket_counts[bisect_left(self.buckets, value)] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    @contextmanager
+    def time(self, *label_values: Text):
+        """
+        Observe how long the block takes in seconds
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(*label_values, value=time.perf_counter() - start)
+
+    def get_count(self, *label_values: Text) -> int:
+        return self.values[label_values][1][1] if label_values in self.values else 0
+
+    def get_sum(self, *label_values: Text) -> float:
+        return self.values[label_values][1][0] if label_values in self.values else 0
+
+    def _render_samples(self) -> List[Text]:
+        lines = []
+        for labels, (bucket_counts, (total, count)) in self.values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), bucket_counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{self._format_labels(labels, {"le": le})} {cumulative}')
+            lines.append(f'{self.name}_sum{self._format_labels(labels)} {total}')
+            lines.append(f'{self.name}_count{self._format_labels(labels)} {count}')
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.metrics: Dict[Text, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: Text, documentation: Text, label_names: Tuple[Text, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, label_names))
+
+    def histogram(
+            self,
+            name: Text,
+            documentation: Text,
+            label_names: Tuple[Text, ...] = (),
+            buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, label_names, buckets=buckets))
+
+    def render(self) -> Text:
+        """
+        Every metric in the Prometheus text exposition format
+        :rtype: Text
+        """
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+@contextmanager
+def collect() -> Iterator[List[Observation]]:
+    """
+    Hold back histogram observations made by this thread in the block and collect them in the yielded list instead.
+    Used in parse worker processes, whose own metrics are never served, to send timings back to the parent
+    """
+    _collecting.observations = []
+    try:
+        yield _collecting.observations
+    finally:
+        _collecting.observations = None
+
+
+def replay(observations: List[Observation]) -> NoReturn:
+    """
+    Record observations collected in another process
+    """
+    for name, label_values, value in observations:
+        registry.metrics[name].observe(*label_values, value=value)
+
+
+def _escape(value: Text) -> Text:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+registry = MetricsRegistry()
+
+fetch_seconds = registry.histogram(
+    'stockstalker_fetch_seconds', 'Time to load a page once the rate limiter lets it through', ('host',)
+)
+fetch_errors = registry.counter(
+    'stockstalker_fetch_errors_total', 'Pages that could not be loaded, by reason', ('host', 'reason')
+)
+build_page_seconds = registry.histogram(
+    'stockstalker_build_page_seconds', 'Time to build the BeautifulSoup document of a page', ('parser',)
+)
+parse_seconds = registry.histogram(
+    'stockstalker_parse_seconds', 'Time to parse a page source into results', ('parser', 'page_type')
+)
+extract_seconds = registry.histogram(
+    'stockstalker_extract_seconds', 'Time spent in a single extractor', ('parser', 'extractor')
+)
+page_results = registry.histogram(
+    'stockstalker_page_results', 'Results found on a single page', ('parser', 'page_type'),
+    buckets=(0, 1, 5, 10, 25, 50, 100)
+)
+notification_seconds = registry.histogram(
+    'stockstalker_notification_seconds', 'Time to dedupe and send or queue a notification'
+)
+notifications = registry.counter(
+    'stockstalker_notifications_total', 'Notifications by outcome.  queued, sent, failed or duplicate', ('result',)
+)
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class CachedPage:
+    etag: str = None
+    last_modified: str = None
+    digest: str = None
+    result: Any = None
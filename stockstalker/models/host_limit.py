@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class HostLimit:
+    rate: float
+    tokens: float
+    last_refill: float
+    blocked_until: float = 0
+    failures: int = 0
+    open_until: float = 0
+    # Set once the circuit has opened.  Cleared by the first successful response after the cool down
+    half_open: bool = False
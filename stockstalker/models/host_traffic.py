@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class HostTraffic:
+    requests: int = 0
+    # Bytes received over the network, before content decoding
+    wire_bytes: int = 0
+    decoded_bytes: int = 0
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.decoded_bytes / self.wire_bytes if self.wire_bytes else 1.0
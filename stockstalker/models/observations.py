@@ -0,0 +1,35 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import List, Text, Optional, Tuple
+
+
+@dataclass
+class Observations:
+    """
+    Columns read back from an observation log.  Row i of every column is one observation.  URLs and SKUs are stored
+    as indexes into strings
+    """
+    timestamps: array = field(default_factory=lambda: array('d'))
+    url_ids: array = field(default_factory=lambda: array('I'))
+    sku_ids: array = field(default_factory=lambda: array('I'))
+    in_stock: array = field(default_factory=lambda: array('B'))
+    # NaN when no price could be parsed
+    prices: array = field(default_factory=lambda: array('d'))
+    strings: List[Text] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def get_url_history(self, url: Text) -> List[Tuple[float, bool, Optional[float]]]:
+        """
+        Every observation of a URL in the order it was recorded
+        :return: Timestamp, in stock and price of each observation
+        """
+        try:
+            url_id = self.strings.index(url)
+        except ValueError:
+            return []
+        return [
+            (self.timestamps[i], bool(self.in_stock[i]), None if self.prices[i] != self.prices[i] else self.prices[i])
+            for i in range(len(self)) if self.url_ids[i] == url_id
+        ]
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Text, Tuple, Type
+
+
+@dataclass(frozen=True)
+class ParseSpec:
+    """
+    Everything a worker process needs to rebuild a parser for parsing.  Must stay picklable
+    """
+    parser_class: Type
+    name: Text
+    html_backend: Text
+    ignore_urls: Tuple[Text, ...] = ()
+    ignore_title_keywords: Tuple[Text, ...] = ()
@@ -1,11 +1,16 @@
 from dataclasses import dataclass
-from typing import Text, List
+from typing import Text, List, Union
 
 
 @dataclass
 class ParserConfig:
     name: str
-    links: dict[Text, List[Text]]
+    links: dict[Text, List[Union[Text, dict]]]
     ignore_title_keywords: List[Text]
     ignore_urls: List[Text]
-    notification_agents: List[dict[Text, Text]]
\ No newline at end of file
+    notification_agents: List[dict[Text, Text]]
+    pool_size: int = 10
+    http2: bool = False
+    html_backend: str = 'html.parser'
+    search_page_interval: int = 600
+    product_page_interval: int = 60
\ No newline at end of file
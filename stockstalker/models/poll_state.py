@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class PollState:
+    signature: Any
+    interval: float
+    last_change: float
+    # Only set once the results actually changed.  The first check of a URL isn't a change
+    changed: bool = False
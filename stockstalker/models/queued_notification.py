@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Text, Callable, List
+
+
+@dataclass
+class QueuedNotification:
+    message: Text
+    identifier: Text
+    # Called with the identifiers delivered together and whether the agent delivered them
+    on_done: Callable[[List[Text], bool], None]
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Text, Optional
+
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.models.stock_state import StockState
+
+
+@dataclass
+class StockChange:
+    product: ProductInfo
+    # RESTOCK, PRICE_DROP or SOLD_OUT
+    kind: Text
+    previous: Optional[StockState] = None
@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+from typing import Optional, List
+
+
+@dataclass
+class StockState:
+    in_stock: bool
+    price: Optional[float]
+    updated: float
+    # Price when the last alert for the item went out.  Price drops are measured from it
+    notified_price: Optional[float] = None
+    # Prices of the drops alerted since the item came back in stock.  Their history is cleared when it sells out
+    dropped_prices: List[float] = field(default_factory=list)
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Text, Optional
+
+
+@dataclass
+class UrlTask:
+    task_id: int
+    parser_index: int
+    url: Text
+    page_type: Text
+    next_run: float = 0
+    # Worker holding the lease and when the lease runs out
+    worker: Optional[Text] = None
+    lease_expires: float = 0
+    lease_id: int = 0
+    runs: int = 0
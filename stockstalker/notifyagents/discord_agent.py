@@ -1,15 +1,122 @@
-from typing import Text
+import threading
+import time
+from typing import Text, List, Optional, Hashable
 
-import requests
+from requests import Response
+from requests.exceptions import ConnectionError, Timeout
 
+from stockstalker.common.exceptions import NotificationDeliveryFailed
+from stockstalker.common.logging import log
 from stockstalker.notifyagents.notification_agent import NotificationAgent
+from stockstalker.util.http_helpers import build_session
+
+# Discord rejects messages longer than this
+MAX_MESSAGE_LENGTH = 2000
 
 
 class DiscordAgent(NotificationAgent):
+    """
+    Sends messages to a Discord webhook over a pooled session.  The webhook's rate limit bucket is tracked from the
+    X-RateLimit headers of each response and sends wait for the bucket to reset instead of running into a 429
+    """
 
-    def __init__(self, webhook_url: Text, name: Text):
+    def __init__(self, webhook_url: Text, name: Text, timeout: float = 10, max_retries: int = 3):
         super().__init__(name)
         self.webhook_url = webhook_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = build_session(pool_size=2)
+        # Requests left in the current bucket and when it resets, on the monotonic clock.  Unknown until first send
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def key(self) -> Hashable:
+        return DiscordAgent, self.webhook_url
 
     def send(self, message: Text):
-        requests.post(self.webhook_url, data={'content': message})
\ No newline at end of file
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_bucket()
+            try:
+                r = self.session.post(self.webhook_url, data={'content': message}, timeout=self.timeout)
+            except (ConnectionError, Timeout) as e:
+                raise NotificationDeliveryFailed(f'Failed to reach Discord webhook: {e}')
+            self._update_bucket(r)
+            if r.status_code == 429:
+                log.warning('Discord rate limited %s.  Retrying in %.2fs', self.name, self._get_retry_after(r))
+                continue
+            if not r.ok:
+                raise NotificationDeliveryFailed(f'Discord webhook returned {r.status_code}: {r.text[:200]}')
+            return
+        raise NotificationDeliveryFailed(f'Discord webhook still rate limited after {self.max_retries} retries')
+
+    def send_batch(self, messages: List[Text]):
+        delivered = 0
+        for group in self._combine_messages(messages):
+            try:
+                self.send('\n\n'.join(group))
+            except Exception as e:
+                raise NotificationDeliveryFailed(str(e), delivered=delivered) from e
+            delivered += len(group)
+
+    def _wait_for_bucket(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self.blocked_until - now
+                if wait <= 0 and self.remaining is not None and self.remaining < 1 and self.reset_at > now:
+                    wait = self.reset_at - now
+                if wait <= 0:
+                    if self.remaining is not None:
+                        # Count the send now so other threads don't spend the same slot
+                        self.remaining -= 1
+                    return
+            log.debug('Waiting %.2fs for Discord rate limit to reset', wait)
+            time.sleep(wait)
+
+    def _update_bucket(self, r: Response):
+        now = time.monotonic()
+        with self._lock:
+            remaining = r.headers.get('X-RateLimit-Remaining')
+            reset_after = r.headers.get('X-RateLimit-Reset-After')
+            try:
+                if remaining is not None:
+                    self.remaining = int(remaining)
+                if reset_after is not None:
+                    self.reset_at = now + float(reset_after)
+            except ValueError:
+                log.debug('Invalid rate limit headers from Discord: %s / %s', remaining, reset_after)
+            if r.status_code == 429:
+                self.blocked_until = max(self.blocked_until, now + self._get_retry_after(r))
+
+    @staticmethod
+    def _get_retry_after(r: Response) -> float:
+        """
+        Discord puts the seconds to wait in the JSON body of a 429, with the Retry-After header as a fallback
+        """
+        try:
+            return float(r.json()['retry_after'])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(r.headers.get('Retry-After', 1))
+        except ValueError:
+            return 1.0
+
+    @staticmethod
+    def _combine_messages(messages: List[Text]) -> List[List[Text]]:
+        """
+        Group messages, in order, into as few Discord messages as fit under the length limit once joined
+        """
+        combined = []
+        length = 0
+        for message in messages:
+            if combined and length + len(message) + 2 <= MAX_MESSAGE_LENGTH:
+                combined[-1].append(message)
+                length += len(message) + 2
+            else:
+                combined.append([message])
+                length = len(message)
+        return combined
@@ -1,4 +1,6 @@
-from typing import Text
+from typing import Text, List, Hashable
+
+from stockstalker.common.exceptions import NotificationDeliveryFailed
 
 
 class NotificationAgent:
@@ -6,5 +8,25 @@ class NotificationAgent:
     def __init__(self, name: Text):
         self.name = name
 
+    @property
+    def key(self) -> Hashable:
+        """
+        Agents with the same key deliver to the same place and can be shared
+        """
+        return self
+
     def send(self, message: Text):
         raise NotImplemented()
+
+    def send_batch(self, messages: List[Text]):
+        """
+        Send several messages at once.  Agents that can combine messages into one delivery should override this.
+        On failure raises NotificationDeliveryFailed with the number of messages already delivered, so only the rest
+        are retried
+        """
+        for delivered, message in enumerate(messages):
+            try:
+                self.send(message)
+            except Exception as e:
+                raise NotificationDeliveryFailed(f'Failed to send message {delivered + 1} of {len(messages)}: {e}',
+                                                 delivered=delivered) from e
@@ -1,14 +1,42 @@
+import json
+import re
 from typing import List, Text, NoReturn, Dict, Optional
 
-from bs4 import Tag, BeautifulSoup
+from bs4 import Tag, BeautifulSoup, SoupStrainer
 
 from stockstalker.common.logging import log
 from stockstalker.models.product_info import ProductInfo
 from stockstalker.services.notification_svc import NotificationSvc
+from stockstalker.parsers.extraction_spec import ExtractionSpec, FieldSpec
 from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.util.helpers import format_price
+
+PRICE_BLOCKS_URL = 'https://www.bestbuy.com/api/3.0/priceBlocks?skus={}'
+# skuId query param or the number before .p in a product URL
+SKU_URL_PATTERN = re.compile(r'(?:skuId=|/)(\d{6,8})(?:\.p\b|&|$)')
+
+
+def _get_full_url(url: Text) -> Text:
+    if 'bestbuy.com' not in url:
+        url = 'https://bestbuy.com' + url
+    return url
 
 
 class BestBuyParser(ParserBase):
+    search_page_region = SoupStrainer('li', {'class': 'sku-item'})
+    search_result_spec = ExtractionSpec({
+        'title': FieldSpec('h4.sku-header a'),
+        'url': FieldSpec('h4.sku-header a', lambda a: _get_full_url(a['href'])),
+        'in_stock': FieldSpec(
+            'div.price-block button.add-to-cart-button', lambda btn: btn.text.lower() == 'add to cart', default=False
+        ),
+        'price': FieldSpec('div.priceView-customer-price span'),
+    })
+    product_page_json = True
+    product_batch_size = 20
+    product_page_regions = [
+        'div.sku-title', 'div.sku.product-data', 'div.priceView-customer-price', 'div.fulfillment-add-to-cart-button'
+    ]
 
     def __init__(
             self,
@@ -17,73 +45,59 @@ class BestBuyParser(ParserBase):
             search_pages: List[Text] = None,
             product_pages: List[Text] = None,
             ignore_urls: List[Text] = None,
-            ignore_title_keywords: List[Text] = None
+            ignore_title_keywords: List[Text] = None,
+            **kwargs
     ):
         super().__init__(notification_svc, name, search_pages, product_pages, ignore_urls=ignore_urls,
-                         ignore_title_keywords=ignore_title_keywords)
-
-
-    def check_product_pages(self) -> List[ProductInfo]:
-        all_results = []
-        for url in self.product_pages:
-            log.info('Checking product page: %s', url)
-            page_source = self._load_page(url)
-            page = BeautifulSoup(page_source, 'html.parser')
-
-            result = self.parse_product_page(page)
-            if result:
-                result.url = url
-                all_results.append(result)
-        return all_results
+                         ignore_title_keywords=ignore_title_keywords, **kwargs)
+
+
+    def get_sku_from_url(self, url: Text) -> Optional[Text]:
+        match = SKU_URL_PATTERN.search(url)
+        return match.group(1) if match else None
+
+    def _check_sku_batch(self, skus: Dict[Text, Text]) -> Dict[Text, Optional[ProductInfo]]:
+        """
+        Check the SKUs with the price block endpoint the product pages load their buy button from
+        """
+        # The batch result never goes in the page cache, so there is nothing to validate it against
+        response = self._load_page(PRICE_BLOCKS_URL.format(','.join(skus)), cache_validators=False)
+        if not response:
+            return {}
+        try:
+            price_blocks = json.loads(response)
+        except ValueError:
+            log.error('Invalid JSON from price blocks for SKUs %s', ', '.join(skus))
+            return {}
+        results = {}
+        for price_block in price_blocks if isinstance(price_blocks, list) else []:
+            sku_data = price_block.get('sku') or {}
+            sku = str(sku_data.get('skuId'))
+            button_state = (sku_data.get('buttonState') or {}).get('buttonState')
+            title = (sku_data.get('names') or {}).get('short')
+            if sku not in skus or not button_state or not title:
+                continue
+            product_info = ProductInfo(
+                title=title,
+                url=skus[sku],
+                in_stock=button_state == 'ADD_TO_CART',
+                price=format_price((sku_data.get('price') or {}).get('currentPrice')),
+                sku=sku
+            )
+            results[skus[sku]] = None if self.is_ignored(product_info) else product_info
+        return results
 
     def _is_in_stock_search_result(self, page: BeautifulSoup) -> bool:
-        price_block = page.find('div', {'class': 'price-block'})
-        if not price_block:
-            log.error('Failed to find price block')
-            return False
-        add_to_cart_btn = price_block.find('button', {'class': 'add-to-cart-button'})
-        if not add_to_cart_btn:
-            log.error('Failed to find add to cart button')
-            return False
-        if add_to_cart_btn.text.lower() == 'add to cart':
-            return True
-        return False
+        return self.search_result_spec.extract_field(page, 'in_stock')
 
     def _get_title_from_search_result(self, item: Tag) -> Optional[Text]:
-        title_box = item.find('h4', {'class': 'sku-header'})
-        if not title_box:
-            log.error('Failed to find title box')
-            return
-        title_a = title_box.find('a')
-        if not title_a:
-            log.error('Failed to find title a tag')
-            return
-        return title_a.text
+        return self.search_result_spec.extract_field(item, 'title')
 
     def _get_url_from_search_result(self, item: Tag) -> Optional[Text]:
-        title_box = item.find('h4', {'class': 'sku-header'})
-        if not title_box:
-            log.error('Failed to find title box')
-            return
-        title_a = title_box.find('a')
-        if not title_a:
-            log.error('Failed to find title a tag')
-            return
-        url = title_a['href']
-        if 'bestbuy.com' not in url:
-            url = 'https://bestbuy.com' + url
-        return url
+        return self.search_result_spec.extract_field(item, 'url')
 
     def _get_price_from_search_result(self, item: Tag) -> Optional[Text]:
-        price_box = item.find('div', {'class': 'priceView-customer-price'})
-        if not price_box:
-            log.error('Failed to get price box')
-            return
-        price_span = price_box.find('span')
-        if not price_span:
-            log.error('Failed to find price span')
-            return
-        return price_span.text
+        return self.search_result_spec.extract_field(item, 'price')
 
     def _get_title_from_product_page(self, page: BeautifulSoup) -> Optional[Text]:
         title_box = page.find('div', {'class': 'sku-title'})
@@ -133,7 +147,18 @@ class BestBuyParser(ParserBase):
     def _is_sponsored_search_result(self, result: Tag) -> bool:
         pass
 
-    def _load_page(self, url: Text, user_agent=None) -> Optional[Text]:
+    def _load_page(
+            self,
+            url: Text,
+            user_agent=None,
+            regions: List[Text] = None,
+            cache_validators: bool = True
+    ) -> Optional[Text]:
         # For some reason most user agents cause request to time out
         ua = 'Mozilla/4.0 (compatible; MSIE 9.0; Windows NT 6.1)'
-        return super(BestBuyParser, self)._load_page(url, user_agent=ua)
\ No newline at end of file
+        return super(BestBuyParser, self)._load_page(
+            url,
+            user_agent=ua,
+            regions=regions,
+            cache_validators=cache_validators
+        )
\ No newline at end of file
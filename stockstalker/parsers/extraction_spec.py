@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from typing import Text, List, Tuple, FrozenSet, Optional, Callable, Any, Dict
+
+from bs4 import Tag
+
+from stockstalker.common.logging import log
+
+
+class Selector:
+    """
+    Compiled descendant selector made of simple steps such as 'div.item-info a.item-title' or 'div#ProductBuy button'.
+    Each step is an optional tag name followed by any number of .class and at most one #id
+    """
+
+    def __init__(self, selector: Text):
+        self.selector = selector
+        self.steps: List[Tuple[Optional[Text], FrozenSet[Text], Optional[Text]]] = [
+            self._compile_step(step) for step in selector.split()
+        ]
+        if not self.steps:
+            raise ValueError('Empty selector')
+
+    def match(self, element: Tag, root: Tag) -> bool:
+        """
+        Check if an element matches the selector, only looking at ancestors up to and including root
+        :rtype: bool
+        """
+        if not self._match_step(element, self.steps[-1]):
+            return False
+        step = len(self.steps) - 2
+        node = element.parent
+        stop = root.parent
+        while step >= 0 and node is not None and node is not stop:
+            if self._match_step(node, self.steps[step]):
+                step -= 1
+            node = node.parent
+        return step < 0
+
+    @staticmethod
+    def _match_step(element: Tag, step: Tuple[Optional[Text], FrozenSet[Text], Optional[Text]]) -> bool:
+        name, classes, element_id = step
+        if name and element.name != name:
+            return False
+        if classes and not classes.issubset(element.get('class') or ()):
+            return False
+        if element_id and element.get('id') != element_id:
+            return False
+        return True
+
+    @staticmethod
+    def _compile_step(step: Text) -> Tuple[Optional[Text], FrozenSet[Text], Optional[Text]]:
+        element_id = None
+        if '#' in step:
+            step, element_id = step.split('#', 1)
+        name, *classes = step.split('.')
+        if element_id and '.' in element_id:
+            element_id, *id_classes = element_id.split('.')
+            classes += id_classes
+        return name or None, frozenset(classes), element_id
+
+    def __repr__(self):
+        return self.selector
+
+
+@dataclass
+class FieldSpec:
+    selector: Text
+    extract: Callable[[Tag], Any] = lambda tag: tag.text
+    default: Any = None
+
+
+class ExtractionSpec:
+    """
+    Declarative description of the fields to pull out of an element.  Selectors are compiled once and every field is
+    found in a single walk over the element's descendants.  Fields sharing a selector share the lookup
+    """
+
+    def __init__(self, fields: Dict[Text, FieldSpec]):
+        self.fields = fields
+        self.selectors: Dict[Text, Selector] = {}
+        for field in fields.values():
+            if field.selector not in self.selectors:
+                self.selectors[field.selector] = Selector(field.selector)
+
+    def extract(self, item: Tag) -> Dict[Text, Any]:
+        """
+        Extract every field from the item in one pass
+        :rtype: Dict[Text, Any]
+        :param item: Element to extract fields from
+        :return: Field name to extracted value.  Fields that were not found get their default
+        """
+        return self._extract_fields(self._find(item, list(self.selectors.values())))
+
+    def extract_field(self, item: Tag, name: Text) -> Any:
+        """
+        Extract a single field from the item
+        """
+        selector = self.selectors[self.fields[name].selector]
+        return self._extract_fields(self._find(item, [selector]), names=[name])[name]
+
+    def _extract_fields(self, matches: Dict[Text, Tag], names: List[Text] = None) -> Dict[Text, Any]:
+        results = {}
+        for name in names or self.fields:
+            field = self.fields[name]
+            element = matches.get(field.selector)
+            if element is None:
+                log.debug('Failed to find %s (%s)', name, field.selector)
+                results[name] = field.default
+            else:
+                results[name] = field.extract(element)
+        return results
+
+    @staticmethod
+    def _find(item: Tag, selectors: List[Selector]) -> Dict[Text, Tag]:
+        matches = {}
+        pending = selectors
+        for element in item.descendants:
+            if not isinstance(element, Tag):
+                continue
+            matched = [s for s in pending if s.match(element, item)]
+            if matched:
+                for selector in matched:
+                    matches[selector.selector] = element
+                pending = [s for s in pending if s.selector not in matches]
+                if not pending:
+                    break
+        return matches
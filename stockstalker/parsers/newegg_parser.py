@@ -2,18 +2,31 @@ import random
 from typing import List, Text, NoReturn, Optional
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, Tag, SoupStrainer
 
 from stockstalker.common.logging import log
 from stockstalker.models.product_info import ProductInfo
 from stockstalker.services.notification_svc import NotificationSvc
+from stockstalker.parsers.extraction_spec import ExtractionSpec, FieldSpec
 from stockstalker.parsers.parser_base import ParserBase
 from requests.exceptions import Timeout, ConnectionError
 
 from stockstalker.util.constants import USER_AGENTS
 
+BREADCRUMB_REGION = SoupStrainer('ol', {'class': 'breadcrumb'})
+
 
 class NeweggParser(ParserBase):
+    search_page_region = SoupStrainer('div', {'class': 'list-wrap'})
+    search_result_spec = ExtractionSpec({
+        'title': FieldSpec('div.item-info a.item-title'),
+        'url': FieldSpec('div.item-info a.item-title', lambda a: a['href']),
+        'in_stock': FieldSpec(
+            'div.item-button-area button', lambda btn: btn.text.lower().strip() == 'add to cart', default=False
+        ),
+        'price': FieldSpec('li.price-current strong'),
+    })
+    product_page_json = True
 
     def __init__(
             self,
@@ -22,10 +35,11 @@ class NeweggParser(ParserBase):
             search_pages: List[Text] = None,
             product_pages: List[Text] = None,
             ignore_urls: List[Text] = None,
-            ignore_title_keywords: List[Text] = None
+            ignore_title_keywords: List[Text] = None,
+            **kwargs
     ):
         super().__init__(notification_svc, name, search_pages, product_pages, ignore_urls=ignore_urls,
-                         ignore_title_keywords=ignore_title_keywords)
+                         ignore_title_keywords=ignore_title_keywords, **kwargs)
 
 
     def add_search_pages(self, url: Text) -> NoReturn:
@@ -34,69 +48,28 @@ class NeweggParser(ParserBase):
     def add_product_page(self, url: Text) -> NoReturn:
         super().add_product_page(url)
 
-    def check_product_pages(self) -> List[ProductInfo]:
-        all_results = []
-        for url in self.product_pages:
-            log.info('Checking product page: %s', url)
-            page_source = self._load_page(url)
-            page = BeautifulSoup(page_source, 'html.parser')
-
-            if self._is_combo_page(page):
-                continue
+    def parse_product_page_source(self, page_source: Text, url: Text = None) -> Optional[ProductInfo]:
+        # Combo pages carry product JSON too.  Check the breadcrumbs first so the JSON path skips them like the HTML one
+        if self._is_combo_page(self._build_page(page_source, parse_only=BREADCRUMB_REGION)):
+            return
+        return super().parse_product_page_source(page_source, url=url)
 
-            result = self.parse_product_page(page)
-            if result:
-                result.url = url
-                all_results.append(result)
-        return all_results
+    def parse_product_page(self, page: BeautifulSoup, url: Text = None) -> Optional[ProductInfo]:
+        if self._is_combo_page(page):
+            return
+        return super().parse_product_page(page, url=url)
 
     def _get_title_from_search_result(self, item: Tag) -> Optional[Text]:
-        info_box = item.find('div', {'class': 'item-info'})
-        if not info_box:
-            log.error('Did not locate product info box')
-            return None
-        product_link = info_box.find('a', {'class': 'item-title'})
-        if not product_link:
-            log.error('Did not locate product link')
-            return None
-
-        return product_link.text
+        return self.search_result_spec.extract_field(item, 'title')
 
     def _get_price_from_search_result(self, item: Tag) -> Optional[Text]:
-        price_box = item.find('li', {'class': 'price-current'})
-        if not price_box:
-            log.error('Failed to find price box')
-            return
-        price_strong = price_box.find('strong')
-
-        return price_strong.text if price_strong else None
+        return self.search_result_spec.extract_field(item, 'price')
 
     def _get_url_from_search_result(self, item: Tag) -> Optional[Text]:
-        info_box = item.find('div', {'class': 'item-info'})
-        if not info_box:
-            log.error('Did not locate product info box')
-            return None
-        product_link = info_box.find('a', {'class': 'item-title'})
-        if not product_link:
-            log.error('Did not locate product link')
-            return None
-        return product_link['href']
+        return self.search_result_spec.extract_field(item, 'url')
 
     def _is_in_stock_search_result(self, search_result: Tag) -> bool:
-
-        btn_box = search_result.find('div', {'class': 'item-button-area'})
-        if not btn_box:
-            log.error('Did not find button box')
-            return False
-        btn = btn_box.find('button')
-        if not btn:
-            log.error('Did not find button')
-            return False
-        log.debug('Button Text: %s', btn.text)
-        if btn.text.lower().strip() == 'add to cart':
-            return True
-        else:
-            return False
+        return self.search_result_spec.extract_field(search_result, 'in_stock')
 
     def _get_title_from_product_page(self, page: BeautifulSoup) -> Optional[Text]:
         title_box = page.find('h1', {'class': 'product-title'})
@@ -1,18 +1,52 @@
+import codecs
 import random
-from typing import List, Text, NoReturn, Dict, Optional
+import time
+from functools import partial
+from typing import List, Text, NoReturn, Dict, Optional, Callable, Any, Iterator, Iterable, FrozenSet, Tuple
+from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, Tag, SoupStrainer
+from bs4.builder import builder_registry
 from fake_useragent import UserAgent
 from requests import Timeout, ConnectionError
 
+from stockstalker.common import metrics
+from stockstalker.common.exceptions import PageNotModified
 from stockstalker.common.logging import log
+from stockstalker.models.parse_spec import ParseSpec
 from stockstalker.models.product_info import ProductInfo
+from stockstalker.models.stock_change import StockChange
+from stockstalker.models.stock_state import StockState
+from stockstalker.notifyagents.notification_agent import NotificationAgent
+from stockstalker.parsers.extraction_spec import ExtractionSpec
+from stockstalker.parsers.region_tracker import RegionTracker
+from stockstalker.parsers.structured_data import get_product_from_ld_json
 from stockstalker.services.notification_svc import NotificationSvc
-from stockstalker.util.constants import USER_AGENTS
+from stockstalker.services.observation_log import ObservationLog
+from stockstalker.services.page_cache import PageCache
+from stockstalker.services.parse_pool import ParsePool
+from stockstalker.services.rate_limiter import HostRateLimiter
+from stockstalker.services.stock_state_store import StockStateStore
+from stockstalker.services.traffic_meter import TrafficMeter
+from stockstalker.util.constants import USER_AGENTS, SEARCH_PAGE, PRODUCT_PAGE, HTML_BACKENDS, RESTOCK, PRICE_DROP, \
+    SOLD_OUT, STREAM_CHUNK_SIZE
+from stockstalker.util.helpers import parse_price
+from stockstalker.util.http_helpers import build_session, get_wire_bytes
 
 
 class ParserBase:
+    # Part of a search page the search result extractors need.  Only this part of the document gets built
+    search_page_region: Optional[SoupStrainer] = None
+    # Fields of a single search result.  When set they are all extracted in one pass instead of one lookup per field
+    search_result_spec: Optional[ExtractionSpec] = None
+    # Read product pages from their embedded schema.org JSON before falling back to the HTML extractors
+    product_page_json: bool = False
+    # Max product pages checked in one request by check_product_batch.  0 if the retailer has no batch lookup
+    product_batch_size: int = 0
+    # Regions of a product page the extractors read.  When set the download stops as soon as all of them have arrived
+    product_page_regions: List[Text] = []
+
     def __init__(
             self,
             notification_svc: NotificationSvc,
@@ -20,18 +54,67 @@ class ParserBase:
             search_pages: List[Text] = None,
             product_pages: List[Text] = None,
             ignore_urls=None,
-            ignore_title_keywords=None
+            ignore_title_keywords=None,
+            pool_size: int = 10,
+            http2: bool = False,
+            request_timeout: float = 30,
+            html_backend: Text = 'html.parser',
+            search_page_interval: int = 600,
+            product_page_interval: int = 60,
+            poll_intervals: Dict[Text, int] = None,
+            rate_limiter: HostRateLimiter = None,
+            parse_pool: ParsePool = None,
+            state_store: StockStateStore = None,
+            observation_log: ObservationLog = None,
+            traffic_meter: TrafficMeter = None
     ):
-        if ignore_urls is None:
-            ignore_urls = []
-        if ignore_title_keywords is None:
-            ignore_title_keywords = []
-        self.ignore_title_keywords = ignore_title_keywords
-        self.ignore_urls = ignore_urls
-        self.product_pages = product_pages
+        # Built on first use by get_parse_spec.  Reset whenever the ignore lists are replaced
+        self._parse_spec: Optional[ParseSpec] = None
+        self.ignore_title_keywords = ignore_title_keywords or []
+        self.ignore_urls = ignore_urls or []
         self.notification_svc = notification_svc
-        self.search_pages = search_pages
-        self.notification_sent_urls = []
+        # Agents this parser notifies through the shared service.  Every registered agent if empty
+        self.notification_agents: List[NotificationAgent] = []
+        self.name = name
+        self.search_pages = search_pages or []
+        self.product_pages = product_pages or []
+        self.notification_sent_urls = set()
+        self.request_timeout = request_timeout
+        self.session = build_session(pool_size=pool_size, http2=http2)
+        self._user_agent = None
+        self.page_cache = PageCache()
+        self.html_backend = self._get_html_backend(html_backend)
+        self.search_page_interval = search_page_interval
+        self.product_page_interval = product_page_interval
+        self.poll_intervals = poll_intervals or {}
+        self.rate_limiter = rate_limiter
+        self.parse_pool = parse_pool
+        # Only notify on stock changes when set
+        self.state_store = state_store
+        # Every observation is recorded here when set
+        self.observation_log = observation_log
+        # Bytes received from each host are counted here when set
+        self.traffic_meter = traffic_meter
+
+    @property
+    def ignore_urls(self) -> FrozenSet[Text]:
+        return self._ignore_urls
+
+    @ignore_urls.setter
+    def ignore_urls(self, urls: Iterable[Text]) -> NoReturn:
+        # Sets so checking a product against long ignore and sent lists is constant time.  Frozen so every change
+        # goes through here and the cached parse spec can't go stale
+        self._ignore_urls = frozenset(urls)
+        self._parse_spec = None
+
+    @property
+    def ignore_title_keywords(self) -> Tuple[Text, ...]:
+        return self._ignore_title_keywords
+
+    @ignore_title_keywords.setter
+    def ignore_title_keywords(self, keywords: Iterable[Text]) -> NoReturn:
+        self._ignore_title_keywords = tuple(keywords)
+        self._parse_spec = None
 
     def add_search_pages(self, url: Text) -> NoReturn:
         self.search_pages.append(url)
@@ -39,10 +122,70 @@ class ParserBase:
     def add_product_page(self, url: Text) -> NoReturn:
         self.product_pages.append(url)
 
+    def get_poll_interval(self, url: Text, page_type: Text) -> int:
+        """
+        Seconds between checks of a URL in daemon mode.  A per URL interval wins over the page type default
+        :rtype: int
+        """
+        if url in self.poll_intervals:
+            return self.poll_intervals[url]
+        return self.search_page_interval if page_type == SEARCH_PAGE else self.product_page_interval
+
     def notify_in_stock(self, products: List[ProductInfo]):
+        if self.observation_log:
+            self.observation_log.record(products)
+        if self.state_store:
+            self.notify_changes(self.state_store.update(products))
+            return
         for product in products:
             if product.in_stock:
-                self.notification_svc.send_notificaiton(self.format_notification(product.to_dict()), product.url)
+                self._send_in_stock_notification(product)
+
+    def notify_changes(self, changes: List[StockChange]):
+        """
+        Notify about restocks and price drops.  Sold out items are cleared from history, along with the price drops
+        alerted since they restocked, so they alert again when they restock.  A restock or price drop that can't be
+        delivered is reverted in the state store so the next check reports it again
+        """
+        for change in changes:
+            product = change.product
+            identifier = self.get_notification_identifier(product)
+            if change.kind == RESTOCK:
+                self._send_in_stock_notification(product, on_failed=partial(self.state_store.revert, change))
+            elif change.kind == PRICE_DROP:
+                self.notification_svc.send_notificaiton(
+                    self.format_price_drop_notification(product.to_dict(), change.previous),
+                    self._get_price_drop_identifier(identifier, parse_price(product.price)),
+                    agents=self.notification_agents,
+                    on_failed=partial(self.state_store.revert, change)
+                )
+            elif change.kind == SOLD_OUT:
+                log.info('%s sold out', product.url)
+                price_drops = [self._get_price_drop_identifier(identifier, p) for p in change.previous.dropped_prices]
+                self.notification_svc.clear_notification(identifier, aliases=[product.url] + price_drops)
+
+    @staticmethod
+    def _get_price_drop_identifier(identifier: Text, price: float) -> Text:
+        return f'{identifier}:price:{price:.2f}'
+
+    def _send_in_stock_notification(self, product: ProductInfo, on_failed: Callable[[], None] = None):
+        self.notification_svc.send_notificaiton(
+            self.format_notification(product.to_dict()),
+            self.get_notification_identifier(product),
+            agents=self.notification_agents,
+            aliases=[product.url],
+            on_failed=on_failed
+        )
+
+    def get_notification_identifier(self, product: ProductInfo) -> Text:
+        """
+        Identifier used to dedupe notifications across parsers.  The retailer and SKU when the SKU is known, so the
+        same item reached through different URLs or configs only alerts once.  Otherwise the URL
+        :rtype: Text
+        """
+        if product.sku:
+            return f'{self.name.lower()}:{product.sku.strip()}'
+        return product.url
 
     def is_ignored(self, data: ProductInfo) -> bool:
         for kw in self.ignore_title_keywords:
@@ -69,65 +212,340 @@ class ParserBase:
                 products.append(product_data)
         return products
 
-    def parse_product_page(self, page: BeautifulSoup) -> ProductInfo:
+    def parse_product_page(self, page: BeautifulSoup, url: Text = None) -> Optional[ProductInfo]:
 
         product_info = ProductInfo(
-            url=None,
-            title=self._get_title_from_product_page(page),
-            in_stock=self._is_in_stock_product_page(page),
-            sku=self._get_sku_from_product_page(page),
-            price=self._get_price_from_product_page(page)
+            url=url,
+            title=self._extract('title', self._get_title_from_product_page, page),
+            in_stock=self._extract('in_stock', self._is_in_stock_product_page, page),
+            sku=self._extract('sku', self._get_sku_from_product_page, page),
+            price=self._extract('price', self._get_price_from_product_page, page)
         )
 
-        if self.is_ignored(product_info):
+        if self._extract('is_ignored', self.is_ignored, product_info):
             return None
 
         return product_info
 
     def check_stock(self) -> NoReturn:
-        results = self.check_search_pages()
-        results += self.check_product_pages()
-        self.notify_in_stock(results)
+        for results in self.iter_page_results():
+            self.notify_in_stock(results)
+
+    def iter_page_results(self) -> Iterator[List[ProductInfo]]:
+        """
+        Check every search and product page, yielding each page's results as soon as it is checked
+        :rtype: Iterator[List[ProductInfo]]
+        """
+        for url in self.search_pages:
+            yield self.check_page(url, SEARCH_PAGE)
+        for urls in self.get_product_batches(self.product_pages):
+            yield self.check_product_batch(urls)
+
+    def check_page(self, url: Text, page_type: Text) -> List[ProductInfo]:
+        """
+        Check a single URL of the given page type
+        :rtype: List[ProductInfo]
+        :param url: URL to check
+        :param page_type: SEARCH_PAGE or PRODUCT_PAGE
+        """
+        if page_type == SEARCH_PAGE:
+            return self.check_search_page(url)
+        if page_type == PRODUCT_PAGE:
+            result = self.check_product_page(url)
+            return [result] if result else []
+        raise ValueError(f'Unknown page type {page_type}')
 
     def check_search_pages(self) -> List[ProductInfo]:
         all_results = []
-        for page in self.search_pages:
-            log.info('Checking search page: %s', page)
-            page_source = self._load_page(page)
-            if not page_source:
-                log.error('Did not get page source.  Skipping %s', page)
-                continue
-            page = BeautifulSoup(page_source, 'html.parser')
-            all_results += self.parse_search_page(page)
+        for url in self.search_pages:
+            all_results += self.check_search_page(url)
         for r in all_results:
             log.debug(r)
         return all_results
 
+    def check_search_page(self, url: Text) -> List[ProductInfo]:
+        log.info('Checking search page: %s', url)
+        results = self._get_page_result(url, self._get_page_parser(SEARCH_PAGE)) or []
+        metrics.page_results.observe(self.name, SEARCH_PAGE, value=len(results))
+        return results
+
     def check_product_pages(self) -> List[ProductInfo]:
-        raise NotImplementedError
+        all_results = []
+        for urls in self.get_product_batches(self.product_pages):
+            all_results += self.check_product_batch(urls)
+        return all_results
+
+    def get_product_batches(self, urls: List[Text]) -> List[List[Text]]:
+        """
+        Group product pages into the batches check_product_batch is called with.  Pages without a SKU in their URL
+        get a batch of their own
+        :rtype: List[List[Text]]
+        """
+        if not self.product_batch_size:
+            return [[url] for url in urls]
+        batchable = [url for url in urls if self.get_sku_from_url(url)]
+        batches = [batchable[i:i + self.product_batch_size] for i in range(0, len(batchable), self.product_batch_size)]
+        return batches + [[url] for url in urls if not self.get_sku_from_url(url)]
+
+    def check_product_batch(self, urls: List[Text]) -> List[ProductInfo]:
+        """
+        Check several product pages with a single batch lookup.  Pages the lookup doesn't answer for are checked one
+        by one
+        :rtype: List[ProductInfo]
+        :param urls: Product page URLs
+        """
+        batch_results = {}
+        if self.product_batch_size and len(urls) > 1:
+            skus = {self.get_sku_from_url(url): url for url in urls}
+            log.info('Checking %s product pages in one batch', len(skus))
+            batch_results = self._check_sku_batch(skus)
+        results = []
+        for url in urls:
+            if url not in batch_results:
+                results += self.check_page(url, PRODUCT_PAGE)
+            elif batch_results[url]:
+                results.append(batch_results[url])
+        return results
 
-    def _load_page(self, url: Text, user_agent=None) -> Optional[Text]:
-        ua = UserAgent(cache=False)
+    def get_sku_from_url(self, url: Text) -> Optional[Text]:
+        """
+        SKU of a product page taken from its URL.  Only used for batch lookups
+        """
+        return None
+
+    def check_product_page(self, url: Text) -> Optional[ProductInfo]:
+        log.info('Checking product page: %s', url)
+        result = self._get_page_result(url, self._get_page_parser(PRODUCT_PAGE), regions=self.product_page_regions)
+        metrics.page_results.observe(self.name, PRODUCT_PAGE, value=1 if result else 0)
+        return result
+
+    def parse_search_page_source(self, page_source: Text, url: Text = None) -> List[ProductInfo]:
+        page = self._build_page(page_source, parse_only=self.search_page_region)
+        return self.parse_search_page(page)
+
+    def parse_product_page_source(self, page_source: Text, url: Text = None) -> Optional[ProductInfo]:
+        if self.product_page_json:
+            product_info = get_product_from_ld_json(page_source, url=url)
+            if product_info:
+                log.debug('Parsed %s from embedded JSON', url)
+                return None if self._extract('is_ignored', self.is_ignored, product_info) else product_info
+        page = self._build_page(page_source)
+        return self.parse_product_page(page, url=url)
+
+    def get_parse_spec(self) -> ParseSpec:
+        """
+        Picklable description of this parser used to rebuild it in a parse worker process.  Built once and reused
+        until the ignore lists change
+        :rtype: ParseSpec
+        """
+        if self._parse_spec is None:
+            self._parse_spec = ParseSpec(
+                parser_class=type(self),
+                name=self.name,
+                html_backend=self.html_backend,
+                ignore_urls=tuple(sorted(self._ignore_urls)),
+                ignore_title_keywords=self._ignore_title_keywords
+            )
+        return self._parse_spec
+
+    def _get_page_parser(self, page_type: Text) -> Callable[[Text, Text], Any]:
+        """
+        Function that parses page source of the given type.  Parsing happens in the parse pool when one is set
+        """
+        if self.parse_pool:
+            parse = partial(self.parse_pool.parse, self.get_parse_spec(), page_type)
+        else:
+            parse = self.parse_search_page_source if page_type == SEARCH_PAGE else self.parse_product_page_source
+        return partial(self._timed_parse, page_type, parse)
+
+    def _timed_parse(self, page_type: Text, parse: Callable[[Text, Text], Any], page_source: Text, url: Text) -> Any:
+        with metrics.parse_seconds.time(self.name, page_type):
+            return parse(page_source, url)
+
+    def _build_page(self, page_source: Text, parse_only: SoupStrainer = None) -> BeautifulSoup:
+        with metrics.build_page_seconds.time(self.name):
+            return BeautifulSoup(page_source, self.html_backend, parse_only=parse_only)
+
+    def _extract(self, name: Text, extractor: Callable[[Any], Any], element: Any) -> Any:
+        """
+        Run a single extractor, timing it under the given name
+        """
+        with metrics.extract_seconds.time(self.name, name):
+            return extractor(element)
+
+    @staticmethod
+    def _get_html_backend(html_backend: Text) -> Text:
+        """
+        Make sure the requested BeautifulSoup tree builder is installed, falling back to the built in html.parser
+        :rtype: Text
+        :param html_backend: Name of the tree builder. html.parser, lxml or html5lib
+        """
+        if html_backend not in HTML_BACKENDS:
+            raise ValueError(f'Unknown HTML backend {html_backend}.  Options are {", ".join(HTML_BACKENDS)}')
+        if not builder_registry.lookup(html_backend):
+            log.warning('HTML backend %s is not installed.  Falling back to html.parser', html_backend)
+            return 'html.parser'
+        return html_backend
+
+    def _get_page_result(self, url: Text, parse: Callable[[Text, Text], Any], regions: List[Text] = None) -> Any:
+        """
+        Load a page and parse it.  If the server says the page has not changed, or sends back the exact same body as
+        last time, the last result is reused without parsing anything
+        :param url: URL to load
+        :param parse: Function taking the page source and URL, returning the parsed result
+        :param regions: Only load the page up to the end of these regions
+        """
+        try:
+            page_source = self._load_page(url, regions=regions) if regions else self._load_page(url)
+        except PageNotModified:
+            log.debug('Page not modified, reusing last result: %s', url)
+            return self.page_cache.get_result(url)
+        if not page_source:
+            log.error('Did not get page source.  Skipping %s', url)
+            return
+        digest = self.page_cache.get_digest(page_source)
+        if self.page_cache.matches_digest(url, digest):
+            log.debug('Page body unchanged, reusing last result: %s', url)
+            result = self.page_cache.get_result(url)
+        else:
+            result = parse(page_source, url)
+        self.page_cache.set_result(url, result, digest=digest)
+        return result
+
+    def _load_page(
+            self,
+            url: Text,
+            user_agent=None,
+            cookies: Dict[Text, Text] = None,
+            regions: List[Text] = None,
+            cache_validators: bool = True
+    ) -> Optional[Text]:
+        """
+        Load a page's source
+        :param regions: Stop downloading once every one of these regions has been received.  The whole page is loaded
+        if not set or the session can't stream
+        :param cache_validators: Send and keep the page cache's ETag and Last-Modified validators.  Off for requests
+        whose result is never stored in the page cache
+        """
+        host = urlparse(url).netloc
+        stream = bool(regions) and isinstance(self.session, requests.Session)
+        if self.rate_limiter and not self.rate_limiter.acquire(host):
+            if self.rate_limiter.is_open(host):
+                log.error('Too many failures from %s.  Skipping %s', host, url)
+                metrics.fetch_errors.inc(host, 'circuit_open')
+            else:
+                log.warning('%s asked us to back off.  Skipping %s until its next check', host, url)
+                metrics.fetch_errors.inc(host, 'rate_limited')
+            return
+        start = time.perf_counter()
         try:
-            headers = {'User-Agent': user_agent or ua.chrome}
+            headers = {'User-Agent': user_agent or self._get_user_agent()}
+            if cache_validators:
+                headers.update(self.page_cache.get_validator_headers(url))
             log.debug('User Agent: %s', headers['User-Agent'])
-            r = requests.get(url, headers=headers)
+            if stream:
+                r = self.session.get(url, headers=headers, cookies=cookies, timeout=self.request_timeout, stream=True)
+            else:
+                r = self.session.get(url, headers=headers, cookies=cookies, timeout=self.request_timeout)
         except (ConnectionError, Timeout):
             log.error('Failed to load URL: %s', url)
+            metrics.fetch_errors.inc(host, 'connection')
+            if self.rate_limiter:
+                self.rate_limiter.on_failure(host)
             return
+        if self.rate_limiter:
+            self.rate_limiter.on_response(host, r.status_code, retry_after=r.headers.get('Retry-After'))
+        if stream and r.status_code != 200:
+            r.close()
+        if r.status_code == 304 and self.page_cache.has_result(url):
+            raise PageNotModified(f'{url} has not been modified')
         if r.status_code != 200:
             log.error('Unexpected Status Code %s for URL %s', r.status_code, url)
+            metrics.fetch_errors.inc(host, f'status_{r.status_code}')
             return
-        return r.text
+        if cache_validators:
+            self.page_cache.set_validators(url, etag=r.headers.get('ETag'), last_modified=r.headers.get('Last-Modified'))
+        if stream:
+            page_source = self._read_regions(r, url, regions)
+        else:
+            page_source = r.text
+            if self.traffic_meter:
+                decoded_bytes = len(r.content)
+                self.traffic_meter.record(host, get_wire_bytes(r) or decoded_bytes, decoded_bytes)
+        metrics.fetch_seconds.observe(host, value=time.perf_counter() - start)
+        return page_source
+
+    def _read_regions(self, response: requests.Response, url: Text, regions: List[Text]) -> Optional[Text]:
+        """
+        Read a streamed response until every region has been received, then close the connection.  A connection
+        closed early can't be reused, which is far cheaper than downloading the rest of a multi MB page
+        :rtype: Optional[Text]
+        :return: Page source up to the end of the last region, or of the embedded product JSON if the parser reads it
+        and it arrives first
+        """
+        tracker = RegionTracker(regions, product_json=self.product_page_json)
+        # Content encoding is undone by urllib3 as the body streams in, the charset is decoded here
+        decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        chunks = []
+        decoded_bytes = 0
+        try:
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                decoded_bytes += len(chunk)
+                chunks.append(decoder.decode(chunk))
+                tracker.feed(chunks[-1])
+                if tracker.complete:
+                    log.debug('Found every region after %s bytes.  Closing %s', decoded_bytes, url)
+                    break
+            else:
+                chunks.append(decoder.decode(b'', final=True))
+        except (ConnectionError, Timeout, requests.exceptions.ChunkedEncodingError):
+            log.error('Failed to read URL: %s', url)
+            return
+        finally:
+            if self.traffic_meter:
+                self.traffic_meter.record(
+                    urlparse(url).netloc, get_wire_bytes(response) or decoded_bytes, decoded_bytes
+                )
+            response.close()
+        return ''.join(chunks)
+
+    def _get_user_agent(self) -> Text:
+        # Building the UserAgent can fetch browser stats over the network, so only do it once per parser
+        if self._user_agent is None:
+            try:
+                self._user_agent = UserAgent(cache=False)
+            except Exception:
+                log.warning('Failed to load fake user agents.  Using built in list')
+                self._user_agent = False
+        return self._user_agent.chrome if self._user_agent else random.choice(USER_AGENTS)
+
+    def _check_sku_batch(self, skus: Dict[Text, Text]) -> Dict[Text, Optional[ProductInfo]]:
+        """
+        Look up the stock of several SKUs at once
+        :rtype: Dict[Text, Optional[ProductInfo]]
+        :param skus: SKU to the product page URL it came from
+        :return: Product page URL to its product info, or None if the product is ignored.  Missing URLs are checked
+        page by page
+        """
+        return {}
 
     def _get_product_data_from_search_result(self, search_result: Tag) -> Optional[ProductInfo]:
-        result = ProductInfo(
-            title=self._get_title_from_search_result(search_result),
-            url=self._get_url_from_search_result(search_result),
-            in_stock=self._is_in_stock_search_result(search_result),
-            price=self._get_price_from_search_result(search_result)
-        )
-        if self.is_ignored(result):
+        if self.search_result_spec:
+            fields = self._extract('search_result', self.search_result_spec.extract, search_result)
+            result = ProductInfo(
+                title=fields['title'],
+                url=fields['url'],
+                in_stock=fields['in_stock'],
+                price=fields['price']
+            )
+        else:
+            result = ProductInfo(
+                title=self._extract('title', self._get_title_from_search_result, search_result),
+                url=self._extract('url', self._get_url_from_search_result, search_result),
+                in_stock=self._extract('in_stock', self._is_in_stock_search_result, search_result),
+                price=self._extract('price', self._get_price_from_search_result, search_result)
+            )
+        if self._extract('is_ignored', self.is_ignored, result):
             return
 
         return result
@@ -164,4 +582,8 @@ class ParserBase:
 
     def format_notification(self, data: ProductInfo):
         msg = '**Instock Alert**\n{title}\n{url}'.format(**data)
-        return msg
\ No newline at end of file
+        return msg
+
+    def format_price_drop_notification(self, data: dict, previous: StockState):
+        previous_price = f'${previous.notified_price:,.2f}' if previous and previous.notified_price else 'Unknown'
+        return '**Price Drop**\n{title}\n{url}\n{previous} -> {price}'.format(previous=previous_price, **data)
\ No newline at end of file
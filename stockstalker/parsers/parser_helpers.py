@@ -1,3 +1,5 @@
+from typing import List, Text, Union, Dict
+
 from stockstalker.common.exceptions import NoNotificationAgents
 from stockstalker.models.parser_config import ParserConfig
 from stockstalker.notifyagents.notification_agent_helpers import notification_agent_factory
@@ -7,6 +9,12 @@ from stockstalker.parsers.parser_base import ParserBase
 from stockstalker.parsers.walmart_parser import WalmartParser
 from stockstalker.services.notification_history_file import NotificationHistoryFile
 from stockstalker.services.notification_svc import NotificationSvc
+from stockstalker.services.observation_log import ObservationLog
+from stockstalker.services.parse_pool import ParsePool
+from stockstalker.services.rate_limiter import HostRateLimiter
+from stockstalker.services.stock_state_store import StockStateStore
+from stockstalker.services.traffic_meter import TrafficMeter
+from stockstalker.util.constants import SEARCH_PAGE, PRODUCT_PAGE
 
 PARSER_NAME_MAP = {
     'newegg': NeweggParser,
@@ -14,35 +22,86 @@ PARSER_NAME_MAP = {
     'bestbuy': BestBuyParser
 }
 
-def parser_factory(config: ParserConfig) -> ParserBase:
+def parser_factory(
+        config: ParserConfig,
+        notification_svc: NotificationSvc = None,
+        rate_limiter: HostRateLimiter = None,
+        parse_pool: ParsePool = None,
+        state_store: StockStateStore = None,
+        observation_log: ObservationLog = None,
+        traffic_meter: TrafficMeter = None
+) -> ParserBase:
 
     if not config.notification_agents:
         raise NoNotificationAgents("You must provide at least one notification agent")
     notification_agents = notification_agent_factory(config.notification_agents)
     if len(notification_agents) < 1:
         raise NoNotificationAgents('No valid notification agents built from config')
-    parser = get_parser_by_name(config)
+    parser = get_parser_by_name(
+        config,
+        notification_svc=notification_svc,
+        rate_limiter=rate_limiter,
+        parse_pool=parse_pool,
+        state_store=state_store,
+        observation_log=observation_log,
+        traffic_meter=traffic_meter
+    )
     for agent in notification_agents:
-        parser.notification_svc.register_agent(agent)
+        parser.notification_agents.append(parser.notification_svc.register_agent(agent))
 
     return parser
 
-def get_parser_by_name(config: ParserConfig) -> ParserBase:
+def get_parser_by_name(
+        config: ParserConfig,
+        notification_svc: NotificationSvc = None,
+        rate_limiter: HostRateLimiter = None,
+        parse_pool: ParsePool = None,
+        state_store: StockStateStore = None,
+        observation_log: ObservationLog = None,
+        traffic_meter: TrafficMeter = None
+) -> ParserBase:
     """
     Takes a string and attempts to map to parser object.  Returning a parser instance with a file notification service
     :rtype: ParserBase
     :param name: Name of parser
+    :param notification_svc: Service shared by every parser.  A service using history.log is created if not set
+    :param rate_limiter: Limiter shared by every parser so requests to the same host are paced together
+    :param parse_pool: Worker processes shared by every parser to parse pages in
+    :param state_store: Last known stock state of every URL.  Only stock changes are notified when set
+    :param observation_log: Log every observation is recorded in
+    :param traffic_meter: Meter shared by every parser counting the bytes received from each host
     :return: Parser instance
     """
     if config.name.lower() not in PARSER_NAME_MAP:
         raise ValueError(f'Cannot locate parser by name {config.name}')
     return PARSER_NAME_MAP[config.name.lower()](
-        NotificationSvc(
-            NotificationHistoryFile('history.log'),
-        ),
+        notification_svc or NotificationSvc(NotificationHistoryFile('history.log')),
         config.name,
-        search_pages=config.links['search_pages'],
-        product_pages=config.links['product_pages'],
+        search_pages=get_link_urls(config.links.get(SEARCH_PAGE, [])),
+        product_pages=get_link_urls(config.links.get(PRODUCT_PAGE, [])),
         ignore_title_keywords=config.ignore_title_keywords,
-        ignore_urls=config.ignore_urls
-    )
\ No newline at end of file
+        ignore_urls=config.ignore_urls,
+        pool_size=config.pool_size,
+        http2=config.http2,
+        html_backend=config.html_backend,
+        search_page_interval=config.search_page_interval,
+        product_page_interval=config.product_page_interval,
+        poll_intervals=get_link_intervals(config.links.get(SEARCH_PAGE, []) + config.links.get(PRODUCT_PAGE, [])),
+        rate_limiter=rate_limiter,
+        parse_pool=parse_pool,
+        state_store=state_store,
+        observation_log=observation_log,
+        traffic_meter=traffic_meter
+    )
+
+
+def get_link_urls(links: List[Union[Text, dict]]) -> List[Text]:
+    """
+    Links are either a URL or a dict with a url and an optional interval in seconds
+    :rtype: List[Text]
+    """
+    return [link['url'] if isinstance(link, dict) else link for link in links]
+
+
+def get_link_intervals(links: List[Union[Text, dict]]) -> Dict[Text, int]:
+    return {link['url']: link['interval'] for link in links if isinstance(link, dict) and 'interval' in link}
\ No newline at end of file
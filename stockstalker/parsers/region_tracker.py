@@ -0,0 +1,81 @@
+from html.parser import HTMLParser
+from typing import Text, List, Optional, Tuple
+
+from stockstalker.parsers.extraction_spec import Selector
+from stockstalker.parsers.structured_data import get_product_from_json
+
+# Elements that never have an end tag
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+}
+
+
+class RegionTracker(HTMLParser):
+    """
+    Incremental parser that is fed a page chunk by chunk and tracks when every region a parser needs has been fully
+    received.  Regions are single step selectors such as 'div#ProductBuy' or 'h1.product-title'.  Nothing is built,
+    only a stack of open tag names is kept.
+
+    With product_json set, an ld+json script holding a usable schema.org Product also completes the page, whichever
+    comes first.  Parsers that read the embedded JSON first fall back to the regions when it hasn't arrived yet
+    """
+
+    def __init__(self, regions: List[Text], product_json: bool = False):
+        super().__init__(convert_charrefs=False)
+        self.pending: List[Tuple[Text, Tuple]] = [(region, self._compile(region)) for region in regions]
+        self.product_json = product_json
+        self.product_json_found = False
+        self._stack: List[Text] = []
+        # Stack depth each open region started at
+        self._open: List[Tuple[Text, int]] = []
+        # Contents of the ld+json script being received
+        self._json_script: Optional[List[Text]] = None
+
+    @property
+    def complete(self) -> bool:
+        return (not self.pending and not self._open) or self.product_json_found
+
+    def handle_starttag(self, tag: Text, attrs: List[Tuple[Text, Optional[Text]]]):
+        if tag in VOID_ELEMENTS:
+            return
+        self._stack.append(tag)
+        if tag == 'script' and self.product_json and dict(attrs).get('type') == 'application/ld+json':
+            self._json_script = []
+        if not self.pending:
+            return
+        attributes = dict(attrs)
+        classes = (attributes.get('class') or '').split()
+        for region, (name, region_classes, region_id) in list(self.pending):
+            if name and name != tag:
+                continue
+            if not region_classes.issubset(classes) or (region_id and attributes.get('id') != region_id):
+                continue
+            self.pending.remove((region, (name, region_classes, region_id)))
+            self._open.append((region, len(self._stack)))
+
+    def handle_startendtag(self, tag: Text, attrs: List[Tuple[Text, Optional[Text]]]):
+        # Self closing tags never open a region
+        pass
+
+    def handle_data(self, data: Text):
+        if self._json_script is not None:
+            self._json_script.append(data)
+
+    def handle_endtag(self, tag: Text):
+        if tag == 'script' and self._json_script is not None:
+            if get_product_from_json(''.join(self._json_script)):
+                self.product_json_found = True
+            self._json_script = None
+        if tag not in self._stack:
+            return
+        # Browsers close any unclosed children along with their parent
+        while self._stack:
+            if self._stack.pop() == tag:
+                break
+        self._open = [(region, depth) for region, depth in self._open if depth <= len(self._stack)]
+
+    @staticmethod
+    def _compile(region: Text) -> Tuple:
+        if len(region.split()) != 1:
+            raise ValueError(f'Region {region} must be a single selector step')
+        return Selector(region).steps[0]
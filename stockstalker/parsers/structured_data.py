@@ -0,0 +1,66 @@
+import json
+import re
+from typing import Text, Optional, List
+
+from stockstalker.common.logging import log
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.util.helpers import format_price
+
+LD_JSON_PATTERN = re.compile(
+    r'<script[^>]*type=["\']application/ld\+json["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL
+)
+# schema.org availability values that mean the item can be added to the cart right now, the same rule the HTML parsers
+# apply to the buy button.  PreOrder and BackOrder pages show a different button and count as out of stock
+IN_STOCK_AVAILABILITY = {'InStock', 'LimitedAvailability', 'OnlineOnly'}
+
+
+def get_product_from_ld_json(page_source: Text, url: Text = None) -> Optional[ProductInfo]:
+    """
+    Build product info from the schema.org Product embedded in a page as ld+json, without building a DOM.
+    :rtype: Optional[ProductInfo]
+    :param page_source: Raw page source
+    :param url: URL of the page
+    :return: Product info or None if the page has no Product with a stated availability
+    """
+    for match in LD_JSON_PATTERN.finditer(page_source):
+        product_info = get_product_from_json(match.group(1), url=url)
+        if product_info:
+            return product_info
+
+
+def get_product_from_json(json_text: Text, url: Text = None) -> Optional[ProductInfo]:
+    """
+    Build product info from the contents of a single ld+json script
+    :rtype: Optional[ProductInfo]
+    :return: Product info or None if the script has no Product with a stated availability
+    """
+    if '"Product"' not in json_text:
+        return None
+    try:
+        data = json.loads(json_text)
+    except ValueError:
+        log.debug('Failed to decode ld+json on %s', url)
+        return None
+    product = next((d for d in _as_list(data) if isinstance(d, dict) and d.get('@type') == 'Product'), None)
+    return _build_product_info(product, url) if product else None
+
+
+def _build_product_info(product: dict, url: Text = None) -> Optional[ProductInfo]:
+    offers = [o for o in _as_list(product.get('offers')) if isinstance(o, dict) and o.get('availability')]
+    if not offers or not product.get('name'):
+        return None
+    availability = [o['availability'].rsplit('/', 1)[-1] for o in offers]
+    price = next((o.get('price') or o.get('lowPrice') for o in offers if o.get('price') or o.get('lowPrice')), None)
+    return ProductInfo(
+        title=product['name'].strip(),
+        url=url,
+        in_stock=any(a in IN_STOCK_AVAILABILITY for a in availability),
+        price=format_price(price),
+        sku=str(product['sku']) if product.get('sku') else None
+    )
+
+
+def _as_list(value) -> List:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
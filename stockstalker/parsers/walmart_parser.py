@@ -1,20 +1,35 @@
 import random
 from typing import Text, List, Dict, NoReturn, Optional
 
-import requests
-from bs4 import BeautifulSoup, Tag
-from requests import Timeout
+from bs4 import BeautifulSoup, Tag, SoupStrainer
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 
 from stockstalker.common.logging import log
+from stockstalker.parsers.extraction_spec import ExtractionSpec, FieldSpec
 from stockstalker.parsers.parser_base import ParserBase
 from stockstalker.models.product_info import ProductInfo
 from stockstalker.services.notification_svc import NotificationSvc
 from stockstalker.util.constants import USER_AGENTS
 
 
+def _get_full_url(url: Text) -> Text:
+    if 'walmart.com' not in url:
+        url = 'https://walmart.com/' + url
+    return url
+
+
 class WalmartParser(ParserBase):
+    search_page_region = SoupStrainer('div', {'class': 'search-result-listview-items'})
+    search_result_spec = ExtractionSpec({
+        'title': FieldSpec('a.product-title-link'),
+        'url': FieldSpec('a.product-title-link', lambda a: _get_full_url(a['href'])),
+        # Only the first button of a result is the add to cart button
+        'in_stock': FieldSpec('button', lambda btn: 'add to cart' in btn.text.lower(), default=False),
+        'price': FieldSpec('span.price-main-block span.price-group'),
+    })
+    product_page_json = True
+    product_page_regions = ['h1.prod-ProductTitle', 'div#product-overview', 'section.prod-PriceSection']
 
     def __init__(
             self,
@@ -23,74 +38,44 @@ class WalmartParser(ParserBase):
             search_pages: List[Text] = None,
             product_pages: List[Text] = None,
             ignore_urls=None,
-            ignore_title_keywords=None
+            ignore_title_keywords=None,
+            **kwargs
     ):
         options = Options()
         options.add_argument('--headless')
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-gpu')
         #self.web_driver = webdriver.Chrome(options=options)
-        super().__init__(notification_svc, name, search_pages, product_pages, ignore_urls, ignore_title_keywords)
-
-    def check_product_pages(self) -> List[ProductInfo]:
-        all_results = []
-        for url in self.product_pages:
-            log.info('Checking product page: %s', url)
-            page_source = self._load_page(url)
-            page = BeautifulSoup(page_source, 'html.parser')
-
-            result = self.parse_product_page(page)
-            if result:
-                result.url = url
-                all_results.append(result)
-        return all_results
-
-    def _load_page(self, url: Text) -> Optional[Text]:
-        try:
-            headers = {'User-Agent': random.choice(USER_AGENTS)}
-            r = requests.get(url, headers=headers, cookies={'next-day': 'null|true|true|null|1608350760'})
-        except (ConnectionError, Timeout):
-            log.error('Failed to load URL: %s', url)
-            return
-        if r.status_code != 200:
-            log.error('Unexpected Status Code %s for URL %s', r.status_code, url)
-            return
-        return r.text
+        super().__init__(notification_svc, name, search_pages, product_pages, ignore_urls, ignore_title_keywords,
+                         **kwargs)
+
+    def _load_page(
+            self,
+            url: Text,
+            user_agent=None,
+            cookies=None,
+            regions: List[Text] = None,
+            cache_validators: bool = True
+    ) -> Optional[Text]:
+        return super()._load_page(
+            url,
+            user_agent=user_agent or random.choice(USER_AGENTS),
+            cookies=cookies or {'next-day': 'null|true|true|null|1608350760'},
+            regions=regions,
+            cache_validators=cache_validators
+        )
 
     def _get_price_from_search_result(self, item: Tag) -> Optional[Text]:
-        price_block = item.find('span', {'class': 'price-main-block'})
-        if not price_block:
-            log.error('Failed to find price Block')
-            return
-        price_group = price_block.find('span', {'class', 'price-group'})
-        if not price_group:
-            log.error('Failed to find price group')
-            return
-        return price_group.text
+        return self.search_result_spec.extract_field(item, 'price')
 
     def _is_in_stock_search_result(self, item: Tag) -> bool:
-        for btn in item.findAll('button'):
-            if 'add to cart' in btn.text.lower():
-                return True
-            return False
+        return self.search_result_spec.extract_field(item, 'in_stock')
 
     def _get_title_from_search_result(self, item: Tag) -> Optional[Text]:
-        title_link_a = item.find('a', {'class': 'product-title-link'})
-        if not title_link_a:
-            log.error('Failed to find title link')
-            return
-        return title_link_a.text
+        return self.search_result_spec.extract_field(item, 'title')
 
     def _get_url_from_search_result(self, item: Tag) -> Optional[Text]:
-        title_link_a = item.find('a', {'class': 'product-title-link'})
-        if not title_link_a:
-            log.error('Failed to find title link')
-            return
-        link = title_link_a['href']
-        if 'walmart.com' not in link:
-            link = 'https://walmart.com/' + link
-
-        return link
+        return self.search_result_spec.extract_field(item, 'url')
 
     def _get_title_from_product_page(self, page: BeautifulSoup) -> Optional[Text]:
         title_box = page.find('h1', {'class': 'prod-ProductTitle'})
@@ -0,0 +1,204 @@
+import dataclasses
+import json
+import socketserver
+import threading
+import time
+from typing import List, Text, Dict, Any, NoReturn, Tuple
+
+from stockstalker.common.logging import log
+from stockstalker.models.parser_config import ParserConfig
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.models.url_task import UrlTask
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.util.constants import SEARCH_PAGE, PRODUCT_PAGE
+
+
+class Coordinator:
+    """
+    Hands out leases on the URLs of every parser to worker processes and sends the notifications for the results
+    they report.  Workers connect over TCP and speak one JSON object per line.
+
+    A lease gives one worker a URL for lease_time seconds.  If the worker doesn't report back in time the URL is
+    leased to another worker.  Results for a lease that was handed to someone else are dropped, so a URL is only
+    counted once per run.  Notifications are only sent from the coordinator, through the parsers' shared
+    notification service, so workers can never double notify.
+
+    With repeat set, each URL is leased again once its poll interval has passed since it last completed
+    """
+
+    def __init__(
+            self,
+            configs: List[ParserConfig],
+            parsers: List[ParserBase],
+            host: Text = '127.0.0.1',
+            port: int = 0,
+            lease_time: float = 120,
+            repeat: bool = False,
+            max_wait: float = 5,
+            host_rate: float = 2,
+            host_burst: int = 4
+    ):
+        """
+        :param configs: Configs sent to workers so they can build the same parsers
+        :param parsers: Parsers built from configs, in the same order.  Used to notify about results
+        :param host: Address to listen on
+        :param port: Port to listen on.  Any free port if 0
+        :param lease_time: Seconds a worker has to report a URL's results
+        :param repeat: Keep leasing URLs on their poll interval instead of stopping after one run of each
+        :param max_wait: Longest a worker is told to wait before asking for work again
+        :param host_rate: Requests per second to each host a worker's rate limiter starts at
+        :param host_burst: Requests a worker may make to a host at once
+        """
+        if len(configs) != len(parsers):
+            raise ValueError('Every config needs a matching parser')
+        self.configs = configs
+        self.parsers = parsers
+        self.lease_time = lease_time
+        self.repeat = repeat
+        self.max_wait = max_wait
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.tasks: List[UrlTask] = []
+        for index, parser in enumerate(parsers):
+            for page_type, urls in ((SEARCH_PAGE, parser.search_pages), (PRODUCT_PAGE, parser.product_pages)):
+                for url in urls:
+                    self.tasks.append(UrlTask(len(self.tasks), index, url, page_type))
+        self.tasks_by_lease: Dict[int, UrlTask] = {}
+        self._next_lease_id = 1
+        self._lock = threading.Lock()
+        self._finished = threading.Condition(self._lock)
+        self._stopped = False
+        self.server = _CoordinatorServer((host, port), _CoordinatorHandler, self)
+        self._server_thread = None
+
+    @property
+    def address(self) -> Tuple[Text, int]:
+        return self.server.server_address[:2]
+
+    def start(self) -> NoReturn:
+        self._server_thread = threading.Thread(target=self.server.serve_forever, name='coordinator', daemon=True)
+        self._server_thread.start()
+        log.info('Coordinator listening on %s:%s with %s URLs', *self.address, len(self.tasks))
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait until every URL has been checked at least once
+        :rtype: bool
+        :return: False if the timeout ran out first
+        """
+        with self._finished:
+            return self._finished.wait_for(lambda: all(task.runs for task in self.tasks), timeout=timeout)
+
+    def shutdown(self) -> NoReturn:
+        """
+        Tell workers to stop on their next lease request and stop listening
+        """
+        with self._lock:
+            self._stopped = True
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_worker_configs(self) -> List[Dict[Text, Any]]:
+        # Workers only report results, so they never need the notification agents and their webhook URLs
+        return [dict(dataclasses.asdict(config), notification_agents=[]) for config in self.configs]
+
+    def lease(self, worker: Text, max_leases: int = 1, now: float = None) -> Dict[Text, Any]:
+        """
+        Lease up to max_leases URLs that are due to a worker
+        :param worker: ID of the worker asking
+        :param max_leases: Most URLs to hand out
+        :param now: Current time.  Defaults to time.monotonic()
+        :return: Leases and how long to wait before asking again when none are due, or done when stopped
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if self._stopped or (not self.repeat and all(task.runs for task in self.tasks)):
+                return {'done': True}
+            leases = []
+            for task in self.tasks:
+                if len(leases) >= max_leases:
+                    break
+                if task.next_run > now or (task.worker and task.lease_expires > now):
+                    continue
+                if task.worker:
+                    log.warning('Lease on %s held by %s expired.  Leasing again', task.url, task.worker)
+                    self.tasks_by_lease.pop(task.lease_id, None)
+                task.worker = worker
+                task.lease_expires = now + self.lease_time
+                task.lease_id = self._next_lease_id
+                self._next_lease_id += 1
+                self.tasks_by_lease[task.lease_id] = task
+                leases.append({
+                    'lease': task.lease_id,
+                    'parser': task.parser_index,
+                    'url': task.url,
+                    'page_type': task.page_type,
+                })
+            if leases:
+                log.debug('Leased %s URLs to %s', len(leases), worker)
+                return {'leases': leases, 'lease_time': self.lease_time}
+            return {'leases': [], 'wait': self._get_wait(now)}
+
+    def complete(self, worker: Text, lease_id: int, results: List[ProductInfo], now: float = None) -> bool:
+        """
+        Record the results of a leased URL and send notifications for them
+        :rtype: bool
+        :return: False if the lease is no longer held by the worker and the results were dropped
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            task = self.tasks_by_lease.pop(lease_id, None)
+            if not task or task.worker != worker or task.lease_id != lease_id:
+                log.warning('Dropping results from %s for lease %s it no longer holds', worker, lease_id)
+                return False
+            parser = self.parsers[task.parser_index]
+            task.worker = None
+            task.runs += 1
+            task.next_run = now + parser.get_poll_interval(task.url, task.page_type) if self.repeat else float('inf')
+            self._finished.notify_all()
+        parser.notify_in_stock(results)
+        return True
+
+    def _get_wait(self, now: float) -> float:
+        # Check back before a lease can expire or a URL is due.  Leased URLs may also finish and end the run early
+        next_times = [task.lease_expires if task.worker else task.next_run for task in self.tasks]
+        if not next_times:
+            return self.max_wait
+        return min(max(min(next_times) - now, 0.1), self.max_wait)
+
+    def handle_message(self, message: Dict[Text, Any]) -> Dict[Text, Any]:
+        op = message.get('op')
+        worker = message.get('worker', 'unknown')
+        if op == 'hello':
+            log.info('Worker %s connected', worker)
+            return {'configs': self.get_worker_configs(), 'host_rate': self.host_rate, 'host_burst': self.host_burst}
+        if op == 'lease':
+            return self.lease(worker, max_leases=message.get('max', 1))
+        if op == 'result':
+            results = [ProductInfo(**result) for result in message.get('results', [])]
+            return {'ok': self.complete(worker, message['lease'], results)}
+        return {'error': f'Unknown op {op}'}
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[Text, int], handler, coordinator: Coordinator):
+        self.coordinator = coordinator
+        super().__init__(address, handler)
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+
+    def handle(self) -> NoReturn:
+        for line in self.rfile:
+            try:
+                response = self.server.coordinator.handle_message(json.loads(line))
+            except Exception as e:
+                log.exception('Bad message from worker', exc_info=True)
+                response = {'error': str(e)}
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
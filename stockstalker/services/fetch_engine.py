@@ -0,0 +1,129 @@
+import threading
+from collections import deque, Counter
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+from typing import List, Text, Dict, NoReturn, Iterator, Tuple
+
+from stockstalker.common.logging import log
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.util.constants import SEARCH_PAGE, PRODUCT_PAGE
+
+
+class FetchEngine:
+    """
+    Checks the search and product pages of many parsers concurrently.
+
+    max_workers caps the number of pages in flight across all parsers.  max_per_retailer caps the pages in flight
+    for parsers sharing the same name, so one large watch list can't starve the others or hammer a single site
+    """
+
+    def __init__(self, max_workers: int = 16, max_per_retailer: int = 4):
+        if max_workers < 1 or max_per_retailer < 1:
+            raise ValueError('max_workers and max_per_retailer must be at least 1')
+        self.max_workers = max_workers
+        self.max_per_retailer = max_per_retailer
+        self._retailer_semaphores: Dict[Text, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def check_stock(self, parsers: List[ParserBase]) -> NoReturn:
+        """
+        Notify about each page's results as soon as the page is checked.  Nothing is kept once it has been notified.
+        History of everything sent during the sweep is written together at the end
+        """
+        with ExitStack() as stack:
+            for notification_svc in {id(p.notification_svc): p.notification_svc for p in parsers}.values():
+                stack.enter_context(notification_svc.batch())
+            for parser, results in self.stream(parsers):
+                parser.notify_in_stock(results)
+
+    def sweep(self, parsers: List[ParserBase]) -> Dict[ParserBase, List[ProductInfo]]:
+        """
+        Check every search and product page of the given parsers.
+        :rtype: Dict[ParserBase, List[ProductInfo]]
+        :param parsers: Parsers to check
+        :return: Results keyed by the parser that produced them
+        """
+        results = {parser: [] for parser in parsers}
+        for parser, page_results in self.stream(parsers):
+            results[parser] += page_results
+        log.info('Sweep checked %s parsers and found %s results', len(parsers), sum(len(r) for r in results.values()))
+        return results
+
+    def stream(self, parsers: List[ParserBase]) -> Iterator[Tuple[ParserBase, List[ProductInfo]]]:
+        """
+        Check every search and product page of the given parsers, yielding each page's results as it finishes.
+
+        New pages are only started while the caller is consuming results, so no more than max_workers pages are ever
+        in flight or waiting to be consumed.  A slow consumer slows the fetching down instead of piling up results
+        :rtype: Iterator[Tuple[ParserBase, List[ProductInfo]]]
+        :param parsers: Parsers to check
+        :return: Parser and the results of one of its pages
+        """
+        pending = {}
+        for parser in parsers:
+            tasks = pending.setdefault(self._retailer_key(parser), deque())
+            tasks.extend((parser, partial(self.check_url, parser, url, SEARCH_PAGE)) for url in parser.search_pages)
+            tasks.extend(
+                (parser, partial(self.check_batch, parser, urls))
+                for urls in parser.get_product_batches(parser.product_pages)
+            )
+
+        in_flight = Counter()
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='fetch') as executor:
+            while pending or futures:
+                # Round robin across retailers so each one gets a share of the workers
+                for retailer in list(pending):
+                    tasks = pending[retailer]
+                    while tasks and in_flight[retailer] < self.max_per_retailer and len(futures) < self.max_workers:
+                        parser, check = tasks.popleft()
+                        futures[executor.submit(check)] = (retailer, parser)
+                        in_flight[retailer] += 1
+                    if not tasks:
+                        del pending[retailer]
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    retailer, parser = futures.pop(future)
+                    in_flight[retailer] -= 1
+                    yield parser, future.result()
+
+    def check_url(self, parser: ParserBase, url: Text, page_type: Text) -> List[ProductInfo]:
+        """
+        Run a single page check while holding a slot for the parser's retailer.  Failures are logged and give no results
+        :rtype: List[ProductInfo]
+        :param parser: Parser that owns the URL
+        :param url: URL to check
+        :param page_type: SEARCH_PAGE or PRODUCT_PAGE
+        """
+        with self._get_retailer_semaphore(self._retailer_key(parser)):
+            try:
+                return parser.check_page(url, page_type)
+            except Exception:
+                log.exception('Failed to check %s', url, exc_info=True)
+                return []
+
+    def check_batch(self, parser: ParserBase, urls: List[Text]) -> List[ProductInfo]:
+        """
+        Check a batch of product pages while holding a single slot for the parser's retailer
+        :rtype: List[ProductInfo]
+        """
+        if len(urls) == 1:
+            return self.check_url(parser, urls[0], PRODUCT_PAGE)
+        with self._get_retailer_semaphore(self._retailer_key(parser)):
+            try:
+                return parser.check_product_batch(urls)
+            except Exception:
+                log.exception('Failed to check batch of %s product pages', len(urls), exc_info=True)
+                return []
+
+    def _get_retailer_semaphore(self, retailer: Text) -> threading.BoundedSemaphore:
+        with self._lock:
+            if retailer not in self._retailer_semaphores:
+                self._retailer_semaphores[retailer] = threading.BoundedSemaphore(self.max_per_retailer)
+            return self._retailer_semaphores[retailer]
+
+    @staticmethod
+    def _retailer_key(parser: ParserBase) -> Text:
+        return parser.name.lower()
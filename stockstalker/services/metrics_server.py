@@ -0,0 +1,59 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Text, Tuple, NoReturn
+
+from stockstalker.common.logging import log
+from stockstalker.common.metrics import MetricsRegistry, registry as default_registry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsServer:
+    """
+    Serves the metrics registry at /metrics in the Prometheus text format
+    """
+
+    def __init__(self, host: Text = '0.0.0.0', port: int = 9100, registry: MetricsRegistry = None):
+        self.registry = registry or default_registry
+        self.server = _MetricsHttpServer((host, port), _MetricsHandler, self.registry)
+        self._server_thread = None
+
+    @property
+    def address(self) -> Tuple[Text, int]:
+        return self.server.server_address[:2]
+
+    def start(self) -> NoReturn:
+        self._server_thread = threading.Thread(target=self.server.serve_forever, name='metrics', daemon=True)
+        self._server_thread.start()
+        log.info('Serving metrics on http://%s:%s/metrics', *self.address)
+
+    def shutdown(self) -> NoReturn:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _MetricsHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[Text, int], handler, registry: MetricsRegistry):
+        self.registry = registry
+        super().__init__(address, handler)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self) -> NoReturn:
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: Text, *args) -> NoReturn:
+        # Scrapes every few seconds would flood the log
+        log.debug('Metrics request from %s: %s', self.address_string(), format % args)
@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+from typing import Text, Dict, List, NoReturn, Callable
+
+from stockstalker.common.exceptions import NotificationDeliveryFailed
+from stockstalker.common.logging import log
+from stockstalker.models.queued_notification import QueuedNotification
+from stockstalker.notifyagents.notification_agent import NotificationAgent
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """
+    Delivers notifications from background workers so a slow agent never holds up a stock check.
+
+    Each agent gets its own queue and workers.  A worker waits up to batch_window seconds after the first notification
+    it picks up for more to arrive, then hands them all to the agent in one send_batch call.  Failed deliveries are
+    retried with exponential backoff.  Messages the agent reports as delivered before a failure are not sent again
+    """
+
+    def __init__(
+            self,
+            workers_per_agent: int = 1,
+            batch_window: float = 2,
+            max_batch: int = 10,
+            max_retries: int = 3,
+            retry_backoff: float = 2
+    ):
+        if workers_per_agent < 1 or max_batch < 1:
+            raise ValueError('workers_per_agent and max_batch must be at least 1')
+        self.workers_per_agent = workers_per_agent
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queues: Dict[NotificationAgent, queue.Queue] = {}
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopped = False
+
+    def submit(
+            self,
+            agent: NotificationAgent,
+            message: Text,
+            identifier: Text,
+            on_done: Callable[[List[Text], bool], None]
+    ) -> NoReturn:
+        """
+        Queue a notification for delivery by an agent
+        :param agent: Agent to deliver with
+        :param message: Message to send
+        :param identifier: Identifier the message is about
+        :param on_done: Called from a worker with the identifiers of a delivery and whether they were delivered.  Called
+        once per delivery with every identifier that was submitted with it
+        """
+        self._get_queue(agent).put(QueuedNotification(message, identifier, on_done))
+
+    def shutdown(self, wait: bool = True) -> NoReturn:
+        """
+        Stop the workers once they have delivered everything already queued
+        """
+        with self._lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            for agent_queue in self._queues.values():
+                for _ in range(self.workers_per_agent):
+                    agent_queue.put(_STOP)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _get_queue(self, agent: NotificationAgent) -> queue.Queue:
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError('Notification dispatcher has been shut down')
+            if agent not in self._queues:
+                self._queues[agent] = queue.Queue()
+                for i in range(self.workers_per_agent):
+                    worker = threading.Thread(
+                        target=self._run_worker,
+                        args=(agent, self._queues[agent]),
+                        name=f'notify-{agent.name}-{i}',
+                        daemon=True
+                    )
+                    worker.start()
+                    self._workers.append(worker)
+            return self._queues[agent]
+
+    def _run_worker(self, agent: NotificationAgent, agent_queue: queue.Queue) -> NoReturn:
+        while True:
+            notification = agent_queue.get()
+            if notification is _STOP:
+                return
+            batch = [notification]
+            stop = False
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    notification = agent_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if notification is _STOP:
+                    stop = True
+                    break
+                batch.append(notification)
+            self._deliver(agent, batch)
+            if stop:
+                return
+
+    def _deliver(self, agent: NotificationAgent, batch: List[QueuedNotification]) -> NoReturn:
+        remaining = batch
+        for attempt in range(self.max_retries + 1):
+            try:
+                log.info('Sending %s notifications to %s', len(remaining), agent.name)
+                agent.send_batch([notification.message for notification in remaining])
+                self._finish(remaining, True)
+                return
+            except Exception as e:
+                log.exception('Failed to send notifications to %s', agent.name, exc_info=True)
+                delivered = e.delivered if isinstance(e, NotificationDeliveryFailed) else 0
+                if delivered:
+                    # Only retry what the agent didn't get through
+                    self._finish(remaining[:delivered], True)
+                    remaining = remaining[delivered:]
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_backoff * 2 ** attempt)
+        log.error('Giving up on %s notifications to %s', len(remaining), agent.name)
+        self._finish(remaining, False)
+
+    @staticmethod
+    def _finish(batch: List[QueuedNotification], delivered: bool) -> NoReturn:
+        # One call per callback so its owner can record the whole delivery at once
+        identifiers_by_callback: Dict[Callable, List[Text]] = {}
+        for notification in batch:
+            identifiers_by_callback.setdefault(notification.on_done, []).append(notification.identifier)
+        for on_done, identifiers in identifiers_by_callback.items():
+            try:
+                on_done(identifiers, delivered)
+            except Exception:
+                log.exception('Failed to record notifications %s', ', '.join(identifiers), exc_info=True)
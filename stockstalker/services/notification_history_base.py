@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from typing import Text
 
 
@@ -18,3 +19,15 @@ class NotificationHistoryBase:
     def has_been_notified(self, identifier: Text):
         raise NotImplementedError
 
+    @contextmanager
+    def batch(self):
+        """
+        Group the history added inside the block so backends that support it can write it all at once
+        """
+        yield
+
+    def flush(self):
+        """
+        Write any history a backend is holding back
+        """
+        pass
@@ -1,5 +1,5 @@
 import os
-from typing import Text
+from typing import Text, Set
 
 from stockstalker.common.logging import log
 from stockstalker.services.notification_history_base import NotificationHistoryBase
@@ -7,12 +7,10 @@ from stockstalker.services.notification_history_base import NotificationHistoryB
 
 class NotificationHistoryFile(NotificationHistoryBase):
 
-    def remove_history(self, identifier: Text):
-        raise NotImplementedError
-
     def __init__(self, history_file_name: Text):
         self.history_file_name = history_file_name
-        self.sent_notifications = []
+        # Set so lookups stay constant time no matter how large the history file gets
+        self.sent_notifications: Set[Text] = set()
         super().__init__()
         self._load_history()
 
@@ -22,17 +20,31 @@ class NotificationHistoryFile(NotificationHistoryBase):
             return
         with open(self.history_file_name, 'r') as f:
             for line in f:
-                self.sent_notifications.append(line.strip('\n'))
+                identifier = line.strip('\n')
+                if identifier:
+                    self.sent_notifications.add(identifier)
         log.info('Loaded %s notifications from history', len(self.sent_notifications))
 
     def add_history(self, identifier: Text):
+        if identifier in self.sent_notifications:
+            log.debug('Identifier %s already in notification history', identifier)
+            return
         with open(self.history_file_name, 'a') as f:
             f.write(identifier + '\n')
             log.debug('Added 1 entry to notification history with identifer %s', identifier)
+        self.sent_notifications.add(identifier)
+
+    def remove_history(self, identifier: Text):
+        if identifier not in self.sent_notifications:
+            return
+        self.sent_notifications.discard(identifier)
+        with open(self.history_file_name, 'w') as f:
+            f.writelines(sent + '\n' for sent in self.sent_notifications)
 
     def clear_history(self):
-        with open(self.history_file_name, 'a') as f:
+        with open(self.history_file_name, 'w') as f:
             f.truncate()
+        self.sent_notifications.clear()
 
     def has_been_notified(self, identifier: Text):
         return identifier in self.sent_notifications
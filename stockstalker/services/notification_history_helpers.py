@@ -0,0 +1,49 @@
+from typing import Text, Optional
+
+from stockstalker.services.notification_history_base import NotificationHistoryBase
+from stockstalker.services.notification_history_file import NotificationHistoryFile
+from stockstalker.services.notification_history_sqlite import NotificationHistorySqlite
+
+
+def notification_history_factory(
+        backend: Text,
+        path: Text = None,
+        ttl: Optional[float] = None,
+        flush_interval: float = 0
+) -> NotificationHistoryBase:
+    """
+    Build a notification history by backend name
+    :rtype: NotificationHistoryBase
+    :param backend: Name of the backend, file or sqlite
+    :param path: Where the history is stored.  Defaults to history.log or history.db in the working directory
+    :param ttl: Seconds before an item can be notified about again.  Only supported by sqlite
+    :param flush_interval: Seconds new history may be held so it is written in groups.  Only used by sqlite, the file
+    backend appends each entry as it is added
+    """
+    if backend.lower() not in HISTORY_BACKEND_MAP:
+        raise ValueError(f'Cannot locate notification history backend {backend}')
+    return HISTORY_BACKEND_MAP[backend.lower()](path, ttl, flush_interval)
+
+
+def get_file_history(
+        path: Text = None,
+        ttl: Optional[float] = None,
+        flush_interval: float = 0
+) -> NotificationHistoryFile:
+    if ttl is not None:
+        raise ValueError('The file notification history does not support a TTL')
+    return NotificationHistoryFile(path or 'history.log')
+
+
+def get_sqlite_history(
+        path: Text = None,
+        ttl: Optional[float] = None,
+        flush_interval: float = 0
+) -> NotificationHistorySqlite:
+    return NotificationHistorySqlite(path or 'history.db', ttl=ttl, flush_interval=flush_interval)
+
+
+HISTORY_BACKEND_MAP = {
+    'file': get_file_history,
+    'sqlite': get_sqlite_history,
+}
@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Text, Dict, Optional
+
+from stockstalker.common.logging import log
+from stockstalker.services.notification_history_base import NotificationHistoryBase
+
+
+class NotificationHistorySqlite(NotificationHistoryBase):
+    """
+    Notification history kept in a SQLite database.  Lookups hit the primary key index instead of loading the whole
+    history into memory.
+
+    With a TTL set, an entry older than the TTL no longer counts as notified, so an item that sells out and restocks
+    later alerts again.  Expired entries are deleted by compact, which runs on its own every compact_interval seconds.
+
+    History added outside a batch is written straight away unless flush_interval is set, in which case it is held and
+    written together at most flush_interval seconds later.  Held entries still count as notified
+    """
+
+    def __init__(
+            self,
+            db_path: Text,
+            ttl: Optional[float] = None,
+            compact_interval: float = 3600,
+            flush_interval: float = 0,
+            flush_size: int = 500
+    ):
+        """
+        :param db_path: Path of the database file.  Created if it doesn't exist
+        :param ttl: Seconds an entry counts as notified.  Entries never expire if not set
+        :param compact_interval: Seconds between automatic removal of expired entries
+        :param flush_interval: Seconds history added outside a batch may be held before it is written
+        :param flush_size: Held history is written once this many entries are waiting, even inside a batch
+        """
+        super().__init__()
+        self.db_path = db_path
+        self.ttl = ttl
+        self.compact_interval = compact_interval
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._flush_timer: Optional[threading.Timer] = None
+        self._pending: Dict[Text, float] = {}
+        self._batch_depth = 0
+        self._last_compact = time.monotonic()
+        self._lock = threading.RLock()
+        # Pages are checked from several threads, the lock keeps them from using the connection at the same time
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS notification_history '
+                '(identifier TEXT PRIMARY KEY, notified_at REAL NOT NULL)'
+            )
+        log.info('Using notification history database %s', db_path)
+
+    def add_history(self, identifier: Text):
+        with self._lock:
+            self._pending[identifier] = time.time()
+            if len(self._pending) >= self.flush_size:
+                self._flush()
+            elif not self._batch_depth:
+                self._schedule_flush()
+        log.debug('Added 1 entry to notification history with identifer %s', identifier)
+
+    def remove_history(self, identifier: Text):
+        with self._lock:
+            self._pending.pop(identifier, None)
+            with self.conn:
+                self.conn.execute('DELETE FROM notification_history WHERE identifier = ?', (identifier,))
+
+    def clear_history(self):
+        with self._lock:
+            self._pending.clear()
+            with self.conn:
+                self.conn.execute('DELETE FROM notification_history')
+
+    def has_been_notified(self, identifier: Text):
+        with self._lock:
+            notified_at = self._pending.get(identifier)
+            if notified_at is None:
+                row = self.conn.execute(
+                    'SELECT notified_at FROM notification_history WHERE identifier = ?', (identifier,)
+                ).fetchone()
+                if not row:
+                    return False
+                notified_at = row[0]
+        return not self._is_expired(notified_at, time.time())
+
+    @contextmanager
+    def batch(self):
+        """
+        Hold history added inside the block and insert it in a single transaction when the block exits
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._flush()
+
+    def compact(self) -> int:
+        """
+        Delete expired entries and reclaim their space
+        :rtype: int
+        :return: Number of entries deleted
+        """
+        with self._lock:
+            self._last_compact = time.monotonic()
+            if self.ttl is None:
+                return 0
+            with self.conn:
+                deleted = self.conn.execute(
+                    'DELETE FROM notification_history WHERE notified_at < ?', (time.time() - self.ttl,)
+                ).rowcount
+            if deleted:
+                self.conn.execute('VACUUM')
+            log.info('Removed %s expired entries from notification history', deleted)
+            return deleted
+
+    def flush(self):
+        """
+        Write any held history now
+        """
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self.conn.close()
+
+    def _schedule_flush(self):
+        if self.flush_interval <= 0:
+            self._flush()
+        elif not self._flush_timer:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush(self):
+        if self._flush_timer:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._pending:
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO notification_history (identifier, notified_at) VALUES (?, ?)',
+                    self._pending.items()
+                )
+            log.debug('Wrote %s entries to notification history', len(self._pending))
+            self._pending.clear()
+        if time.monotonic() - self._last_compact >= self.compact_interval:
+            self.compact()
+
+    def _is_expired(self, notified_at: float, now: float) -> bool:
+        return self.ttl is not None and now - notified_at >= self.ttl
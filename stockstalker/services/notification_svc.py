@@ -1,29 +1,131 @@
-from typing import List, Text, NoReturn
+import threading
+from typing import List, Text, NoReturn, Dict, Hashable, Callable
 
+from stockstalker.common import metrics
 from stockstalker.common.logging import log
 from stockstalker.notifyagents.notification_agent import NotificationAgent
+from stockstalker.services.notification_dispatcher import NotificationDispatcher
 from stockstalker.services.notification_history_base import NotificationHistoryBase
 
 
 class NotificationSvc:
+    """
+    Sends notifications and keeps them from being sent twice.  One service is shared by every parser so they all
+    dedupe against the same history
+    """
 
-    def __init__(self, notification_history: NotificationHistoryBase):
+    def __init__(self, notification_history: NotificationHistoryBase, dispatcher: NotificationDispatcher = None):
+        """
+        :param notification_history: Record of what has already been sent
+        :param dispatcher: Delivers notifications in the background.  Agents are called inline if not set
+        """
         self.notification_history = notification_history
+        self.dispatcher = dispatcher
         self.notificaiton_agents: List[NotificationAgent] = []
+        self._agents_by_key: Dict[Hashable, NotificationAgent] = {}
+        # Identifiers queued with the dispatcher and the number of agents yet to finish with them
+        self._pending: Dict[Text, int] = {}
+        # Called once a queued identifier has finished without being delivered by any agent
+        self._on_failed: Dict[Text, List[Callable[[], None]]] = {}
+        self._lock = threading.Lock()
 
-    def send_notificaiton(self, msg: Text, identifier: Text) -> NoReturn:
-        if self.notification_history.has_been_notified(identifier):
-            log.info('Already sent notification for identifier %s', identifier)
-            return
-        for agent in self.notificaiton_agents:
-            log.info('Sending notification to %s', agent.name)
-            log.debug(msg)
-            try:
-                agent.send(msg)
-                self.notification_history.add_history(identifier)
-            except Exception as e:
-                log.exception('Failed to send notification', exc_info=True)
-
-    def register_agent(self, agent: NotificationAgent) -> NoReturn:
-        log.info('Registered notification agent %s', agent.name)
-        self.notificaiton_agents.append(agent)
\ No newline at end of file
+    def send_notificaiton(
+            self,
+            msg: Text,
+            identifier: Text,
+            agents: List[NotificationAgent] = None,
+            aliases: List[Text] = None,
+            on_failed: Callable[[], None] = None
+    ) -> NoReturn:
+        """
+        :param msg: Message to send
+        :param identifier: Identifies the item the message is about.  Recorded in history once sent
+        :param agents: Agents to send with.  Every registered agent if not set
+        :param aliases: Other identifiers the item may already be in history under
+        :param on_failed: Called if no agent delivered the message, possibly later from a dispatcher worker
+        """
+        agents = agents or self.notificaiton_agents
+        # Pages are checked from several threads.  Hold the lock so the same identifier can't be sent twice
+        with metrics.notification_seconds.time(), self._lock:
+            for known in [identifier] + (aliases or []):
+                if self.notification_history.has_been_notified(known):
+                    log.info('Already sent notification for identifier %s', known)
+                    metrics.notifications.inc('duplicate')
+                    return
+            if identifier in self._pending:
+                log.info('Notification for identifier %s is already queued', identifier)
+                metrics.notifications.inc('duplicate')
+                return
+            if self.dispatcher and agents:
+                self._pending[identifier] = len(agents)
+                if on_failed:
+                    self._on_failed[identifier] = [on_failed]
+                for agent in agents:
+                    log.debug(msg)
+                    self.dispatcher.submit(agent, msg, identifier, self._on_dispatched)
+                    metrics.notifications.inc('queued')
+                return
+            for agent in agents:
+                log.info('Sending notification to %s', agent.name)
+                log.debug(msg)
+                try:
+                    agent.send(msg)
+                    self.notification_history.add_history(identifier)
+                    metrics.notifications.inc('sent')
+                except Exception as e:
+                    log.exception('Failed to send notification to %s for %s', agent.name, identifier, exc_info=True)
+                    metrics.notifications.inc('failed')
+            delivered = self.notification_history.has_been_notified(identifier)
+        if on_failed and agents and not delivered:
+            on_failed()
+
+    def clear_notification(self, identifier: Text, aliases: List[Text] = None) -> NoReturn:
+        """
+        Forget that an item was notified about so it can be sent again
+        """
+        with self._lock:
+            for known in [identifier] + (aliases or []):
+                if self.notification_history.has_been_notified(known):
+                    log.debug('Removing %s from notification history', known)
+                    self.notification_history.remove_history(known)
+
+    def batch(self):
+        """
+        Write the history of every notification sent inside the block together
+        """
+        return self.notification_history.batch()
+
+    def register_agent(self, agent: NotificationAgent) -> NotificationAgent:
+        """
+        Register an agent.  If an agent delivering to the same place is already registered it is reused, so parsers
+        sharing a webhook also share its connection and rate limit
+        :rtype: NotificationAgent
+        :return: The registered agent to send with
+        """
+        with self._lock:
+            if agent.key in self._agents_by_key:
+                return self._agents_by_key[agent.key]
+            log.info('Registered notification agent %s', agent.name)
+            self._agents_by_key[agent.key] = agent
+            self.notificaiton_agents.append(agent)
+            return agent
+
+    def _on_dispatched(self, identifiers: List[Text], delivered: bool) -> NoReturn:
+        failed_callbacks = []
+        # Everything delivered together is written to history together
+        with self._lock, self.batch():
+            for identifier in identifiers:
+                metrics.notifications.inc('sent' if delivered else 'failed')
+                if not delivered:
+                    log.error('Notification for %s was not delivered and was not added to history', identifier)
+                elif not self.notification_history.has_been_notified(identifier):
+                    self.notification_history.add_history(identifier)
+                self._pending[identifier] -= 1
+                if not self._pending[identifier]:
+                    # Undelivered identifiers can be tried again on the next check
+                    del self._pending[identifier]
+                    callbacks = self._on_failed.pop(identifier, [])
+                    if not self.notification_history.has_been_notified(identifier):
+                        failed_callbacks += callbacks
+        for on_failed in failed_callbacks:
+            on_failed()
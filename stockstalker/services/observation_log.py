@@ -0,0 +1,208 @@
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from typing import Text, List, Dict, NoReturn, BinaryIO, Optional, Tuple
+
+from stockstalker.common.logging import log
+from stockstalker.models.observations import Observations
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.util.helpers import parse_price
+
+MAGIC = b'SSOB'
+VERSION = 1
+# Magic, version, rows in the segment, new strings in the segment
+SEGMENT_HEADER = struct.Struct('<4sHII')
+# Column order and array type codes within a segment
+COLUMNS = (('timestamps', 'd'), ('url_ids', 'I'), ('sku_ids', 'I'), ('in_stock', 'B'), ('prices', 'd'))
+NO_SKU = 0
+
+
+class ObservationLog:
+    """
+    Append only columnar log of every product observation: url, sku, time, in stock and numeric price.
+
+    Rows are buffered in typed arrays and written as segments of flush_size rows, or of whatever is buffered once
+    flush_interval seconds have passed since the last write.  Each column of a segment is stored as one zlib compressed
+    block.  URLs and SKUs are dictionary encoded, a segment carries only the strings first
+    seen in it.  Reading a column back is a single decompress into an array with no per row parsing
+    """
+
+    def __init__(self, path: Text, flush_size: int = 1000, flush_interval: float = 60):
+        """
+        :param path: Log file.  Appended to if it exists
+        :param flush_size: Rows buffered before a segment is written
+        :param flush_interval: Seconds rows may stay buffered.  Checked whenever rows are recorded
+        """
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        # Index 0 is reserved for products without a SKU
+        self.strings: List[Text] = ['']
+        self.string_ids: Dict[Text, int] = {'': NO_SKU}
+        self._buffer = self._new_buffer()
+        self._new_strings: List[Text] = []
+        self._lock = threading.Lock()
+        if os.path.isfile(path):
+            self.strings, end = self._read_strings()
+            if end < os.path.getsize(path):
+                # A kill while a segment was being written leaves part of it behind.  New segments go after the last
+                # complete one instead of after the garbage
+                log.warning('Observation log %s ends with a partial segment.  Truncating it', path)
+                os.truncate(path, end)
+            self.string_ids = {string: i for i, string in enumerate(self.strings)}
+
+    def record(self, products: List[ProductInfo], now: float = None) -> NoReturn:
+        if now is None:
+            now = time.time()
+        with self._lock:
+            for product in products:
+                if not product.url:
+                    continue
+                price = parse_price(product.price)
+                self._buffer['timestamps'].append(now)
+                self._buffer['url_ids'].append(self._get_string_id(product.url))
+                self._buffer['sku_ids'].append(self._get_string_id(product.sku.strip()) if product.sku else NO_SKU)
+                self._buffer['in_stock'].append(1 if product.in_stock else 0)
+                self._buffer['prices'].append(math.nan if price is None else price)
+            if len(self._buffer['timestamps']) >= self.flush_size:
+                self._flush()
+            elif time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush()
+
+    def flush(self) -> NoReturn:
+        with self._lock:
+            self._flush()
+
+    def read(self) -> Observations:
+        """
+        Read every complete segment in the log.  Rows still buffered in memory are not included
+        :rtype: Observations
+        """
+        observations = Observations(strings=[''])
+        if not os.path.isfile(self.path):
+            return observations
+        with open(self.path, 'rb') as f:
+            while True:
+                segment = self._read_segment(f)
+                if not segment:
+                    break
+                strings, blocks = segment
+                observations.strings += strings
+                for (name, type_code), block in zip(COLUMNS, blocks):
+                    column = array(type_code)
+                    column.frombytes(zlib.decompress(block))
+                    if sys.byteorder == 'big':
+                        column.byteswap()
+                    getattr(observations, name).extend(column)
+            if f.tell() < os.path.getsize(self.path):
+                log.warning('Observation log %s ends with a partial segment.  Ignoring it', self.path)
+        return observations
+
+    def _read_strings(self) -> Tuple[List[Text], int]:
+        """
+        Read only the string table of the log, seeking past the column blocks without decompressing them
+        :rtype: Tuple[List[Text], int]
+        :return: Strings and the offset the last complete segment ends at
+        """
+        strings = ['']
+        end = 0
+        with open(self.path, 'rb') as f:
+            while True:
+                segment = self._read_segment(f, read_columns=False)
+                if not segment:
+                    break
+                strings += segment[0]
+                end = f.tell()
+        return strings, end
+
+    def _read_segment(self, f: BinaryIO, read_columns: bool = True) -> Optional[Tuple[List[Text], List[bytes]]]:
+        """
+        Read the segment at the current position
+        :param read_columns: Read the column blocks.  They are only seeked past if not set
+        :return: Strings and column blocks of the segment.  None at the end of the log or if the segment is incomplete
+        """
+        header = f.read(SEGMENT_HEADER.size)
+        if len(header) < SEGMENT_HEADER.size:
+            return
+        magic, version, rows, string_count = SEGMENT_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{self.path} is not a version {VERSION} observation log')
+        strings = []
+        for _ in range(string_count):
+            data = self._read_block(f)
+            if data is None:
+                return
+            strings.append(data.decode())
+        blocks = []
+        for _ in COLUMNS:
+            data = self._read_block(f) if read_columns else self._skip_block(f)
+            if data is None:
+                return
+            blocks.append(data)
+        return strings, blocks
+
+    def _flush(self) -> NoReturn:
+        self._last_flush = time.monotonic()
+        rows = len(self._buffer['timestamps'])
+        if not rows:
+            return
+        with open(self.path, 'ab') as f:
+            f.write(SEGMENT_HEADER.pack(MAGIC, VERSION, rows, len(self._new_strings)))
+            for string in self._new_strings:
+                self._write_block(f, string.encode())
+            for name, _ in COLUMNS:
+                column = self._buffer[name]
+                if sys.byteorder == 'big':
+                    column.byteswap()
+                self._write_block(f, zlib.compress(column.tobytes()))
+        log.debug('Wrote %s observations to %s', rows, self.path)
+        self._buffer = self._new_buffer()
+        self._new_strings = []
+
+    def _get_string_id(self, string: Text) -> int:
+        string_id = self.string_ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(string)
+            self.string_ids[string] = string_id
+            self._new_strings.append(string)
+        return string_id
+
+    @staticmethod
+    def _new_buffer() -> Dict[Text, array]:
+        return {name: array(type_code) for name, type_code in COLUMNS}
+
+    @staticmethod
+    def _write_block(f: BinaryIO, data: bytes) -> NoReturn:
+        f.write(struct.pack('<I', len(data)))
+        f.write(data)
+
+    @staticmethod
+    def _read_block(f: BinaryIO) -> Optional[bytes]:
+        """
+        :return: The block at the current position.  None if the log ends part way through it
+        """
+        header = f.read(4)
+        if len(header) < 4:
+            return
+        size, = struct.unpack('<I', header)
+        data = f.read(size)
+        return data if len(data) == size else None
+
+    @staticmethod
+    def _skip_block(f: BinaryIO) -> Optional[bytes]:
+        """
+        Seek past the block at the current position
+        :return: Empty bytes.  None if the log ends part way through the block
+        """
+        header = f.read(4)
+        if len(header) < 4:
+            return
+        size, = struct.unpack('<I', header)
+        return b'' if f.seek(size, os.SEEK_CUR) <= os.fstat(f.fileno()).st_size else None
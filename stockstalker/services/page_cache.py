@@ -0,0 +1,52 @@
+import hashlib
+from typing import Text, Dict, Any, NoReturn, Tuple, Optional
+
+from stockstalker.models.cached_page import CachedPage
+
+
+class PageCache:
+    """
+    Per URL store of the last result parsed from a URL, along with the HTTP validators and content digest of the
+    body it was parsed from
+    """
+
+    def __init__(self):
+        self.pages: Dict[Text, CachedPage] = {}
+        self.pending_validators: Dict[Text, Tuple[Text, Text]] = {}
+
+    def get_validator_headers(self, url: Text) -> Dict[Text, Text]:
+        page = self.pages.get(url)
+        if not page:
+            return {}
+        headers = {}
+        if page.etag:
+            headers['If-None-Match'] = page.etag
+        if page.last_modified:
+            headers['If-Modified-Since'] = page.last_modified
+        return headers
+
+    def set_validators(self, url: Text, etag: Text = None, last_modified: Text = None) -> NoReturn:
+        """
+        Hold the validators of a fresh response until the result parsed from its body is stored.  Keeps a 304 from
+        ever pairing with a result parsed from a different body
+        """
+        self.pending_validators[url] = (etag, last_modified)
+
+    def set_result(self, url: Text, result: Any, digest: Text = None) -> NoReturn:
+        etag, last_modified = self.pending_validators.pop(url, (None, None))
+        self.pages[url] = CachedPage(etag=etag, last_modified=last_modified, digest=digest, result=result)
+
+    def get_result(self, url: Text) -> Any:
+        page = self.pages.get(url)
+        return page.result if page else None
+
+    def has_result(self, url: Text) -> bool:
+        return url in self.pages
+
+    def matches_digest(self, url: Text, digest: Text) -> bool:
+        page = self.pages.get(url)
+        return page is not None and page.digest == digest
+
+    @staticmethod
+    def get_digest(page_source: Text) -> Text:
+        return hashlib.blake2b(page_source.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
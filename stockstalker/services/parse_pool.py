@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Text, Any, Dict, NoReturn, Tuple, List
+
+from stockstalker.common import metrics
+from stockstalker.common.logging import log
+from stockstalker.models.parse_spec import ParseSpec
+from stockstalker.util.constants import SEARCH_PAGE, PRODUCT_PAGE
+
+# Parsers rebuilt inside a worker process, reused for every page parsed by that process
+_worker_parsers: Dict[ParseSpec, Any] = {}
+
+
+class ParsePool:
+    """
+    Parses page source in a pool of worker processes so parsing isn't limited to one core.  Pages are still fetched by
+    the caller's threads, only the source is sent to the workers and only the parsed results come back, along with the
+    build and extract timings so they are recorded in the parent's metrics
+    """
+
+    def __init__(self, processes: int = None):
+        """
+        :param processes: Number of worker processes.  One per CPU if not set
+        """
+        self.processes = processes or os.cpu_count() or 1
+        # Pages are submitted from fetch threads.  Spawn instead of forking a process that is running threads
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(log.level,)
+        )
+        log.info('Parsing pages in %s processes', self.processes)
+
+    def parse(self, spec: ParseSpec, page_type: Text, page_source: Text, url: Text = None) -> Any:
+        """
+        Parse a page in a worker process and wait for the result
+        :param spec: Parser to parse with
+        :param page_type: SEARCH_PAGE or PRODUCT_PAGE
+        :param page_source: Page to parse
+        :param url: URL the page was loaded from
+        :return: Whatever the parser's parse_*_source method returns
+        """
+        result, observations = self.executor.submit(parse_page_source, spec, page_type, page_source, url).result()
+        metrics.replay(observations)
+        return result
+
+    def shutdown(self, wait: bool = True) -> NoReturn:
+        self.executor.shutdown(wait=wait)
+
+
+def _init_worker(log_level: int) -> NoReturn:
+    # Spawned workers start from a fresh import, so carry over the log level set by the parent
+    log.setLevel(log_level)
+
+
+def parse_page_source(
+        spec: ParseSpec,
+        page_type: Text,
+        page_source: Text,
+        url: Text = None
+) -> Tuple[Any, List[metrics.Observation]]:
+    """
+    Runs in the worker process
+    :return: Parsed result and the metric observations made while parsing
+    """
+    parser = _worker_parsers.get(spec)
+    if parser is None:
+        parser = spec.parser_class(
+            None,
+            spec.name,
+            ignore_urls=list(spec.ignore_urls),
+            ignore_title_keywords=list(spec.ignore_title_keywords),
+            html_backend=spec.html_backend
+        )
+        _worker_parsers[spec] = parser
+    if page_type == SEARCH_PAGE:
+        parse = parser.parse_search_page_source
+    elif page_type == PRODUCT_PAGE:
+        parse = parser.parse_product_page_source
+    else:
+        raise ValueError(f'Unknown page type {page_type}')
+    with metrics.collect() as observations:
+        result = parse(page_source, url)
+    return result, observations
@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Text, Dict, Any, List
+
+from stockstalker.common.logging import log
+from stockstalker.models.poll_state import PollState
+from stockstalker.models.product_info import ProductInfo
+
+
+class AdaptivePollPolicy:
+    """
+    Works out how long to wait before checking a URL again based on how recently its results changed.
+
+    After a change the URL is polled at min_interval for hot_period seconds, then it drops back to its configured
+    interval.  Once nothing has changed for quiet_period seconds the interval grows by backoff on every check, up to
+    max_interval
+    """
+
+    def __init__(
+            self,
+            min_interval: float = 15,
+            max_interval: float = 3600,
+            backoff: float = 1.5,
+            hot_period: float = 3600,
+            quiet_period: float = 86400
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.hot_period = hot_period
+        self.quiet_period = quiet_period
+        self.states: Dict[Text, PollState] = {}
+        self._lock = threading.Lock()
+
+    def next_interval(self, url: Text, base_interval: float, signature: Any, now: float = None) -> float:
+        """
+        Record the latest signature for a URL and get the interval until its next check
+        :rtype: float
+        :param url: URL that was checked
+        :param base_interval: Configured interval of the URL
+        :param signature: Anything that compares equal when the URL's results have not changed
+        :param now: Current time, for tests
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            state = self.states.get(url)
+            if not state:
+                self.states[url] = PollState(signature=signature, interval=base_interval, last_change=now)
+                return base_interval
+
+            if signature != state.signature:
+                log.info('Results changed for %s.  Polling every %ss', url, self.min_interval)
+                state.signature = signature
+                state.last_change = now
+                state.changed = True
+                state.interval = min(base_interval, self.min_interval)
+            elif state.changed and now - state.last_change < self.hot_period:
+                state.interval = min(base_interval, self.min_interval)
+            elif now - state.last_change < self.quiet_period:
+                state.interval = base_interval
+            else:
+                ceiling = max(self.max_interval, base_interval)
+                state.interval = min(max(state.interval, base_interval) * self.backoff, ceiling)
+            return state.interval
+
+    @staticmethod
+    def get_signature(results: List[ProductInfo]) -> Any:
+        """
+        Signature of a check.  Only changes when the stock or price of a result changes, so rotating tokens or ads in
+        the page body don't keep a URL polled at min_interval
+        """
+        return tuple(sorted((r.url or '', r.in_stock, r.price or '') for r in results))
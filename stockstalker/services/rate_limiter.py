@@ -0,0 +1,143 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Text, Dict, Optional
+
+from stockstalker.common.logging import log
+from stockstalker.models.host_limit import HostLimit
+
+BACKOFF_STATUS_CODES = (429, 503)
+
+
+class HostRateLimiter:
+    """
+    Token bucket rate limiter keyed by host, meant to be shared by every parser.
+
+    Each host starts at rate requests per second with room for burst requests at once.  A 429 or 503 halves the
+    host's rate and pauses it for the Retry-After time if one was sent.  Successful responses slowly raise the rate
+    back up.  After failure_threshold failures in a row the host's circuit opens and requests to it are refused for
+    cooldown seconds.  After the cool down a single trial request is let through, and the circuit only closes again
+    once it succeeds.
+
+    A request that would have to wait longer than max_wait is refused instead of holding the caller's worker, it is
+    picked up again on its next check
+    """
+
+    def __init__(
+            self,
+            rate: float = 2,
+            burst: int = 4,
+            min_rate: float = 0.05,
+            failure_threshold: int = 5,
+            cooldown: float = 300,
+            max_wait: float = 10,
+            host_rates: Dict[Text, float] = None
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self.host_rates = host_rates or {}
+        self.hosts: Dict[Text, HostLimit] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: Text) -> bool:
+        """
+        Wait until a request to the host is allowed
+        :rtype: bool
+        :param host: Host the request is going to
+        :return: False if the host's circuit is open or the wait would be longer than max_wait, and the request should
+        not be made
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                limit = self._get_host_limit(host, now)
+                if limit.open_until > now:
+                    return False
+                self._refill(limit, now)
+                wait = max(limit.blocked_until - now, 0)
+                if not wait and limit.tokens >= 1:
+                    limit.tokens -= 1
+                    if limit.half_open:
+                        # Refuse everything else until the trial request succeeds or another cool down has passed
+                        log.info('Cool down of %s is over.  Sending a trial request', host)
+                        limit.open_until = now + self.cooldown
+                    return True
+                if not wait:
+                    wait = (1 - limit.tokens) / limit.rate
+                if wait > self.max_wait:
+                    log.warning('%s is paused for another %.1fs.  Not waiting', host, wait)
+                    return False
+            time.sleep(wait)
+
+    def on_response(self, host: Text, status_code: int, retry_after: Optional[Text] = None) -> None:
+        with self._lock:
+            now = time.monotonic()
+            limit = self._get_host_limit(host, now)
+            if status_code in BACKOFF_STATUS_CODES:
+                limit.rate = max(limit.rate / 2, self.min_rate)
+                delay = self._parse_retry_after(retry_after)
+                limit.blocked_until = max(limit.blocked_until, now + (delay if delay is not None else 1 / limit.rate))
+                log.warning('Got %s from %s.  Slowing to %.2f requests per second', status_code, host, limit.rate)
+                self._add_failure(host, limit, now)
+            elif status_code >= 500:
+                self._add_failure(host, limit, now)
+            else:
+                limit.failures = 0
+                if limit.half_open:
+                    log.info('%s is responding again', host)
+                    limit.half_open = False
+                    limit.open_until = 0
+                max_rate = self.host_rates.get(host, self.rate)
+                limit.rate = min(limit.rate + max_rate / 10, max_rate)
+
+    def on_failure(self, host: Text) -> None:
+        """
+        Record a request that failed without a response, such as a connection error or time out
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._add_failure(host, self._get_host_limit(host, now), now)
+
+    def is_open(self, host: Text) -> bool:
+        with self._lock:
+            limit = self.hosts.get(host)
+            return bool(limit and limit.open_until > time.monotonic())
+
+    def _add_failure(self, host: Text, limit: HostLimit, now: float) -> None:
+        limit.failures += 1
+        if limit.failures >= self.failure_threshold:
+            log.error('%s failed %s times in a row.  Pausing requests for %ss', host, limit.failures, self.cooldown)
+            limit.open_until = now + self.cooldown
+            limit.half_open = True
+            # One more failure after the cool down reopens the circuit straight away
+            limit.failures = self.failure_threshold - 1
+
+    def _get_host_limit(self, host: Text, now: float) -> HostLimit:
+        if host not in self.hosts:
+            self.hosts[host] = HostLimit(rate=self.host_rates.get(host, self.rate), tokens=self.burst, last_refill=now)
+        return self.hosts[host]
+
+    def _refill(self, limit: HostLimit, now: float) -> None:
+        limit.tokens = min(limit.tokens + (now - limit.last_refill) * limit.rate, self.burst)
+        limit.last_refill = now
+
+    @staticmethod
+    def _parse_retry_after(retry_after: Optional[Text]) -> Optional[float]:
+        """
+        Retry-After is either a number of seconds or an HTTP date
+        """
+        if not retry_after:
+            return
+        try:
+            return max(float(retry_after), 0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+        except (TypeError, ValueError):
+            log.debug('Unable to parse Retry-After %s', retry_after)
+            return
@@ -0,0 +1,108 @@
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import List, Text, NoReturn, Set
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.base import BaseScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from stockstalker.common.logging import log
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.services.fetch_engine import FetchEngine
+from stockstalker.services.poll_policy import AdaptivePollPolicy
+from stockstalker.util.constants import SEARCH_PAGE, PRODUCT_PAGE
+
+
+class StockScheduler:
+    """
+    Long running daemon that checks every URL on its own interval.  Each URL is a separate job so hot product pages
+    can be polled far more often than search pages.  Runs of the same URL never overlap
+    """
+
+    def __init__(
+            self,
+            engine: FetchEngine,
+            jitter: float = 0.1,
+            blocking: bool = True,
+            poll_policy: AdaptivePollPolicy = None
+    ):
+        """
+        :param engine: Engine used to check URLs.  Its caps limit how many checks run at once
+        :param jitter: Random delay added to each run, as a fraction of the URL's interval
+        :param blocking: Block the calling thread when started
+        :param poll_policy: Adapts each URL's interval to how often its results change.  Fixed intervals if not set
+        """
+        self.engine = engine
+        self.jitter = jitter
+        self.poll_policy = poll_policy
+        self.parsers: List[ParserBase] = []
+        self._running_urls: Set[Text] = set()
+        self._lock = threading.Lock()
+        scheduler_class = BlockingScheduler if blocking else BackgroundScheduler
+        self.scheduler: BaseScheduler = scheduler_class(executors={'default': ThreadPoolExecutor(engine.max_workers)})
+
+    def add_parser(self, parser: ParserBase) -> NoReturn:
+        self.parsers.append(parser)
+        for url in parser.search_pages:
+            self._add_job(parser, url, SEARCH_PAGE)
+        for url in parser.product_pages:
+            self._add_job(parser, url, PRODUCT_PAGE)
+
+    def start(self) -> NoReturn:
+        log.info('Starting scheduler with %s jobs', len(self.scheduler.get_jobs()))
+        self.scheduler.start()
+
+    def shutdown(self, wait: bool = True) -> NoReturn:
+        self.scheduler.shutdown(wait=wait)
+
+    def check_url(self, parser: ParserBase, url: Text, page_type: Text) -> NoReturn:
+        with self._lock:
+            if url in self._running_urls:
+                log.info('Previous check of %s is still running.  Skipping', url)
+                return
+            self._running_urls.add(url)
+        try:
+            results = self.engine.check_url(parser, url, page_type)
+            parser.notify_in_stock(results)
+            if self.poll_policy:
+                self._adapt_interval(parser, url, page_type, results)
+        finally:
+            with self._lock:
+                self._running_urls.discard(url)
+
+    def _adapt_interval(self, parser: ParserBase, url: Text, page_type: Text, results: List[ProductInfo]) -> NoReturn:
+        if not results:
+            # A failed check gives no results.  Keep the current interval rather than treating it as a change
+            return
+        signature = self.poll_policy.get_signature(results)
+        interval = self.poll_policy.next_interval(url, parser.get_poll_interval(url, page_type), signature)
+        job = self.scheduler.get_job(self._get_job_id(parser, url, page_type))
+        if not job or job.trigger.interval.total_seconds() == interval:
+            return
+        log.debug('Rescheduling %s every %ss', url, interval)
+        job.reschedule('interval', seconds=interval, jitter=interval * self.jitter)
+
+    def _add_job(self, parser: ParserBase, url: Text, page_type: Text) -> NoReturn:
+        interval = parser.get_poll_interval(url, page_type)
+        jitter = interval * self.jitter
+        log.debug('Scheduling %s every %ss', url, interval)
+        self.scheduler.add_job(
+            self.check_url,
+            'interval',
+            seconds=interval,
+            jitter=jitter,
+            args=[parser, url, page_type],
+            id=self._get_job_id(parser, url, page_type),
+            coalesce=True,
+            max_instances=1,
+            # Spread the first runs out so every URL isn't checked in the same instant on startup
+            next_run_time=datetime.now() + timedelta(seconds=random.uniform(0, jitter)),
+            replace_existing=True
+        )
+
+    @staticmethod
+    def _get_job_id(parser: ParserBase, url: Text, page_type: Text) -> Text:
+        return f'{parser.name}:{page_type}:{url}'
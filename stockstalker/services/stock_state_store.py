@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+import time
+from dataclasses import asdict
+from typing import Text, Dict, List, NoReturn, Optional
+
+from stockstalker.common.logging import log
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.models.stock_change import StockChange
+from stockstalker.models.stock_state import StockState
+from stockstalker.util.constants import RESTOCK, PRICE_DROP, SOLD_OUT
+from stockstalker.util.helpers import parse_price
+
+
+class StockStateStore:
+    """
+    Last known stock state of every URL.  Compares each check against it so only changes need any further work.
+
+    A product going from out of stock, or never seen, to in stock is a restock.  An in stock product whose price fell
+    by at least price_drop_threshold since the last alert is a price drop.  A product going from in stock to out of
+    stock is sold out.  Only products present in a check are compared, a search result that is no longer listed once
+    it sells out keeps its in stock state and never produces a sold out change
+    """
+
+    def __init__(self, price_drop_threshold: float = 0.05, path: Text = None, save_interval: float = 60):
+        """
+        :param price_drop_threshold: Fraction the price has to fall by to count as a drop.  0.05 is 5%
+        :param path: JSON file the states are loaded from and saved to.  Only kept in memory if not set
+        :param save_interval: Seconds between saves while states are being updated, so little is lost if the process
+        is killed
+        """
+        self.price_drop_threshold = price_drop_threshold
+        self.path = path
+        self.save_interval = save_interval
+        self.states: Dict[Text, StockState] = {}
+        self._last_save = time.monotonic()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        if path:
+            self._load()
+
+    def update(self, products: List[ProductInfo], now: float = None) -> List[StockChange]:
+        """
+        Record the latest state of each product
+        :rtype: List[StockChange]
+        :return: Products whose state changed in a way worth acting on
+        """
+        if now is None:
+            now = time.time()
+        changes = []
+        with self._lock:
+            for product in products:
+                if not product.url:
+                    continue
+                change = self._update_product(product, now)
+                if change:
+                    changes.append(change)
+            save_due = self.path and time.monotonic() - self._last_save >= self.save_interval
+            if save_due:
+                self._last_save = time.monotonic()
+        if save_due:
+            self.save()
+        if changes:
+            log.info('%s of %s products changed', len(changes), len(products))
+        return changes
+
+    def revert(self, change: StockChange) -> NoReturn:
+        """
+        Undo a restock or price drop whose notification could not be delivered, so the next check reports it again
+        """
+        with self._lock:
+            state = self.states.get(change.product.url)
+            if not state or not state.in_stock:
+                return
+            if change.kind == RESTOCK:
+                log.info('Restock of %s was not notified.  It will be reported again', change.product.url)
+                state.in_stock = False
+                state.notified_price = None
+            elif change.kind == PRICE_DROP:
+                log.info('Price drop of %s was not notified.  It will be reported again', change.product.url)
+                state.notified_price = change.previous.notified_price
+                price = parse_price(change.product.price)
+                if price in state.dropped_prices:
+                    state.dropped_prices.remove(price)
+
+    def get_state(self, url: Text) -> Optional[StockState]:
+        with self._lock:
+            return self.states.get(url)
+
+    def save(self) -> NoReturn:
+        if not self.path:
+            return
+        with self._lock:
+            self._last_save = time.monotonic()
+            data = {url: asdict(state) for url, state in self.states.items()}
+        # Updates can trigger a save from any fetch thread
+        with self._save_lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        log.debug('Saved %s stock states to %s', len(data), self.path)
+
+    def _update_product(self, product: ProductInfo, now: float) -> Optional[StockChange]:
+        previous = self.states.get(product.url)
+        price = parse_price(product.price)
+        state = StockState(
+            in_stock=bool(product.in_stock),
+            price=price,
+            updated=now,
+            notified_price=previous.notified_price if previous else None,
+            dropped_prices=list(previous.dropped_prices) if previous else []
+        )
+        self.states[product.url] = state
+        if not state.in_stock:
+            state.notified_price = None
+            state.dropped_prices = []
+            if previous and previous.in_stock:
+                return StockChange(product, SOLD_OUT, previous)
+            return
+        if not previous or not previous.in_stock:
+            state.notified_price = price
+            state.dropped_prices = []
+            return StockChange(product, RESTOCK, previous)
+        if self._is_price_drop(state.notified_price, price):
+            state.notified_price = price
+            state.dropped_prices.append(price)
+            return StockChange(product, PRICE_DROP, previous)
+        if state.notified_price is None:
+            state.notified_price = price
+
+    def _is_price_drop(self, reference: Optional[float], price: Optional[float]) -> bool:
+        if reference is None or price is None:
+            return False
+        return price <= reference * (1 - self.price_drop_threshold)
+
+    def _load(self) -> NoReturn:
+        if not os.path.isfile(self.path):
+            log.info('Unable to locate stock state file %s. Skipping Load', self.path)
+            return
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        self.states = {url: StockState(**state) for url, state in data.items()}
+        log.info('Loaded %s stock states', len(self.states))
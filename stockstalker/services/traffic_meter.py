@@ -0,0 +1,43 @@
+import threading
+from dataclasses import replace
+from typing import Text, Dict, NoReturn
+
+from stockstalker.common.logging import log
+from stockstalker.models.host_traffic import HostTraffic
+
+
+class TrafficMeter:
+    """
+    Counts the bytes received from each host, both as sent over the network and after content decoding.  Meant to be
+    shared by every parser so it shows where the bandwidth goes
+    """
+
+    def __init__(self):
+        self.hosts: Dict[Text, HostTraffic] = {}
+        self._lock = threading.Lock()
+
+    def record(self, host: Text, wire_bytes: int, decoded_bytes: int) -> NoReturn:
+        with self._lock:
+            traffic = self.hosts.setdefault(host, HostTraffic())
+            traffic.requests += 1
+            traffic.wire_bytes += wire_bytes
+            traffic.decoded_bytes += decoded_bytes
+
+    def get_hosts(self) -> Dict[Text, HostTraffic]:
+        """
+        Copy of the traffic of every host seen so far
+        :rtype: Dict[Text, HostTraffic]
+        """
+        with self._lock:
+            return {host: replace(traffic) for host, traffic in self.hosts.items()}
+
+    def log_summary(self) -> NoReturn:
+        for host, traffic in sorted(self.get_hosts().items(), key=lambda item: item[1].wire_bytes, reverse=True):
+            log.info(
+                '%s: %s requests, %.1f KB on the wire, %.1f KB decoded (%.1fx)',
+                host,
+                traffic.requests,
+                traffic.wire_bytes / 1024,
+                traffic.decoded_bytes / 1024,
+                traffic.compression_ratio
+            )
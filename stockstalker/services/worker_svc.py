@@ -0,0 +1,102 @@
+import dataclasses
+import json
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Text, Dict, Any, List, NoReturn
+
+from stockstalker.common.logging import log
+from stockstalker.models.parser_config import ParserConfig
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.parsers.parser_helpers import get_parser_by_name
+from stockstalker.services.fetch_engine import FetchEngine
+from stockstalker.services.notification_history_base import NotificationHistoryBase
+from stockstalker.services.notification_svc import NotificationSvc
+from stockstalker.services.rate_limiter import HostRateLimiter
+
+
+class StockWorker:
+    """
+    Checks URLs leased from a Coordinator with the same parsers the coordinator was configured with and reports the
+    results back.  Workers never send notifications themselves.  Each worker paces its own requests with a
+    HostRateLimiter at the rate the coordinator was started with
+    """
+
+    def __init__(self, host: Text, port: int, worker_id: Text = None, max_leases: int = 4, timeout: float = 30):
+        """
+        :param host: Coordinator address
+        :param port: Coordinator port
+        :param worker_id: Name reported to the coordinator.  Host name and PID if not set
+        :param max_leases: URLs checked at once
+        :param timeout: Seconds to wait for the coordinator to answer
+        """
+        self.host = host
+        self.port = port
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}'
+        self.max_leases = max_leases
+        self.timeout = timeout
+        self.engine = FetchEngine(max_workers=max_leases, max_per_retailer=max_leases)
+        self.parsers: List[ParserBase] = []
+        self.rate_limiter = None
+        self._conn = None
+        self._reader = None
+
+    def run(self) -> NoReturn:
+        """
+        Check leased URLs until the coordinator says there is nothing left or goes away
+        """
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as conn:
+            self._conn = conn
+            self._reader = conn.makefile('rb')
+            hello = self._request({'op': 'hello'})
+            self.rate_limiter = HostRateLimiter(rate=hello['host_rate'], burst=hello['host_burst'])
+            self.parsers = self._build_parsers(hello['configs'], self.rate_limiter)
+            log.info('Worker %s connected with %s parsers', self.worker_id, len(self.parsers))
+            with ThreadPoolExecutor(max_workers=self.max_leases, thread_name_prefix='worker') as executor:
+                while True:
+                    response = self._request({'op': 'lease', 'max': self.max_leases})
+                    if response.get('done'):
+                        log.info('Coordinator has no more work.  Stopping worker %s', self.worker_id)
+                        return
+                    leases = response.get('leases', [])
+                    if not leases:
+                        time.sleep(response.get('wait', 1))
+                        continue
+                    for lease, results in zip(leases, executor.map(self._check_lease, leases)):
+                        self._request({
+                            'op': 'result',
+                            'lease': lease['lease'],
+                            'results': [dataclasses.asdict(result) for result in results]
+                        })
+
+    def _check_lease(self, lease: Dict[Text, Any]):
+        return self.engine.check_url(self.parsers[lease['parser']], lease['url'], lease['page_type'])
+
+    def _request(self, message: Dict[Text, Any]) -> Dict[Text, Any]:
+        message['worker'] = self.worker_id
+        self._conn.sendall(json.dumps(message).encode() + b'\n')
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError('Coordinator closed the connection')
+        response = json.loads(line)
+        if 'error' in response:
+            log.error('Coordinator returned error: %s', response['error'])
+        return response
+
+    @staticmethod
+    def _build_parsers(configs: List[Dict[Text, Any]], rate_limiter: HostRateLimiter) -> List[ParserBase]:
+        # Results are reported to the coordinator, which does the notifying, so the worker has no history of its own
+        notification_svc = NotificationSvc(NotificationHistoryBase())
+        return [
+            get_parser_by_name(ParserConfig(**config), notification_svc=notification_svc, rate_limiter=rate_limiter)
+            for config in configs
+        ]
+
+
+def run_worker(host: Text, port: int, **kwargs) -> NoReturn:
+    try:
+        StockWorker(host, port, **kwargs).run()
+    except OSError as e:
+        # Covers refused and dropped connections as well as the coordinator not answering within the timeout
+        log.error('Lost connection to coordinator %s:%s: %s', host, port, e)
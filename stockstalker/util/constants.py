@@ -12,4 +12,14 @@ USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/57.0.2987.133 Safari/537.36',
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/55.0.2883.87 Safari/537.36',
     'Mozilla/5.0 (Windows NT 6.1; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/55.0.2883.87 Safari/537.36',
-]
\ No newline at end of file
+]
+SEARCH_PAGE = 'search_pages'
+PRODUCT_PAGE = 'product_pages'
+
+HTML_BACKENDS = ('html.parser', 'lxml', 'html5lib')
+# Characters read at a time when streaming a page
+STREAM_CHUNK_SIZE = 16384
+
+RESTOCK = 'restock'
+PRICE_DROP = 'price_drop'
+SOLD_OUT = 'sold_out'
@@ -1,7 +1,8 @@
 import json
 import os
+import re
 from json import JSONDecodeError
-from typing import Text, List
+from typing import Text, List, Optional
 
 from stockstalker.common.exceptions import InvalidConfigDirectory
 from stockstalker.common.logging import log
@@ -27,3 +28,32 @@ def load_configs_from_dir(config_dir: Text) -> List[ParserConfig]:
                     continue
                 configs.append(ParserConfig(**config_data))
     return configs
+
+
+PRICE_PATTERN = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def parse_price(price: Optional[Text]) -> Optional[float]:
+    """
+    Pull the numeric price out of price text such as '$699.99' or '2,199'.  Ranges use the first price
+    :rtype: Optional[float]
+    :return: The price, or None if the text has no number in it
+    """
+    if not price:
+        return
+    match = PRICE_PATTERN.search(price)
+    if not match:
+        return
+    return float(match.group().replace(',', ''))
+
+
+def format_price(price) -> Optional[Text]:
+    """
+    Format a numeric price from a JSON payload the way prices are shown on the retailer's pages, such as '$2,199.99'
+    :rtype: Optional[Text]
+    :return: Formatted price or None if the value is not a number
+    """
+    try:
+        return f'${float(price):,.2f}'
+    except (TypeError, ValueError):
+        return
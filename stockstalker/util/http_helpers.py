@@ -0,0 +1,89 @@
+from typing import Text, Dict, Union, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+# Every content encoding urllib3 can decode.  br and zstd are included when brotli or zstandard is installed
+from urllib3.util.request import ACCEPT_ENCODING
+
+from stockstalker.common.logging import log
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+class Http2Session:
+    """
+    Minimal requests.Session look-alike backed by an HTTP/2 capable httpx client.  Only the parts of the session API
+    the parsers use are implemented
+    """
+
+    def __init__(self, pool_size: int):
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        self.client = httpx.Client(http2=True, limits=limits)
+        self.headers = self.client.headers
+
+    def get(
+            self,
+            url: Text,
+            headers: Dict[Text, Text] = None,
+            cookies: Dict[Text, Text] = None,
+            timeout: float = None
+    ):
+        try:
+            return self.client.get(url, headers=headers, cookies=cookies, timeout=timeout)
+        except httpx.TimeoutException as e:
+            raise Timeout(str(e))
+        except httpx.TransportError as e:
+            raise ConnectionError(str(e))
+
+    def close(self):
+        self.client.close()
+
+
+def build_session(pool_size: int = 10, http2: bool = False) -> Union[requests.Session, Http2Session]:
+    """
+    Build a long lived session that keeps connections alive between requests
+    :rtype: Union[requests.Session, Http2Session]
+    :param pool_size: Max connections kept open per host
+    :param http2: Use HTTP/2 if httpx with HTTP/2 support is installed
+    """
+    if http2:
+        if _http2_available():
+            log.debug('Using HTTP/2 session')
+            return Http2Session(pool_size)
+        log.warning('HTTP/2 requested but httpx[http2] is not installed.  Falling back to HTTP/1.1')
+
+    session = requests.Session()
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def _http2_available() -> bool:
+    if not httpx:
+        return False
+    try:
+        import h2
+    except ImportError:
+        return False
+    return True
+
+
+def get_wire_bytes(response) -> Optional[int]:
+    """
+    Bytes of a response body read from the network so far, before content decoding
+    :rtype: Optional[int]
+    :return: Byte count or None if the response can't tell
+    """
+    # httpx counts them on the response, urllib3 on the raw stream
+    num_bytes = getattr(response, 'num_bytes_downloaded', None)
+    if isinstance(num_bytes, int):
+        return num_bytes
+    tell = getattr(getattr(response, 'raw', None), 'tell', None)
+    num_bytes = tell() if callable(tell) else None
+    return num_bytes if isinstance(num_bytes, int) else None
@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from stockstalker.common import metrics
+from stockstalker.common.metrics import MetricsRegistry
+
+
+class TestMetrics(TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_inc_per_labels(self):
+        counter = self.registry.counter('test_total', 'Test', ('result',))
+        counter.inc('sent')
+        counter.inc('sent', amount=2)
+        counter.inc('failed')
+        self.assertEqual(3, counter.get('sent'))
+        self.assertEqual(1, counter.get('failed'))
+
+    def test_counter_wrong_labels_raises(self):
+        counter = self.registry.counter('test_total', 'Test', ('result',))
+        with self.assertRaises(ValueError):
+            counter.inc()
+
+    def test_register_same_name_twice_raises(self):
+        self.registry.counter('test_total', 'Test')
+        with self.assertRaises(ValueError):
+            self.registry.counter('test_total', 'Test')
+
+    def test_histogram_observe(self):
+        histogram = self.registry.histogram('test_seconds', 'Test', ('host',), buckets=(1, 5))
+        histogram.observe('newegg.com', value=0.5)
+        histogram.observe('newegg.com', value=3)
+        self.assertEqual(2, histogram.get_count('newegg.com'))
+        self.assertEqual(3.5, histogram.get_sum('newegg.com'))
+        self.assertEqual(0, histogram.get_count('bestbuy.com'))
+
+    def test_histogram_time(self):
+        histogram = self.registry.histogram('test_seconds', 'Test')
+        with histogram.time():
+            pass
+        self.assertEqual(1, histogram.get_count())
+
+    def test_render_prometheus_text(self):
+        self.registry.counter('test_total', 'Things counted', ('result',)).inc('sent')
+        histogram = self.registry.histogram('test_seconds', 'Time taken', ('host',), buckets=(1, 5))
+        histogram.observe('newegg.com', value=1)
+        histogram.observe('newegg.com', value=10)
+        self.assertEqual(
+            '# HELP test_total Things counted\n'
+            '# TYPE test_total counter\n'
+            'test_total{result="sent"} 1\n'
+            '# HELP test_seconds Time taken\n'
+            '# TYPE test_seconds histogram\n'
+            'test_seconds_bucket{host="newegg.com",le="1"} 1\n'
+            'test_seconds_bucket{host="newegg.com",le="5"} 1\n'
+            'test_seconds_bucket{host="newegg.com",le="+Inf"} 2\n'
+            'test_seconds_sum{host="newegg.com"} 11.0\n'
+            'test_seconds_count{host="newegg.com"} 2\n',
+            self.registry.render()
+        )
+
+    def test_render_escapes_label_values(self):
+        self.registry.counter('test_total', 'Test', ('parser',)).inc('a"b')
+        self.assertIn('test_total{parser="a\\"b"} 1', self.registry.render())
+
+    def test_collect_holds_back_observations(self):
+        histogram = self.registry.histogram('test_seconds', 'Test', ('host',))
+        with metrics.collect() as observations:
+            histogram.observe('newegg.com', value=1)
+        histogram.observe('newegg.com', value=2)
+        self.assertEqual([('test_seconds', ('newegg.com',), 1)], observations)
+        self.assertEqual(2, histogram.get_sum('newegg.com'))
+
+    def test_replay_records_observations(self):
+        before = metrics.build_page_seconds.get_count('replayed')
+        metrics.replay([('stockstalker_build_page_seconds', ('replayed',), 0.5)])
+        self.assertEqual(before + 1, metrics.build_page_seconds.get_count('replayed'))
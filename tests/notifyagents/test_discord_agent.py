@@ -0,0 +1,114 @@
+from unittest import TestCase
+from unittest.mock import patch, MagicMock
+
+from requests.exceptions import ConnectionError
+
+from stockstalker.common.exceptions import NotificationDeliveryFailed
+from stockstalker.notifyagents.discord_agent import DiscordAgent, MAX_MESSAGE_LENGTH
+
+
+class FakeTime:
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+class TestDiscordAgent(TestCase):
+
+    def setUp(self) -> None:
+        self.clock = FakeTime()
+        patcher = patch('stockstalker.notifyagents.discord_agent.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.agent = DiscordAgent('https://example.com/webhook', 'discord')
+
+    def get_mock_response(self, status_code, headers=None, json=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.ok = status_code < 400
+        response.headers = headers or {}
+        response.text = ''
+        response.json.return_value = json or {}
+        return response
+
+    def test_send_uses_pooled_session(self):
+        with patch.object(self.agent.session, 'post', return_value=self.get_mock_response(204)) as mocked_post:
+            self.agent.send('one')
+            self.agent.send('two')
+        self.assertEqual(2, mocked_post.call_count)
+        self.assertEqual({'content': 'two'}, mocked_post.call_args[1]['data'])
+
+    def test_send_waits_for_bucket_reset(self):
+        exhausted = self.get_mock_response(204, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset-After': '2.5'})
+        with patch.object(self.agent.session, 'post', return_value=exhausted):
+            self.agent.send('one')
+            self.assertEqual(0, self.clock.slept)
+            self.agent.send('two')
+        self.assertAlmostEqual(2.5, self.clock.slept)
+
+    def test_send_spends_remaining_before_waiting(self):
+        response = self.get_mock_response(204, {'X-RateLimit-Remaining': '5', 'X-RateLimit-Reset-After': '2'})
+        with patch.object(self.agent.session, 'post', return_value=response):
+            self.agent.send('one')
+            self.agent.send('two')
+        self.assertEqual(0, self.clock.slept)
+
+    def test_send_429_retries_after_retry_after(self):
+        responses = [self.get_mock_response(429, json={'retry_after': 1.5}), self.get_mock_response(204)]
+        with patch.object(self.agent.session, 'post', side_effect=responses) as mocked_post:
+            self.agent.send('one')
+        self.assertEqual(2, mocked_post.call_count)
+        self.assertAlmostEqual(1.5, self.clock.slept)
+
+    def test_send_429_retry_after_header_fallback(self):
+        responses = [self.get_mock_response(429, headers={'Retry-After': '3'}), self.get_mock_response(204)]
+        responses[0].json.side_effect = ValueError
+        with patch.object(self.agent.session, 'post', side_effect=responses):
+            self.agent.send('one')
+        self.assertAlmostEqual(3, self.clock.slept)
+
+    def test_send_429_gives_up_after_retries(self):
+        agent = DiscordAgent('https://example.com/webhook', 'discord', max_retries=1)
+        with patch.object(agent.session, 'post', return_value=self.get_mock_response(429, json={'retry_after': 1})):
+            self.assertRaises(NotificationDeliveryFailed, agent.send, 'one')
+
+    def test_send_error_status_raises(self):
+        with patch.object(self.agent.session, 'post', return_value=self.get_mock_response(404)):
+            self.assertRaises(NotificationDeliveryFailed, self.agent.send, 'one')
+
+    def test_send_connection_error_raises(self):
+        with patch.object(self.agent.session, 'post', side_effect=ConnectionError):
+            self.assertRaises(NotificationDeliveryFailed, self.agent.send, 'one')
+
+    def test_send_batch_combines_messages(self):
+        with patch.object(self.agent, 'send') as mocked_send:
+            self.agent.send_batch(['one', 'two'])
+        mocked_send.assert_called_once_with('one\n\ntwo')
+
+    def test_send_batch_splits_at_length_limit(self):
+        messages = ['a' * 1500, 'b' * 1500]
+        with patch.object(self.agent, 'send') as mocked_send:
+            self.agent.send_batch(messages)
+        self.assertEqual(2, mocked_send.call_count)
+
+    def test_send_batch_failure_reports_delivered(self):
+        messages = ['a' * 1500, 'b' * 400, 'c' * 1500]
+        responses = [self.get_mock_response(200), self.get_mock_response(500)]
+        with patch.object(self.agent.session, 'post', side_effect=responses) as mocked_post:
+            with self.assertRaises(NotificationDeliveryFailed) as context:
+                self.agent.send_batch(messages)
+        self.assertEqual(2, mocked_post.call_count)
+        self.assertEqual(2, context.exception.delivered)
+
+    def test__combine_messages_within_limit(self):
+        combined = DiscordAgent._combine_messages(['a' * 999, 'b' * 999, 'c'])
+        self.assertTrue(all(len('\n\n'.join(group)) <= MAX_MESSAGE_LENGTH for group in combined))
+        self.assertEqual([['a' * 999, 'b' * 999], ['c']], combined)
@@ -1,10 +1,19 @@
+import io
+import json
 import os
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import requests
+import urllib3
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 
+from stockstalker.models.product_info import ProductInfo
 from stockstalker.parsers.best_buy_parser import BestBuyParser
+from stockstalker.services.traffic_meter import TrafficMeter
+
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_pages')
 
 
 class TestBestBuyParser(TestCase):
@@ -39,17 +48,7 @@ class TestBestBuyParser(TestCase):
             return BeautifulSoup(f.read(), 'html.parser')
 
     def get_example_page_dir(self):
-        """
-        Hacky way to get the root test path.  Needed it since running single tests sets a different CWD
-        :return:
-        """
-        path, tail = os.path.split(os.getcwd())
-        while tail:
-            if tail == 'tests':
-                return os.path.join(path, tail, 'example_pages')
-            path, tail = os.path.split(path)
-            if not tail:
-                break
+        return EXAMPLE_PAGE_DIR
 
     def test__is_in_stock_search_result_true(self):
         search_result = self.get_search_result()
@@ -115,3 +114,77 @@ class TestBestBuyParser(TestCase):
         page = self.get_product_page_in_stock()
         self.assertEqual('$229.99', self.parser._get_price_from_product_page(page))
 
+    def test_parse_search_page_source_region_matches_full_page(self):
+        with open(os.path.join(self.get_example_page_dir(), 'bestbuy_search_page.html'), 'r') as f:
+            page_source = f.read()
+        expected = self.parser.parse_search_page(self.get_search_page())
+        self.assertTrue(expected)
+        self.assertEqual(expected, self.parser.parse_search_page_source(page_source))
+
+    def test_parse_product_page_source_from_json(self):
+        with open(os.path.join(self.get_example_page_dir(), 'bestbuy_product_out_of_stock.html'), 'r') as f:
+            page_source = f.read()
+        with patch.object(self.parser, '_build_page') as build_page:
+            result = self.parser.parse_product_page_source(page_source, url='https://bestbuy.com/p/1')
+        build_page.assert_not_called()
+        expected = self.parser.parse_product_page(self.get_product_page_out_of_stock(), url='https://bestbuy.com/p/1')
+        self.assertEqual(expected, result)
+
+    def test_check_product_page_streamed_stops_at_regions(self):
+        with open(os.path.join(self.get_example_page_dir(), 'bestbuy_product_instock.html'), 'rb') as f:
+            body = f.read()
+        raw = urllib3.HTTPResponse(body=io.BytesIO(body), headers={'Content-Type': 'text/html; charset=utf-8'},
+                                   status=200, preload_content=False)
+        url = 'https://www.bestbuy.com/site/xfx/6432400.p'
+        response = HTTPAdapter().build_response(requests.Request('GET', url).prepare(), raw)
+        parser = BestBuyParser(MagicMock(), 'bestbuy', traffic_meter=TrafficMeter())
+        with patch.object(parser.session, 'get', return_value=response) as mocked_get:
+            result = parser.check_product_page(url)
+        self.assertTrue(mocked_get.call_args[1]['stream'])
+        self.assertLess(parser.traffic_meter.get_hosts()['www.bestbuy.com'].decoded_bytes, len(body) / 4)
+        self.assertTrue(result.in_stock)
+        self.assertEqual(parser.parse_product_page_source(body.decode(), url=url), result)
+
+    def test_get_sku_from_url(self):
+        self.assertEqual('6432400', self.parser.get_sku_from_url('https://www.bestbuy.com/site/evga/6432400.p?skuId=6432400'))
+        self.assertEqual('6432400', self.parser.get_sku_from_url('https://www.bestbuy.com/site/evga/6432400.p'))
+        self.assertIsNone(self.parser.get_sku_from_url('https://www.bestbuy.com/site/searchpage.jsp?st=3080'))
+
+    def test_check_product_batch_uses_price_blocks(self):
+        price_blocks = [
+            {'sku': {'skuId': '6432400', 'names': {'short': 'RTX 3080'}, 'price': {'currentPrice': 699.99},
+                     'buttonState': {'buttonState': 'SOLD_OUT'}}},
+            {'sku': {'skuId': '6092641', 'names': {'short': 'RX 580'}, 'price': {'currentPrice': 229.99},
+                     'buttonState': {'buttonState': 'ADD_TO_CART'}}},
+        ]
+        parser = BestBuyParser(MagicMock(), 'bestbuy')
+        urls = ['https://www.bestbuy.com/site/a/6432400.p', 'https://www.bestbuy.com/site/b/6092641.p']
+        with patch.object(parser, '_load_page', return_value=json.dumps(price_blocks)) as load_page, \
+                patch.object(parser, 'check_page') as check_page:
+            results = parser.check_product_batch(urls)
+        load_page.assert_called_once_with('https://www.bestbuy.com/api/3.0/priceBlocks?skus=6432400,6092641',
+                                          cache_validators=False)
+        check_page.assert_not_called()
+        self.assertEqual(
+            [ProductInfo(title='RTX 3080', url=urls[0], in_stock=False, price='$699.99', sku='6432400'),
+             ProductInfo(title='RX 580', url=urls[1], in_stock=True, price='$229.99', sku='6092641')],
+            results
+        )
+
+    def test_check_product_batch_leaves_no_pending_validators(self):
+        parser = BestBuyParser(MagicMock(), 'bestbuy')
+        response = MagicMock(status_code=200, text='[]', content=b'[]', headers={'ETag': '"abc"'})
+        with patch.object(parser.session, 'get', return_value=response) as get, \
+                patch.object(parser, 'check_page', return_value=[]):
+            parser.check_product_batch(['https://www.bestbuy.com/site/a/6432400.p',
+                                        'https://www.bestbuy.com/site/b/6092641.p'])
+        self.assertNotIn('If-None-Match', get.call_args[1]['headers'])
+        self.assertEqual({}, parser.page_cache.pending_validators)
+
+    def test_check_product_batch_failed_lookup_checks_each_page(self):
+        parser = BestBuyParser(MagicMock(), 'bestbuy')
+        urls = ['https://www.bestbuy.com/site/a/6432400.p', 'https://www.bestbuy.com/site/b/6092641.p']
+        with patch.object(parser, '_load_page', return_value='<html>blocked</html>'), \
+                patch.object(parser, 'check_page', return_value=[]) as check_page:
+            parser.check_product_batch(urls)
+        self.assertEqual(2, check_page.call_count)
@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from bs4 import BeautifulSoup
+
+from stockstalker.parsers.extraction_spec import Selector, ExtractionSpec, FieldSpec
+
+ITEM = """
+<div class="item-cell">
+    <div class="item-info">
+        <a class="item-brand" href="/brand">Brand</a>
+        <a class="item-title bold" href="/product">Product Title</a>
+    </div>
+    <a class="item-title" href="/outside">Outside Title</a>
+    <div id="buy-box"><button>Add to Cart</button></div>
+</div>
+"""
+
+
+class TestSelector(TestCase):
+
+    def get_item(self):
+        return BeautifulSoup(ITEM, 'html.parser').find('div', {'class': 'item-cell'})
+
+    def test_match_tag_and_class(self):
+        item = self.get_item()
+        link = item.find('a', {'class': 'bold'})
+        self.assertTrue(Selector('a.item-title').match(link, item))
+        self.assertTrue(Selector('a.item-title.bold').match(link, item))
+        self.assertFalse(Selector('a.item-brand').match(link, item))
+        self.assertFalse(Selector('span.item-title').match(link, item))
+
+    def test_match_descendant(self):
+        item = self.get_item()
+        inside = item.find('a', {'class': 'bold'})
+        outside = item.find('a', {'href': '/outside'})
+        selector = Selector('div.item-info a.item-title')
+        self.assertTrue(selector.match(inside, item))
+        self.assertFalse(selector.match(outside, item))
+
+    def test_match_id(self):
+        item = self.get_item()
+        self.assertTrue(Selector('div#buy-box button').match(item.find('button'), item))
+        self.assertTrue(Selector('#buy-box button').match(item.find('button'), item))
+        self.assertFalse(Selector('div#other button').match(item.find('button'), item))
+
+    def test_match_ancestor_outside_root_ignored(self):
+        item = self.get_item()
+        info = item.find('div', {'class': 'item-info'})
+        self.assertFalse(Selector('div.item-cell a.item-title').match(info.find('a', {'class': 'bold'}), info))
+
+    def test_empty_selector_raises(self):
+        self.assertRaises(ValueError, Selector, '  ')
+
+
+class TestExtractionSpec(TestCase):
+
+    def get_spec(self):
+        return ExtractionSpec({
+            'title': FieldSpec('div.item-info a.item-title'),
+            'url': FieldSpec('div.item-info a.item-title', lambda a: a['href']),
+            'in_stock': FieldSpec('div#buy-box button', lambda b: b.text.lower() == 'add to cart', default=False),
+            'price': FieldSpec('li.price-current strong'),
+        })
+
+    def get_item(self):
+        return BeautifulSoup(ITEM, 'html.parser').find('div', {'class': 'item-cell'})
+
+    def test_extract(self):
+        self.assertEqual(
+            {'title': 'Product Title', 'url': '/product', 'in_stock': True, 'price': None},
+            self.get_spec().extract(self.get_item())
+        )
+
+    def test_extract_missing_field_uses_default(self):
+        item = self.get_item()
+        item.find('button').decompose()
+        self.assertFalse(self.get_spec().extract(item)['in_stock'])
+
+    def test_extract_first_match_in_document_order(self):
+        item = BeautifulSoup('<div><p>one</p><p>two</p></div>', 'html.parser').div
+        self.assertEqual('one', ExtractionSpec({'text': FieldSpec('p')}).extract(item)['text'])
+
+    def test_extract_field(self):
+        self.assertEqual('/product', self.get_spec().extract_field(self.get_item(), 'url'))
+
+    def test_shared_selector_compiled_once(self):
+        self.assertEqual(3, len(self.get_spec().selectors))
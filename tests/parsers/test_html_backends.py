@@ -0,0 +1,62 @@
+import os
+from unittest import TestCase, skipUnless
+from unittest.mock import MagicMock, patch
+
+from bs4.builder import builder_registry
+
+from stockstalker.parsers.best_buy_parser import BestBuyParser
+from stockstalker.parsers.newegg_parser import NeweggParser
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.parsers.walmart_parser import WalmartParser
+
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_pages')
+
+SEARCH_PAGES = [
+    (NeweggParser, 'newegg_search_page.html'),
+    (BestBuyParser, 'bestbuy_search_page.html'),
+    (WalmartParser, 'walmart_search_page.html'),
+]
+
+PRODUCT_PAGES = [
+    (NeweggParser, 'newegg_product_instock.html'),
+    (NeweggParser, 'newegg_product_out_of_stock.html'),
+    (BestBuyParser, 'bestbuy_product_instock.html'),
+    (BestBuyParser, 'bestbuy_product_out_of_stock.html'),
+    (WalmartParser, 'walmart_product_instock.html'),
+]
+
+
+class TestHtmlBackends(TestCase):
+
+    def get_example_page(self, name):
+        with open(os.path.join(self.get_example_page_dir(), name), 'r') as f:
+            return f.read()
+
+    def get_example_page_dir(self):
+        return EXAMPLE_PAGE_DIR
+
+    def test__get_html_backend_unknown_raises(self):
+        self.assertRaises(ValueError, ParserBase, MagicMock(), 'newegg', html_backend='dummy')
+
+    def test__get_html_backend_not_installed_falls_back(self):
+        with patch('stockstalker.parsers.parser_base.builder_registry.lookup', return_value=None):
+            parser = ParserBase(MagicMock(), 'newegg', html_backend='html5lib')
+        self.assertEqual('html.parser', parser.html_backend)
+
+    @skipUnless(builder_registry.lookup('lxml'), 'lxml not installed')
+    def test_search_pages_same_results_with_lxml(self):
+        for parser_class, page_name in SEARCH_PAGES:
+            page_source = self.get_example_page(page_name)
+            expected = parser_class(MagicMock(), 'test').parse_search_page_source(page_source)
+            results = parser_class(MagicMock(), 'test', html_backend='lxml').parse_search_page_source(page_source)
+            self.assertTrue(expected)
+            self.assertEqual(expected, results, page_name)
+
+    @skipUnless(builder_registry.lookup('lxml'), 'lxml not installed')
+    def test_product_pages_same_results_with_lxml(self):
+        for parser_class, page_name in PRODUCT_PAGES:
+            page_source = self.get_example_page(page_name)
+            expected = parser_class(MagicMock(), 'test').parse_product_page_source(page_source)
+            result = parser_class(MagicMock(), 'test', html_backend='lxml').parse_product_page_source(page_source)
+            self.assertIsNotNone(expected)
+            self.assertEqual(expected, result, page_name)
@@ -4,13 +4,16 @@ from unittest.mock import MagicMock
 from requests.exceptions import ConnectionError, Timeout
 from bs4 import BeautifulSoup
 
-from stockstalker.parsers.newegg_parser import NeweggParser
+from stockstalker.parsers.newegg_parser import NeweggParser, BREADCRUMB_REGION
+
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_pages')
 
 def get_mock_response(*args, **kwargs):
     class MockResponse:
         def __init__(self, text, status_code):
             self.text = text
             self.status_code = status_code
+            self.headers = {}
 
     if args[0] == 'http://badresponse.com':
         return MockResponse('<html></html>', 500)
@@ -49,17 +52,7 @@ class TestNeweggParser(TestCase):
 
 
     def get_example_page_dir(self):
-        """
-        Hacky way to get the root test path.  Needed it since running single tests sets a different CWD
-        :return:
-        """
-        path, tail = os.path.split(os.getcwd())
-        while tail:
-            if tail == 'tests':
-                return os.path.join(path, tail, 'example_pages')
-            path, tail = os.path.split(path)
-            if not tail:
-                break
+        return EXAMPLE_PAGE_DIR
 
 
 
@@ -87,18 +80,17 @@ class TestNeweggParser(TestCase):
         page = self.get_combo_product_page()
         self.assertTrue(self.parser._is_combo_page(page))
 
-    @mock.patch('stockstalker.parsers.newegg_parser.requests.get', side_effect=get_mock_response)
-    def test__load_page_bad_status_return_none(self, mocked_res):
-        self.assertIsNone(self.parser._load_page('http://badresponse.com'))
+    def test__load_page_bad_status_return_none(self):
+        with mock.patch.object(self.parser.session, 'get', side_effect=get_mock_response):
+            self.assertIsNone(self.parser._load_page('http://badresponse.com'))
 
-    @mock.patch('stockstalker.parsers.newegg_parser.requests.get', side_effect=get_mock_response)
-    def test__load_page_bad_status_return_text(self, mocked_res):
-        self.assertEqual(self.parser._load_page('http://goodresponse.com'), '<html></html>')
+    def test__load_page_bad_status_return_text(self):
+        with mock.patch.object(self.parser.session, 'get', side_effect=get_mock_response):
+            self.assertEqual(self.parser._load_page('http://goodresponse.com'), '<html></html>')
 
-    @mock.patch('stockstalker.parsers.newegg_parser.requests.get')
-    def test__load_page_exception_return_none(self, mocked_res):
-        mocked_res.side_effect = ConnectionError()
-        self.assertIsNone(self.parser._load_page('http://badresponse.com'))
+    def test__load_page_exception_return_none(self):
+        with mock.patch.object(self.parser.session, 'get', side_effect=ConnectionError()):
+            self.assertIsNone(self.parser._load_page('http://badresponse.com'))
 
 
     def test__is_in_stock_product_page_out_of_stock_false(self):
@@ -191,4 +183,37 @@ class TestNeweggParser(TestCase):
     def test__get_title_from_product_page_missing_title_return_none(self):
         page = self.get_product_page_in_stock()
         page.find('h1', {'class': 'product-title'}).decompose()
-        self.assertIsNone(self.parser._get_title_from_product_page(page))
\ No newline at end of file
+        self.assertIsNone(self.parser._get_title_from_product_page(page))
+
+    def test_parse_search_page_source_region_matches_full_page(self):
+        with open(os.path.join(self.get_example_page_dir(), 'newegg_search_page.html'), 'r') as f:
+            page_source = f.read()
+        expected = self.parser.parse_search_page(self.get_search_page())
+        self.assertTrue(expected)
+        self.assertEqual(expected, self.parser.parse_search_page_source(page_source))
+
+    def test_parse_product_page_source_from_json(self):
+        with open(os.path.join(self.get_example_page_dir(), 'newegg_product_instock.html'), 'r') as f:
+            page_source = f.read()
+        with mock.patch.object(self.parser, '_build_page', wraps=self.parser._build_page) as build_page:
+            result = self.parser.parse_product_page_source(page_source, url='https://newegg.com/p/1')
+        # Only the breadcrumbs are built for the combo check, the rest comes from the JSON
+        build_page.assert_called_once_with(page_source, parse_only=BREADCRUMB_REGION)
+        self.assertTrue(result.in_stock)
+        self.assertEqual('N82E16883360054', result.sku)
+        self.assertEqual('$2,199.99', result.price)
+
+    def test_parse_product_page_source_combo_with_json_none(self):
+        with open(os.path.join(self.get_example_page_dir(), 'newegg_combo_page.html'), 'r') as f:
+            page_source = f.read()
+        page_source += ('<script type="application/ld+json">{"@type": "Product", "name": "Combo", '
+                        '"offers": {"availability": "InStock"}}</script>')
+        with mock.patch.object(self.parser, '_build_page', wraps=self.parser._build_page) as build_page:
+            self.assertIsNone(self.parser.parse_product_page_source(page_source, url='https://newegg.com/p/1'))
+        build_page.assert_called_once_with(page_source, parse_only=BREADCRUMB_REGION)
+
+    def test_parse_product_page_source_no_offer_in_json_falls_back(self):
+        with open(os.path.join(self.get_example_page_dir(), 'newegg_product_out_of_stock.html'), 'r') as f:
+            page_source = f.read()
+        expected = self.parser.parse_product_page(self.get_product_page_out_of_stock(), url='https://newegg.com/p/1')
+        self.assertEqual(expected, self.parser.parse_product_page_source(page_source, url='https://newegg.com/p/1'))
@@ -1,8 +1,19 @@
+import gzip
+import io
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+from stockstalker.common import metrics
 from stockstalker.parsers.parser_base import ParserBase
 from stockstalker.models.product_info import ProductInfo
+from stockstalker.services.notification_svc import NotificationSvc
+from stockstalker.services.stock_state_store import StockStateStore
+from stockstalker.services.traffic_meter import TrafficMeter
+from stockstalker.util.constants import PRODUCT_PAGE, SEARCH_PAGE
 
 
 class TestParserBase(TestCase):
@@ -46,9 +57,272 @@ class TestParserBase(TestCase):
 
     def test__is_ignored_notification_sent_url(self):
 
-        self.parser.notification_sent_urls.append('https://example.com')
+        self.parser.notification_sent_urls.add('https://example.com')
         info = ProductInfo(
             title='Test Product - Red Widget',
             url='https://example.com'
         )
-        self.assertTrue(self.parser.is_ignored(info))
\ No newline at end of file
+        self.assertTrue(self.parser.is_ignored(info))
+
+    def test_notify_in_stock_sku_identifier(self):
+        parser = ParserBase(MagicMock(), 'Newegg')
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True, sku=' 123 ')])
+        args, kwargs = parser.notification_svc.send_notificaiton.call_args
+        self.assertEqual('newegg:123', args[1])
+        self.assertEqual(['https://example.com'], kwargs['aliases'])
+
+    def test_notify_in_stock_no_sku_url_identifier(self):
+        parser = ParserBase(MagicMock(), 'Newegg')
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True)])
+        self.assertEqual('https://example.com', parser.notification_svc.send_notificaiton.call_args[0][1])
+
+    def test_notify_in_stock_skips_out_of_stock(self):
+        parser = ParserBase(MagicMock(), 'Newegg')
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=False)])
+        parser.notification_svc.send_notificaiton.assert_not_called()
+
+    def test_notify_in_stock_state_store_only_changes(self):
+        parser = ParserBase(MagicMock(), 'Newegg', state_store=StockStateStore())
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True)])
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True)])
+        self.assertEqual(1, parser.notification_svc.send_notificaiton.call_count)
+
+    def test_notify_in_stock_state_store_sold_out_clears_history(self):
+        parser = ParserBase(MagicMock(), 'Newegg', state_store=StockStateStore())
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True)])
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=False)])
+        parser.notification_svc.clear_notification.assert_called_once_with(
+            'https://example.com', aliases=['https://example.com']
+        )
+
+    def test_notify_in_stock_state_store_undelivered_restock_sent_again(self):
+        history = MagicMock()
+        history.has_been_notified.return_value = False
+        notification_svc = NotificationSvc(history)
+        agent = MagicMock()
+        agent.send.side_effect = [ValueError(), None]
+        notification_svc.register_agent(agent)
+        parser = ParserBase(notification_svc, 'Newegg', state_store=StockStateStore())
+        for _ in range(2):
+            parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True)])
+        self.assertEqual(2, agent.send.call_count)
+
+    def test_notify_in_stock_state_store_price_drop(self):
+        parser = ParserBase(MagicMock(), 'Newegg', state_store=StockStateStore(price_drop_threshold=0.1))
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True, price='$100')])
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True, price='$80')])
+        msg, identifier = parser.notification_svc.send_notificaiton.call_args[0]
+        self.assertEqual('https://example.com:price:80.00', identifier)
+        self.assertIn('$100.00 -> $80', msg)
+
+    def test_notify_in_stock_state_store_sold_out_clears_price_drops(self):
+        parser = ParserBase(MagicMock(), 'Newegg', state_store=StockStateStore(price_drop_threshold=0.1))
+        for price in ('$100', '$80', '$70'):
+            parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=True, price=price)])
+        parser.notify_in_stock([ProductInfo(title='Widget', url='https://example.com', in_stock=False)])
+        parser.notification_svc.clear_notification.assert_called_once_with(
+            'https://example.com',
+            aliases=['https://example.com', 'https://example.com:price:80.00', 'https://example.com:price:70.00']
+        )
+
+    def test_notify_in_stock_records_observations(self):
+        observation_log = MagicMock()
+        parser = ParserBase(MagicMock(), 'Newegg', observation_log=observation_log)
+        products = [ProductInfo(title='Widget', url='https://example.com', in_stock=False)]
+        parser.notify_in_stock(products)
+        observation_log.record.assert_called_once_with(products)
+
+    def test_check_stock_notifies_each_page(self):
+        parser = ParserBase(MagicMock(), 'Newegg', search_pages=['https://example.com/s'],
+                            product_pages=['https://example.com/p'])
+        parser.check_page = MagicMock(side_effect=lambda url, page_type: [ProductInfo(title='Widget', url=url)])
+        parser.notify_in_stock = MagicMock()
+        parser.check_stock()
+        self.assertEqual(
+            [[ProductInfo(title='Widget', url='https://example.com/s')],
+             [ProductInfo(title='Widget', url='https://example.com/p')]],
+            [c[0][0] for c in parser.notify_in_stock.call_args_list]
+        )
+
+    def test_get_product_batches_no_batch_support(self):
+        self.assertEqual([['a'], ['b']], self.parser.get_product_batches(['a', 'b']))
+
+    def test_get_product_batches_groups_urls_with_sku(self):
+        parser = ParserBase(MagicMock(), 'Newegg')
+        parser.product_batch_size = 2
+        parser.get_sku_from_url = lambda url: url[-1] if url[-1].isdigit() else None
+        self.assertEqual(
+            [['p/1', 'p/2'], ['p/3'], ['p/x']],
+            parser.get_product_batches(['p/1', 'p/2', 'p/x', 'p/3'])
+        )
+
+    def test_check_product_batch_falls_back_for_unanswered_urls(self):
+        parser = ParserBase(MagicMock(), 'Newegg')
+        parser.product_batch_size = 10
+        parser.get_sku_from_url = lambda url: url[-1]
+        parser._check_sku_batch = MagicMock(return_value={'p/1': ProductInfo(title='One', url='p/1'), 'p/2': None})
+        parser.check_page = MagicMock(return_value=[ProductInfo(title='Three', url='p/3')])
+        results = parser.check_product_batch(['p/1', 'p/2', 'p/3'])
+        parser._check_sku_batch.assert_called_once_with({'1': 'p/1', '2': 'p/2', '3': 'p/3'})
+        parser.check_page.assert_called_once_with('p/3', PRODUCT_PAGE)
+        self.assertEqual(['One', 'Three'], [r.title for r in results])
+
+    def test_check_search_page_records_metrics(self):
+        parser = ParserBase(MagicMock(), 'MetricsTest')
+        parser.parse_search_page_source = MagicMock(return_value=[ProductInfo(title='Widget', url='https://a.com')] * 3)
+        with patch.object(parser, '_load_page', return_value='<html></html>'):
+            parser.check_search_page('https://example.com/search')
+        self.assertEqual(1, metrics.parse_seconds.get_count('MetricsTest', SEARCH_PAGE))
+        self.assertEqual(3, metrics.page_results.get_sum('MetricsTest', SEARCH_PAGE))
+
+    def test__load_page_records_fetch_metrics(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        before = metrics.fetch_seconds.get_count('metrics.example.com')
+        errors = metrics.fetch_errors.get('metrics.example.com', 'status_500')
+        responses = [self.get_mock_response(200, '<html></html>'), self.get_mock_response(500)]
+        with patch.object(parser.session, 'get', side_effect=responses):
+            parser._load_page('https://metrics.example.com/page')
+            parser._load_page('https://metrics.example.com/page')
+        self.assertEqual(before + 1, metrics.fetch_seconds.get_count('metrics.example.com'))
+        self.assertEqual(errors + 1, metrics.fetch_errors.get('metrics.example.com', 'status_500'))
+
+    def test_check_page_product_page_wrapped_in_list(self):
+        info = ProductInfo(title='Test Product', url='https://example.com')
+        self.parser.check_product_page = MagicMock(return_value=info)
+        self.assertEqual([info], self.parser.check_page('https://example.com', PRODUCT_PAGE))
+
+    def test_check_page_product_page_no_result(self):
+        self.parser.check_product_page = MagicMock(return_value=None)
+        self.assertEqual([], self.parser.check_page('https://example.com', PRODUCT_PAGE))
+
+    def test_check_page_unknown_type(self):
+        self.assertRaises(ValueError, self.parser.check_page, 'https://example.com', 'dummy')
+
+
+    def get_mock_response(self, status_code, text='', headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.text = text
+        response.headers = headers or {}
+        return response
+
+    def test__get_page_result_not_modified_reuses_result(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        parse = MagicMock(return_value=['result'])
+        responses = [self.get_mock_response(200, '<html></html>', {'ETag': '"abc"'}), self.get_mock_response(304)]
+        with patch.object(parser.session, 'get', side_effect=responses) as mocked_get:
+            self.assertEqual(['result'], parser._get_page_result('https://example.com', parse))
+            self.assertEqual(['result'], parser._get_page_result('https://example.com', parse))
+        self.assertEqual(1, parse.call_count)
+        self.assertEqual('"abc"', mocked_get.call_args[1]['headers']['If-None-Match'])
+
+    def test__get_page_result_modified_parses_again(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        parse = MagicMock(side_effect=[['old'], ['new']])
+        responses = [self.get_mock_response(200, '<html>old</html>', {'ETag': '"abc"'}),
+                     self.get_mock_response(200, '<html>new</html>', {'ETag': '"def"'})]
+        with patch.object(parser.session, 'get', side_effect=responses):
+            parser._get_page_result('https://example.com', parse)
+            self.assertEqual(['new'], parser._get_page_result('https://example.com', parse))
+
+    def test__load_page_not_modified_without_result_return_none(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        with patch.object(parser.session, 'get', return_value=self.get_mock_response(304)):
+            self.assertIsNone(parser._load_page('https://example.com'))
+
+    def test__load_page_rate_limiter_open_circuit_skips_request(self):
+        rate_limiter = MagicMock()
+        rate_limiter.acquire.return_value = False
+        parser = ParserBase(MagicMock(), 'walmart', rate_limiter=rate_limiter)
+        with patch.object(parser.session, 'get') as mocked_get:
+            self.assertIsNone(parser._load_page('https://example.com/page'))
+        mocked_get.assert_not_called()
+        rate_limiter.acquire.assert_called_with('example.com')
+
+    def test__load_page_rate_limiter_gets_response(self):
+        rate_limiter = MagicMock()
+        parser = ParserBase(MagicMock(), 'walmart', rate_limiter=rate_limiter)
+        response = self.get_mock_response(429, headers={'Retry-After': '10'})
+        with patch.object(parser.session, 'get', return_value=response):
+            self.assertIsNone(parser._load_page('https://example.com/page'))
+        rate_limiter.on_response.assert_called_with('example.com', 429, retry_after='10')
+
+    def test__load_page_regions_stops_reading_once_found(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        response = self.get_mock_response(200)
+        response.encoding = 'utf-8'
+        response.iter_content.return_value = iter([b'<html><div id="buy">', b'In Stock</div>', b'<footer>', b'</footer>'])
+        with patch.object(parser.session, 'get', return_value=response) as mocked_get:
+            page_source = parser._load_page('https://example.com/page', regions=['div#buy'])
+        self.assertEqual('<html><div id="buy">In Stock</div>', page_source)
+        self.assertTrue(mocked_get.call_args[1]['stream'])
+        response.close.assert_called_once()
+
+    def get_gzip_response(self, body: bytes):
+        raw = urllib3.HTTPResponse(
+            body=io.BytesIO(gzip.compress(body)),
+            headers={'Content-Encoding': 'gzip', 'Content-Type': 'text/html; charset=utf-8'},
+            status=200,
+            preload_content=False
+        )
+        return HTTPAdapter().build_response(requests.Request('GET', 'https://example.com/page').prepare(), raw)
+
+    def test__load_page_traffic_meter_records_wire_and_decoded_bytes(self):
+        parser = ParserBase(MagicMock(), 'walmart', traffic_meter=TrafficMeter())
+        body = b'<html>' + b'<p>In Stock</p>' * 1000 + b'</html>'
+        with patch.object(parser.session, 'get', return_value=self.get_gzip_response(body)):
+            self.assertEqual(body.decode(), parser._load_page('https://example.com/page'))
+        traffic = parser.traffic_meter.get_hosts()['example.com']
+        self.assertEqual(len(body), traffic.decoded_bytes)
+        self.assertEqual(len(gzip.compress(body)), traffic.wire_bytes)
+
+    def test__load_page_regions_traffic_meter_counts_bytes_read(self):
+        parser = ParserBase(MagicMock(), 'walmart', traffic_meter=TrafficMeter())
+        body = b'<html><div id="buy">In Stock</div>' + b'<p>Footer</p>' * 10000 + b'</html>'
+        with patch.object(parser.session, 'get', return_value=self.get_gzip_response(body)):
+            page_source = parser._load_page('https://example.com/page', regions=['div#buy'])
+        self.assertIn('In Stock</div>', page_source)
+        traffic = parser.traffic_meter.get_hosts()['example.com']
+        self.assertEqual(len(page_source), traffic.decoded_bytes)
+        self.assertLess(traffic.decoded_bytes, len(body))
+
+    def test__load_page_regions_bad_status_closes_response(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        response = self.get_mock_response(500)
+        with patch.object(parser.session, 'get', return_value=response):
+            self.assertIsNone(parser._load_page('https://example.com/page', regions=['div#buy']))
+        response.close.assert_called_once()
+        response.iter_content.assert_not_called()
+
+    def test_check_product_page_loads_up_to_regions(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        parser.product_page_regions = ['div#buy']
+        with patch.object(parser, '_load_page', return_value=None) as load_page:
+            parser.check_product_page('https://example.com/page')
+        load_page.assert_called_once_with('https://example.com/page', regions=['div#buy'])
+
+    def test__get_page_result_same_body_skips_parse(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        parse = MagicMock(return_value=['result'])
+        responses = [self.get_mock_response(200, '<html>same</html>'), self.get_mock_response(200, '<html>same</html>')]
+        with patch.object(parser.session, 'get', side_effect=responses):
+            parser._get_page_result('https://example.com', parse)
+            self.assertEqual(['result'], parser._get_page_result('https://example.com', parse))
+        self.assertEqual(1, parse.call_count)
+
+    def test__get_page_result_same_body_updates_validators(self):
+        parser = ParserBase(MagicMock(), 'walmart')
+        parse = MagicMock(return_value=['result'])
+        responses = [self.get_mock_response(200, '<html>same</html>', {'ETag': '"abc"'}),
+                     self.get_mock_response(200, '<html>same</html>', {'ETag': '"def"'})]
+        with patch.object(parser.session, 'get', side_effect=responses):
+            parser._get_page_result('https://example.com', parse)
+            parser._get_page_result('https://example.com', parse)
+        self.assertEqual({'If-None-Match': '"def"'}, parser.page_cache.get_validator_headers('https://example.com'))
+
+    def test_get_poll_interval(self):
+        parser = ParserBase(MagicMock(), 'walmart', search_page_interval=600, product_page_interval=60,
+                            poll_intervals={'https://example.com/hot': 15})
+        self.assertEqual(15, parser.get_poll_interval('https://example.com/hot', PRODUCT_PAGE))
+        self.assertEqual(60, parser.get_poll_interval('https://example.com/cold', PRODUCT_PAGE))
+        self.assertEqual(600, parser.get_poll_interval('https://example.com/search', SEARCH_PAGE))
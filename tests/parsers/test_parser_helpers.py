@@ -1,9 +1,11 @@
 from unittest import TestCase
+from unittest.mock import MagicMock
 
 from stockstalker.common.exceptions import NoNotificationAgents
 from stockstalker.models.parser_config import ParserConfig
 from stockstalker.parsers.newegg_parser import NeweggParser
-from stockstalker.parsers.parser_helpers import get_parser_by_name, parser_factory
+from stockstalker.parsers.parser_helpers import get_parser_by_name, parser_factory, get_link_urls, get_link_intervals
+from stockstalker.services.notification_svc import NotificationSvc
 
 
 class TestParserHelpers(TestCase):
@@ -34,6 +36,20 @@ class TestParserHelpers(TestCase):
 
         self.assertIsInstance(parser_factory(get_parser_config()), NeweggParser)
 
+    def test_parser_factory_shared_notification_svc(self):
+        notification_svc = NotificationSvc(MagicMock())
+        first = parser_factory(get_parser_config(), notification_svc=notification_svc)
+        second = parser_factory(get_parser_config(), notification_svc=notification_svc)
+        self.assertIs(notification_svc, first.notification_svc)
+        self.assertIs(notification_svc, second.notification_svc)
+
+    def test_parser_factory_same_webhook_shares_agent(self):
+        notification_svc = NotificationSvc(MagicMock())
+        first = parser_factory(get_parser_config(), notification_svc=notification_svc)
+        second = parser_factory(get_parser_config(), notification_svc=notification_svc)
+        self.assertIs(first.notification_agents[0], second.notification_agents[0])
+        self.assertEqual(1, len(notification_svc.notificaiton_agents))
+
     def test_get_parser_by_name_lower(self):
         parser_config = get_parser_config()
         parser_config.name = 'newegg'
@@ -49,6 +65,22 @@ class TestParserHelpers(TestCase):
         parser_config.name = 'dummy'
         self.assertRaises(ValueError, get_parser_by_name, parser_config)
 
+    def test_get_parser_by_name_link_intervals(self):
+        parser_config = get_parser_config()
+        parser_config.links = {
+            'search_pages': ['https://newegg.com/search'],
+            'product_pages': [{'url': 'https://newegg.com/hot', 'interval': 15}, {'url': 'https://newegg.com/cold'}]
+        }
+        parser = get_parser_by_name(parser_config)
+        self.assertEqual(['https://newegg.com/hot', 'https://newegg.com/cold'], parser.product_pages)
+        self.assertEqual({'https://newegg.com/hot': 15}, parser.poll_intervals)
+
+    def test_get_link_urls_mixed(self):
+        self.assertEqual(['a', 'b'], get_link_urls(['a', {'url': 'b', 'interval': 15}]))
+
+    def test_get_link_intervals_only_dicts_with_interval(self):
+        self.assertEqual({'b': 15}, get_link_intervals(['a', {'url': 'b', 'interval': 15}, {'url': 'c'}]))
+
 
 def get_parser_config():
     return ParserConfig(
@@ -0,0 +1,77 @@
+import os
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from stockstalker.parsers.best_buy_parser import BestBuyParser
+from stockstalker.parsers.region_tracker import RegionTracker
+
+
+def feed_until_complete(tracker: RegionTracker, page_source: str, chunk_size: int = 16384) -> str:
+    received = ''
+    for i in range(0, len(page_source), chunk_size):
+        received += page_source[i:i + chunk_size]
+        tracker.feed(page_source[i:i + chunk_size])
+        if tracker.complete:
+            break
+    return received
+
+
+class TestRegionTracker(TestCase):
+
+    def test_complete_after_region_closes(self):
+        tracker = RegionTracker(['div#buy'])
+        tracker.feed('<html><body><div id="buy"><button>Add to Cart</button>')
+        self.assertFalse(tracker.complete)
+        tracker.feed('</div>')
+        self.assertTrue(tracker.complete)
+
+    def test_nested_same_tag_waits_for_outer_close(self):
+        tracker = RegionTracker(['div.buy-box'])
+        tracker.feed('<div class="buy-box wide"><div>Price</div>')
+        self.assertFalse(tracker.complete)
+        tracker.feed('</div>')
+        self.assertTrue(tracker.complete)
+
+    def test_unclosed_children_closed_with_parent(self):
+        tracker = RegionTracker(['section.price'])
+        tracker.feed('<section class="price"><p>$10<span>.99<br><img src="a.png"></section>')
+        self.assertTrue(tracker.complete)
+
+    def test_every_region_needed(self):
+        tracker = RegionTracker(['h1.title', 'div#buy'])
+        tracker.feed('<h1 class="title">Widget</h1>')
+        self.assertFalse(tracker.complete)
+        tracker.feed('<div id="buy"></div>')
+        self.assertTrue(tracker.complete)
+
+    def test_product_json_completes_before_regions(self):
+        tracker = RegionTracker(['div#buy'], product_json=True)
+        tracker.feed('<script type="application/ld+json">{"@type": "Review", "itemReviewed": {"@type": "Product"}}')
+        tracker.feed('</script>')
+        self.assertFalse(tracker.complete)
+        tracker.feed('<script type="application/ld+json">{"@type": "Product", "name": "Widget", ')
+        self.assertFalse(tracker.complete)
+        tracker.feed('"offers": {"availability": "InStock"}}</script>')
+        self.assertTrue(tracker.complete)
+
+    def test_product_json_regions_still_complete(self):
+        tracker = RegionTracker(['div#buy'], product_json=True)
+        tracker.feed('<div id="buy"></div>')
+        self.assertTrue(tracker.complete)
+
+    def test_multi_step_region_raises(self):
+        with self.assertRaises(ValueError):
+            RegionTracker(['div#buy button'])
+
+    def test_best_buy_page_up_to_regions_parses_same(self):
+        parser = BestBuyParser(MagicMock(), 'bestbuy')
+        for page_name in ('bestbuy_product_instock.html', 'bestbuy_product_out_of_stock.html'):
+            with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'example_pages', page_name), 'r') as f:
+                page_source = f.read()
+            received = feed_until_complete(RegionTracker(parser.product_page_regions), page_source)
+            self.assertLess(len(received), len(page_source) / 2)
+            self.assertEqual(
+                parser.parse_product_page_source(page_source, url='https://bestbuy.com/p/1'),
+                parser.parse_product_page_source(received, url='https://bestbuy.com/p/1'),
+                page_name
+            )
@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.parsers.structured_data import get_product_from_ld_json
+
+
+def get_page(ld_json: str) -> str:
+    return f'<html><head><script type="application/ld+json">{ld_json}</script></head><body></body></html>'
+
+
+class TestStructuredData(TestCase):
+
+    def test_get_product_from_ld_json_in_stock(self):
+        page = get_page('{"@type": "Product", "name": " Widget ", "sku": 123, '
+                        '"offers": {"@type": "Offer", "price": "1299.5", "availability": "http://schema.org/InStock"}}')
+        self.assertEqual(
+            ProductInfo(title='Widget', url='https://example.com', in_stock=True, price='$1,299.50', sku='123'),
+            get_product_from_ld_json(page, url='https://example.com')
+        )
+
+    def test_get_product_from_ld_json_sold_out(self):
+        page = get_page('{"@type": "Product", "name": "Widget", '
+                        '"offers": {"price": "10", "availability": "https://schema.org/SoldOut"}}')
+        self.assertFalse(get_product_from_ld_json(page).in_stock)
+
+    def test_get_product_from_ld_json_pre_order_not_in_stock(self):
+        page = get_page('{"@type": "Product", "name": "Widget", '
+                        '"offers": {"price": "10", "availability": "https://schema.org/PreOrder"}}')
+        self.assertFalse(get_product_from_ld_json(page).in_stock)
+
+    def test_get_product_from_ld_json_any_offer_in_stock(self):
+        page = get_page('[{"@type": "BreadcrumbList"}, {"@type": "Product", "name": "Widget", "offers": ['
+                        '{"availability": "OutOfStock"}, {"lowPrice": 5, "availability": "InStock"}]}]')
+        product = get_product_from_ld_json(page)
+        self.assertTrue(product.in_stock)
+        self.assertEqual('$5.00', product.price)
+
+    def test_get_product_from_ld_json_no_availability_none(self):
+        page = get_page('{"@type": "Product", "name": "Widget", "sku": "123"}')
+        self.assertIsNone(get_product_from_ld_json(page))
+
+    def test_get_product_from_ld_json_invalid_json_skipped(self):
+        page = get_page('{"@type": "Product", ') + get_page(
+            '{"@type": "Product", "name": "Widget", "offers": {"availability": "InStock"}}'
+        )
+        self.assertEqual('Widget', get_product_from_ld_json(page).title)
+
+    def test_get_product_from_ld_json_no_json_none(self):
+        self.assertIsNone(get_product_from_ld_json('<html><body><h1>Widget</h1></body></html>'))
@@ -6,6 +6,8 @@ from bs4 import BeautifulSoup
 
 from stockstalker.parsers.walmart_parser import WalmartParser
 
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_pages')
+
 
 class TestWalmartParser(TestCase):
 
@@ -35,17 +37,7 @@ class TestWalmartParser(TestCase):
             return BeautifulSoup(f.read(), 'html.parser')
 
     def get_example_page_dir(self):
-        """
-        Hacky way to get the root test path.  Needed it since running single tests sets a different CWD
-        :return:
-        """
-        path, tail = os.path.split(os.getcwd())
-        while tail:
-            if tail == 'tests':
-                return os.path.join(path, tail, 'example_pages')
-            path, tail = os.path.split(path)
-            if not tail:
-                break
+        return EXAMPLE_PAGE_DIR
 
 
     def test__is_in_stock_search_result_false(self):
@@ -127,4 +119,17 @@ class TestWalmartParser(TestCase):
     def test__get_title_from_product_page_missing_title_return_none(self):
         page = self.get_product_page_in_stock()
         page.find('h1', {'class': 'prod-ProductTitle'}).decompose()
-        self.assertIsNone(self.parser._get_title_from_product_page(page))
\ No newline at end of file
+        self.assertIsNone(self.parser._get_title_from_product_page(page))
+
+    def test_parse_search_page_source_region_matches_full_page(self):
+        with open(os.path.join(self.get_example_page_dir(), 'walmart_search_page.html'), 'r') as f:
+            page_source = f.read()
+        expected = self.parser.parse_search_page(self.get_search_page())
+        self.assertTrue(expected)
+        self.assertEqual(expected, self.parser.parse_search_page_source(page_source))
+
+    def test_parse_product_page_source_no_json_falls_back(self):
+        with open(os.path.join(self.get_example_page_dir(), 'walmart_product_instock.html'), 'r') as f:
+            page_source = f.read()
+        expected = self.parser.parse_product_page(self.get_product_page_in_stock(), url='https://walmart.com/p/1')
+        self.assertEqual(expected, self.parser.parse_product_page_source(page_source, url='https://walmart.com/p/1'))
@@ -0,0 +1,178 @@
+import dataclasses
+import functools
+import multiprocessing
+import os
+import socket
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from stockstalker.models.parser_config import ParserConfig
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.parsers.parser_helpers import get_parser_by_name
+from stockstalker.services.coordinator_svc import Coordinator
+from stockstalker.services.worker_svc import run_worker, StockWorker
+
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_pages')
+
+
+def get_config(product_pages, notification_agents=None):
+    return ParserConfig(
+        name='newegg',
+        links={'search_pages': [], 'product_pages': product_pages},
+        ignore_title_keywords=[],
+        ignore_urls=[],
+        notification_agents=notification_agents or [],
+        product_page_interval=60
+    )
+
+
+class TestCoordinator(TestCase):
+
+    def get_coordinator(self, urls, **kwargs):
+        config = get_config(urls, notification_agents=[{'name': 'discord', 'webhook': 'https://example.com/hook'}])
+        parser = ParserBase(MagicMock(), 'newegg', product_pages=urls)
+        coordinator = Coordinator([config], [parser], **kwargs)
+        self.addCleanup(coordinator.server.server_close)
+        return coordinator
+
+    def test_lease_hands_out_each_url_once(self):
+        coordinator = self.get_coordinator(['a', 'b', 'c'])
+        first = coordinator.lease('w1', max_leases=2, now=0)
+        second = coordinator.lease('w2', max_leases=2, now=0)
+        self.assertEqual(['a', 'b'], [lease['url'] for lease in first['leases']])
+        self.assertEqual(['c'], [lease['url'] for lease in second['leases']])
+
+    def test_lease_none_due_waits(self):
+        coordinator = self.get_coordinator(['a'], lease_time=30, max_wait=60)
+        coordinator.lease('w1', now=0)
+        response = coordinator.lease('w2', now=10)
+        self.assertEqual([], response['leases'])
+        self.assertEqual(20, response['wait'])
+
+    def test_lease_wait_capped(self):
+        coordinator = self.get_coordinator(['a'], lease_time=30, max_wait=5)
+        coordinator.lease('w1', now=0)
+        self.assertEqual(5, coordinator.lease('w2', now=10)['wait'])
+
+    def test_lease_expired_leased_again(self):
+        coordinator = self.get_coordinator(['a'], lease_time=30)
+        coordinator.lease('w1', now=0)
+        self.assertEqual(['a'], [lease['url'] for lease in coordinator.lease('w2', now=31)['leases']])
+
+    def test_lease_expired_forgets_old_lease(self):
+        coordinator = self.get_coordinator(['a'], lease_time=30)
+        old_lease_id = coordinator.lease('w1', now=0)['leases'][0]['lease']
+        new_lease_id = coordinator.lease('w2', now=31)['leases'][0]['lease']
+        self.assertEqual([new_lease_id], list(coordinator.tasks_by_lease))
+        self.assertNotIn(old_lease_id, coordinator.tasks_by_lease)
+
+    def test_complete_expired_lease_dropped(self):
+        coordinator = self.get_coordinator(['a'], lease_time=30)
+        lease_id = coordinator.lease('w1', now=0)['leases'][0]['lease']
+        coordinator.lease('w2', now=31)
+        self.assertFalse(coordinator.complete('w1', lease_id, [], now=32))
+        self.assertEqual(0, coordinator.tasks[0].runs)
+
+    def test_complete_notifies(self):
+        coordinator = self.get_coordinator(['a'])
+        lease_id = coordinator.lease('w1', now=0)['leases'][0]['lease']
+        results = [ProductInfo(title='Widget', url='a', in_stock=True)]
+        self.assertTrue(coordinator.complete('w1', lease_id, results, now=1))
+        coordinator.parsers[0].notification_svc.send_notificaiton.assert_called_once()
+
+    def test_complete_twice_counted_once(self):
+        coordinator = self.get_coordinator(['a'])
+        lease_id = coordinator.lease('w1', now=0)['leases'][0]['lease']
+        coordinator.complete('w1', lease_id, [], now=1)
+        self.assertFalse(coordinator.complete('w1', lease_id, [], now=2))
+        self.assertEqual(1, coordinator.tasks[0].runs)
+
+    def test_lease_done_after_single_run(self):
+        coordinator = self.get_coordinator(['a'])
+        lease_id = coordinator.lease('w1', now=0)['leases'][0]['lease']
+        coordinator.complete('w1', lease_id, [], now=1)
+        self.assertEqual({'done': True}, coordinator.lease('w1', now=2))
+
+    def test_lease_repeat_after_poll_interval(self):
+        coordinator = self.get_coordinator(['a'], repeat=True)
+        lease_id = coordinator.lease('w1', now=0)['leases'][0]['lease']
+        coordinator.complete('w1', lease_id, [], now=1)
+        self.assertEqual([], coordinator.lease('w1', now=60)['leases'])
+        self.assertEqual(['a'], [lease['url'] for lease in coordinator.lease('w1', now=61)['leases']])
+
+    def test_get_worker_configs_strips_notification_agents(self):
+        coordinator = self.get_coordinator(['a'])
+        self.assertEqual([], coordinator.get_worker_configs()[0]['notification_agents'])
+
+    def test_hello_sends_host_rate(self):
+        coordinator = self.get_coordinator(['a'], host_rate=0.5, host_burst=2)
+        response = coordinator.handle_message({'op': 'hello', 'worker': 'w1'})
+        self.assertEqual((0.5, 2), (response['host_rate'], response['host_burst']))
+
+
+class TestStockWorker(TestCase):
+
+    def test_build_parsers_share_rate_limiter(self):
+        rate_limiter = MagicMock()
+        parsers = StockWorker._build_parsers([dataclasses.asdict(get_config(['a']))] * 2, rate_limiter)
+        self.assertEqual([rate_limiter, rate_limiter], [parser.rate_limiter for parser in parsers])
+
+    def test_run_worker_coordinator_not_answering(self):
+        with socket.create_server(('127.0.0.1', 0)) as server:
+            host, port = server.getsockname()
+            with patch('stockstalker.services.worker_svc.log') as log:
+                run_worker(host, port, timeout=0.1)
+        log.error.assert_called_once()
+
+    def test_run_worker_coordinator_gone(self):
+        with socket.create_server(('127.0.0.1', 0)) as server:
+            host, port = server.getsockname()
+        with patch('stockstalker.services.worker_svc.log') as log:
+            run_worker(host, port, timeout=0.1)
+        log.error.assert_called_once()
+
+
+class TestCoordinatorEndToEnd(TestCase):
+
+    def setUp(self) -> None:
+        handler = functools.partial(QuietHandler, directory=EXAMPLE_PAGE_DIR)
+        self.page_server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        threading.Thread(target=self.page_server.serve_forever, daemon=True).start()
+        self.addCleanup(self.page_server.server_close)
+        self.addCleanup(self.page_server.shutdown)
+
+    def test_workers_check_every_url_once(self):
+        page_port = self.page_server.server_address[1]
+        urls = [f'http://127.0.0.1:{page_port}/newegg_product_instock.html?item={i}' for i in range(6)]
+        config = get_config(urls)
+        parser = get_parser_by_name(config, notification_svc=MagicMock())
+        coordinator = Coordinator([config], [parser])
+        coordinator.start()
+        self.addCleanup(coordinator.shutdown)
+
+        host, port = coordinator.address
+        context = multiprocessing.get_context('spawn')
+        workers = [
+            context.Process(target=run_worker, args=(host, port), kwargs={'worker_id': f'worker-{i}', 'max_leases': 1})
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        self.assertTrue(coordinator.wait(timeout=120))
+        for worker in workers:
+            worker.join(timeout=30)
+            self.assertEqual(0, worker.exitcode)
+
+        self.assertEqual([1] * len(urls), [task.runs for task in coordinator.tasks])
+        notified = [c[0][1] for c in parser.notification_svc.send_notificaiton.call_args_list]
+        self.assertEqual(len(urls), len(notified))
+        self.assertTrue(all(task.worker is None for task in coordinator.tasks))
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import Counter
+from typing import List, Text
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.services.fetch_engine import FetchEngine
+
+
+class DummyParser(ParserBase):
+
+    def __init__(self, name: Text, tracker: 'ConcurrencyTracker', search_pages=None, product_pages=None):
+        super().__init__(MagicMock(), name, search_pages=search_pages, product_pages=product_pages)
+        self.tracker = tracker
+
+    def check_page(self, url: Text, page_type: Text) -> List[ProductInfo]:
+        self.tracker.enter(self.name)
+        try:
+            time.sleep(0.02)
+            if 'bad' in url:
+                raise ValueError('Bad page')
+            return [ProductInfo(title=url, url=url, in_stock=True)]
+        finally:
+            self.tracker.exit(self.name)
+
+
+class ConcurrencyTracker:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = Counter()
+        self.max_running = Counter()
+        self.total = 0
+        self.max_total = 0
+        self.started = 0
+
+    def enter(self, name: Text):
+        with self.lock:
+            self.running[name] += 1
+            self.total += 1
+            self.started += 1
+            self.max_running[name] = max(self.max_running[name], self.running[name])
+            self.max_total = max(self.max_total, self.total)
+
+    def exit(self, name: Text):
+        with self.lock:
+            self.running[name] -= 1
+            self.total -= 1
+
+
+class TestFetchEngine(TestCase):
+
+    def get_parsers(self, tracker: ConcurrencyTracker) -> List[DummyParser]:
+        return [
+            DummyParser('newegg', tracker, search_pages=[f'http://newegg.com/s/{i}' for i in range(5)],
+                        product_pages=[f'http://newegg.com/p/{i}' for i in range(10)]),
+            DummyParser('bestbuy', tracker, product_pages=[f'http://bestbuy.com/p/{i}' for i in range(10)]),
+        ]
+
+    def test_sweep_checks_every_url(self):
+        tracker = ConcurrencyTracker()
+        parsers = self.get_parsers(tracker)
+        results = FetchEngine(max_workers=8, max_per_retailer=4).sweep(parsers)
+        self.assertEqual(15, len(results[parsers[0]]))
+        self.assertEqual(10, len(results[parsers[1]]))
+
+    def test_sweep_respects_global_cap(self):
+        tracker = ConcurrencyTracker()
+        FetchEngine(max_workers=3, max_per_retailer=3).sweep(self.get_parsers(tracker))
+        self.assertLessEqual(tracker.max_total, 3)
+
+    def test_sweep_respects_retailer_cap(self):
+        tracker = ConcurrencyTracker()
+        FetchEngine(max_workers=10, max_per_retailer=2).sweep(self.get_parsers(tracker))
+        self.assertEqual(2, tracker.max_running['newegg'])
+        self.assertEqual(2, tracker.max_running['bestbuy'])
+
+    def test_sweep_retailer_cap_shared_by_name(self):
+        tracker = ConcurrencyTracker()
+        parsers = [
+            DummyParser('newegg', tracker, product_pages=[f'http://newegg.com/a/{i}' for i in range(5)]),
+            DummyParser('NEWEGG', tracker, product_pages=[f'http://newegg.com/b/{i}' for i in range(5)]),
+        ]
+        FetchEngine(max_workers=10, max_per_retailer=2).sweep(parsers)
+        self.assertLessEqual(tracker.max_running['newegg'] + tracker.max_running['NEWEGG'], 4)
+        self.assertLessEqual(tracker.max_total, 2)
+
+    def test_sweep_failed_url_skipped(self):
+        tracker = ConcurrencyTracker()
+        parser = DummyParser('newegg', tracker, product_pages=['http://newegg.com/bad', 'http://newegg.com/good'])
+        results = FetchEngine().sweep([parser])
+        self.assertEqual(['http://newegg.com/good'], [r.url for r in results[parser]])
+
+    def test_sweep_no_urls(self):
+        parser = DummyParser('newegg', ConcurrencyTracker())
+        self.assertEqual({parser: []}, FetchEngine().sweep([parser]))
+
+    def test_check_stock_notifies_each_parser(self):
+        tracker = ConcurrencyTracker()
+        parsers = self.get_parsers(tracker)
+        for parser in parsers:
+            parser.notify_in_stock = MagicMock()
+        FetchEngine().check_stock(parsers)
+        self.assertEqual(15, sum(len(c[0][0]) for c in parsers[0].notify_in_stock.call_args_list))
+        self.assertEqual(10, sum(len(c[0][0]) for c in parsers[1].notify_in_stock.call_args_list))
+
+    def test_check_stock_notifies_each_page(self):
+        parsers = self.get_parsers(ConcurrencyTracker())
+        for parser in parsers:
+            parser.notify_in_stock = MagicMock()
+        FetchEngine().check_stock(parsers)
+        self.assertEqual(15, parsers[0].notify_in_stock.call_count)
+
+    def test_check_stock_batches_whole_sweep(self):
+        parsers = self.get_parsers(ConcurrencyTracker())
+        notification_svc = MagicMock()
+        for parser in parsers:
+            parser.notification_svc = notification_svc
+            parser.notify_in_stock = MagicMock()
+        FetchEngine().check_stock(parsers)
+        notification_svc.batch.assert_called_once_with()
+        notification_svc.batch.return_value.__exit__.assert_called_once()
+
+    def test_stream_yields_before_sweep_finishes(self):
+        tracker = ConcurrencyTracker()
+        parsers = self.get_parsers(tracker)
+        stream = FetchEngine(max_workers=2, max_per_retailer=2).stream(parsers)
+        parser, results = next(stream)
+        self.assertEqual(1, len(results))
+        self.assertLess(tracker.started, 25)
+        stream.close()
+
+    def test_stream_slow_consumer_applies_backpressure(self):
+        tracker = ConcurrencyTracker()
+        consumed = 0
+        for _ in FetchEngine(max_workers=3, max_per_retailer=3).stream(self.get_parsers(tracker)):
+            consumed += 1
+            time.sleep(0.05)
+            self.assertLessEqual(tracker.started, consumed + 3)
+        self.assertEqual(25, consumed)
+
+    def test_sweep_checks_product_batches_as_one_task(self):
+        tracker = ConcurrencyTracker()
+        parser = DummyParser('bestbuy', tracker, product_pages=[f'http://bestbuy.com/p/{i}' for i in range(5)])
+        parser.product_batch_size = 2
+        parser.get_sku_from_url = lambda url: url[-1]
+        parser.check_product_batch = MagicMock(side_effect=lambda urls: [ProductInfo(title=u, url=u) for u in urls])
+        results = FetchEngine().sweep([parser])
+        # The odd page out is checked on its own
+        self.assertEqual(2, parser.check_product_batch.call_count)
+        self.assertEqual(1, tracker.started)
+        self.assertEqual(5, len(results[parser]))
+
+    def test_invalid_caps_raise(self):
+        self.assertRaises(ValueError, FetchEngine, 0, 1)
+        self.assertRaises(ValueError, FetchEngine, 1, 0)
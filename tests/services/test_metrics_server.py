@@ -0,0 +1,30 @@
+from unittest import TestCase
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from stockstalker.common.metrics import MetricsRegistry
+from stockstalker.services.metrics_server import MetricsServer
+
+
+class TestMetricsServer(TestCase):
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+        self.registry.counter('test_total', 'Test').inc()
+        self.server = MetricsServer(host='127.0.0.1', port=0, registry=self.registry)
+        self.server.start()
+        self.base_url = 'http://%s:%s' % self.server.address
+
+    def tearDown(self):
+        self.server.shutdown()
+
+    def test_metrics_served(self):
+        with urlopen(self.base_url + '/metrics', timeout=5) as response:
+            self.assertEqual(200, response.status)
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain'))
+            self.assertIn('test_total 1', response.read().decode())
+
+    def test_other_paths_not_found(self):
+        with self.assertRaises(HTTPError) as e:
+            urlopen(self.base_url + '/', timeout=5)
+        self.assertEqual(404, e.exception.code)
@@ -0,0 +1,122 @@
+import threading
+from typing import List, Text
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from stockstalker.common.exceptions import NotificationDeliveryFailed
+from stockstalker.notifyagents.notification_agent import NotificationAgent
+from stockstalker.services.notification_dispatcher import NotificationDispatcher
+
+
+class RecordingAgent(NotificationAgent):
+
+    def __init__(self, failures: int = 0):
+        super().__init__('recording')
+        self.failures = failures
+        self.batches = []
+
+    def send_batch(self, messages: List[Text]):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('Webhook down')
+        self.batches.append(messages)
+
+
+class TestNotificationDispatcher(TestCase):
+
+    def test_submit_delivers_in_background(self):
+        dispatcher = NotificationDispatcher(batch_window=0)
+        agent = RecordingAgent()
+        on_done = MagicMock()
+        dispatcher.submit(agent, 'msg', 'id', on_done)
+        dispatcher.shutdown()
+        self.assertEqual([['msg']], agent.batches)
+        on_done.assert_called_once_with(['id'], True)
+
+    def test_submit_coalesces_within_window(self):
+        dispatcher = NotificationDispatcher(batch_window=5)
+        agent = RecordingAgent()
+        for i in range(3):
+            dispatcher.submit(agent, f'msg {i}', f'id {i}', MagicMock())
+        dispatcher.shutdown()
+        self.assertEqual([['msg 0', 'msg 1', 'msg 2']], agent.batches)
+
+    def test_submit_coalesced_reported_together(self):
+        dispatcher = NotificationDispatcher(batch_window=5)
+        agent = RecordingAgent()
+        on_done = MagicMock()
+        for i in range(3):
+            dispatcher.submit(agent, f'msg {i}', f'id {i}', on_done)
+        dispatcher.shutdown()
+        on_done.assert_called_once_with(['id 0', 'id 1', 'id 2'], True)
+
+    def test_submit_batch_size_capped(self):
+        dispatcher = NotificationDispatcher(batch_window=5, max_batch=2)
+        agent = RecordingAgent()
+        for i in range(3):
+            dispatcher.submit(agent, f'msg {i}', f'id {i}', MagicMock())
+        dispatcher.shutdown()
+        self.assertEqual([['msg 0', 'msg 1'], ['msg 2']], agent.batches)
+
+    def test_submit_agents_delivered_separately(self):
+        dispatcher = NotificationDispatcher(batch_window=0)
+        agents = [RecordingAgent(), RecordingAgent()]
+        for agent in agents:
+            dispatcher.submit(agent, 'msg', 'id', MagicMock())
+        dispatcher.shutdown()
+        self.assertEqual([[['msg']], [['msg']]], [agent.batches for agent in agents])
+
+    def test_submit_slow_agent_does_not_block_caller(self):
+        dispatcher = NotificationDispatcher(batch_window=0)
+        release = threading.Event()
+        agent = MagicMock()
+        agent.send_batch.side_effect = lambda messages: release.wait(5)
+        dispatcher.submit(agent, 'msg', 'id', MagicMock())
+        dispatcher.submit(agent, 'msg', 'id', MagicMock())
+        release.set()
+        dispatcher.shutdown()
+        self.assertEqual(2, agent.send_batch.call_count)
+
+    def test_deliver_retries_failures(self):
+        dispatcher = NotificationDispatcher(batch_window=0, max_retries=2, retry_backoff=0)
+        agent = RecordingAgent(failures=2)
+        on_done = MagicMock()
+        dispatcher.submit(agent, 'msg', 'id', on_done)
+        dispatcher.shutdown()
+        self.assertEqual([['msg']], agent.batches)
+        on_done.assert_called_once_with(['id'], True)
+
+    def test_deliver_gives_up_after_retries(self):
+        dispatcher = NotificationDispatcher(batch_window=0, max_retries=1, retry_backoff=0)
+        agent = RecordingAgent(failures=5)
+        on_done = MagicMock()
+        dispatcher.submit(agent, 'msg', 'id', on_done)
+        dispatcher.shutdown()
+        self.assertEqual([], agent.batches)
+        on_done.assert_called_once_with(['id'], False)
+
+    def test_deliver_retries_only_undelivered(self):
+        dispatcher = NotificationDispatcher(batch_window=5, max_retries=1, retry_backoff=0)
+        agent = MagicMock()
+        agent.send_batch.side_effect = [NotificationDeliveryFailed('Webhook down', delivered=2), None]
+        on_done = MagicMock()
+        for i in range(3):
+            dispatcher.submit(agent, f'msg {i}', f'id {i}', on_done)
+        dispatcher.shutdown()
+        self.assertEqual(['msg 2'], agent.send_batch.call_args_list[1][0][0])
+        self.assertEqual([(['id 0', 'id 1'], True), (['id 2'], True)], [c[0] for c in on_done.call_args_list])
+
+    def test_deliver_gives_up_on_undelivered_only(self):
+        dispatcher = NotificationDispatcher(batch_window=5, max_retries=0)
+        agent = MagicMock()
+        agent.send_batch.side_effect = NotificationDeliveryFailed('Webhook down', delivered=1)
+        on_done = MagicMock()
+        for i in range(2):
+            dispatcher.submit(agent, f'msg {i}', f'id {i}', on_done)
+        dispatcher.shutdown()
+        self.assertEqual([(['id 0'], True), (['id 1'], False)], [c[0] for c in on_done.call_args_list])
+
+    def test_submit_after_shutdown_raises(self):
+        dispatcher = NotificationDispatcher()
+        dispatcher.shutdown()
+        self.assertRaises(RuntimeError, dispatcher.submit, RecordingAgent(), 'msg', 'id', MagicMock())
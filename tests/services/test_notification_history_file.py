@@ -0,0 +1,54 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from stockstalker.services.notification_history_file import NotificationHistoryFile
+
+
+class TestNotificationHistoryFile(TestCase):
+
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.history_file = os.path.join(temp_dir.name, 'history.log')
+
+    def test_has_been_notified_loaded_from_file(self):
+        with open(self.history_file, 'w') as f:
+            f.write('https://example.com/1\nhttps://example.com/2\n\n')
+        history = NotificationHistoryFile(self.history_file)
+        self.assertTrue(history.has_been_notified('https://example.com/2'))
+        self.assertFalse(history.has_been_notified('https://example.com/3'))
+        self.assertFalse(history.has_been_notified(''))
+
+    def test_add_history_updates_index(self):
+        history = NotificationHistoryFile(self.history_file)
+        history.add_history('https://example.com/1')
+        self.assertTrue(history.has_been_notified('https://example.com/1'))
+
+    def test_add_history_written_to_file(self):
+        NotificationHistoryFile(self.history_file).add_history('https://example.com/1')
+        self.assertTrue(NotificationHistoryFile(self.history_file).has_been_notified('https://example.com/1'))
+
+    def test_add_history_duplicate_written_once(self):
+        history = NotificationHistoryFile(self.history_file)
+        history.add_history('https://example.com/1')
+        history.add_history('https://example.com/1')
+        with open(self.history_file, 'r') as f:
+            self.assertEqual(['https://example.com/1\n'], f.readlines())
+
+    def test_remove_history(self):
+        history = NotificationHistoryFile(self.history_file)
+        history.add_history('https://example.com/1')
+        history.add_history('https://example.com/2')
+        history.remove_history('https://example.com/1')
+        self.assertFalse(history.has_been_notified('https://example.com/1'))
+        reloaded = NotificationHistoryFile(self.history_file)
+        self.assertFalse(reloaded.has_been_notified('https://example.com/1'))
+        self.assertTrue(reloaded.has_been_notified('https://example.com/2'))
+
+    def test_clear_history(self):
+        history = NotificationHistoryFile(self.history_file)
+        history.add_history('https://example.com/1')
+        history.clear_history()
+        self.assertFalse(history.has_been_notified('https://example.com/1'))
+        self.assertEqual(0, os.path.getsize(self.history_file))
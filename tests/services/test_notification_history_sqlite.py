@@ -0,0 +1,120 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from stockstalker.services.notification_history_sqlite import NotificationHistorySqlite
+
+
+class TestNotificationHistorySqlite(TestCase):
+
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.db_path = os.path.join(temp_dir.name, 'history.db')
+
+    def get_history(self, **kwargs):
+        history = NotificationHistorySqlite(self.db_path, **kwargs)
+        self.addCleanup(history.close)
+        return history
+
+    def count_rows(self, history):
+        return history.conn.execute('SELECT COUNT(*) FROM notification_history').fetchone()[0]
+
+    def test_has_been_notified_after_add(self):
+        history = self.get_history()
+        history.add_history('https://example.com/1')
+        self.assertTrue(history.has_been_notified('https://example.com/1'))
+        self.assertFalse(history.has_been_notified('https://example.com/2'))
+
+    def test_add_history_persisted(self):
+        self.get_history().add_history('https://example.com/1')
+        self.assertTrue(self.get_history().has_been_notified('https://example.com/1'))
+
+    def test_batch_writes_on_exit(self):
+        history = self.get_history()
+        with history.batch():
+            history.add_history('https://example.com/1')
+            history.add_history('https://example.com/2')
+            self.assertTrue(history.has_been_notified('https://example.com/1'))
+            self.assertEqual(0, self.count_rows(history))
+        self.assertEqual(2, self.count_rows(history))
+
+    def test_batch_nested_writes_on_outer_exit(self):
+        history = self.get_history()
+        with history.batch():
+            with history.batch():
+                history.add_history('https://example.com/1')
+            self.assertEqual(0, self.count_rows(history))
+        self.assertEqual(1, self.count_rows(history))
+
+    def test_add_history_held_until_flush_interval(self):
+        history = self.get_history(flush_interval=0.05)
+        history.add_history('https://example.com/1')
+        flush_timer = history._flush_timer
+        history.add_history('https://example.com/2')
+        self.assertTrue(history.has_been_notified('https://example.com/1'))
+        self.assertEqual(0, self.count_rows(history))
+        flush_timer.join(1)
+        self.assertEqual(2, self.count_rows(history))
+
+    def test_batch_writes_at_flush_size(self):
+        history = self.get_history(flush_size=2)
+        with history.batch():
+            history.add_history('https://example.com/1')
+            self.assertEqual(0, self.count_rows(history))
+            history.add_history('https://example.com/2')
+            self.assertEqual(2, self.count_rows(history))
+
+    def test_remove_history(self):
+        history = self.get_history()
+        history.add_history('https://example.com/1')
+        history.remove_history('https://example.com/1')
+        self.assertFalse(history.has_been_notified('https://example.com/1'))
+
+    def test_clear_history(self):
+        history = self.get_history()
+        history.add_history('https://example.com/1')
+        history.clear_history()
+        self.assertEqual(0, self.count_rows(history))
+
+    def test_has_been_notified_expired(self):
+        history = self.get_history(ttl=60)
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1000):
+            history.add_history('https://example.com/1')
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1059):
+            self.assertTrue(history.has_been_notified('https://example.com/1'))
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1060):
+            self.assertFalse(history.has_been_notified('https://example.com/1'))
+
+    def test_add_history_again_after_expired(self):
+        history = self.get_history(ttl=60)
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1000):
+            history.add_history('https://example.com/1')
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1100):
+            history.add_history('https://example.com/1')
+            self.assertTrue(history.has_been_notified('https://example.com/1'))
+
+    def test_compact_removes_expired(self):
+        history = self.get_history(ttl=60)
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1000):
+            history.add_history('https://example.com/1')
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1050):
+            history.add_history('https://example.com/2')
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1070):
+            self.assertEqual(1, history.compact())
+        self.assertEqual(1, self.count_rows(history))
+
+    def test_compact_without_ttl_keeps_all(self):
+        history = self.get_history()
+        history.add_history('https://example.com/1')
+        self.assertEqual(0, history.compact())
+        self.assertEqual(1, self.count_rows(history))
+
+    def test_add_history_compacts_after_interval(self):
+        history = self.get_history(ttl=60, compact_interval=0)
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1000):
+            history.add_history('https://example.com/1')
+        with patch('stockstalker.services.notification_history_sqlite.time.time', return_value=1100):
+            history.add_history('https://example.com/2')
+        self.assertEqual(1, self.count_rows(history))
@@ -0,0 +1,170 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from stockstalker.common import metrics
+from stockstalker.notifyagents.discord_agent import DiscordAgent
+from stockstalker.services.notification_dispatcher import NotificationDispatcher
+from stockstalker.services.notification_svc import NotificationSvc
+
+
+class TestNotificationSvc(TestCase):
+
+    def get_history(self, notified=()):
+        history = MagicMock()
+        sent = set(notified)
+        history.has_been_notified.side_effect = lambda identifier: identifier in sent
+        history.add_history.side_effect = sent.add
+        return history
+
+    def test_send_notificaiton_inline(self):
+        history = self.get_history()
+        svc = NotificationSvc(history)
+        agent = MagicMock()
+        svc.register_agent(agent)
+        svc.send_notificaiton('msg', 'id')
+        agent.send.assert_called_once_with('msg')
+        history.add_history.assert_called_once_with('id')
+
+    def test_send_notificaiton_counts_outcomes(self):
+        before = {result: metrics.notifications.get(result) for result in ('sent', 'failed', 'duplicate')}
+        svc = NotificationSvc(self.get_history())
+        agent = MagicMock()
+        svc.register_agent(agent)
+        svc.send_notificaiton('msg', 'id')
+        svc.send_notificaiton('msg', 'id')
+        agent.send.side_effect = ValueError()
+        svc.send_notificaiton('msg', 'other')
+        self.assertEqual(
+            {'sent': 1, 'failed': 1, 'duplicate': 1},
+            {result: metrics.notifications.get(result) - count for result, count in before.items()}
+        )
+
+    def test_send_notificaiton_already_notified(self):
+        svc = NotificationSvc(self.get_history(['id']))
+        agent = MagicMock()
+        svc.register_agent(agent)
+        svc.send_notificaiton('msg', 'id')
+        agent.send.assert_not_called()
+
+    def test_send_notificaiton_dispatched_history_after_delivery(self):
+        history = self.get_history()
+        dispatcher = MagicMock()
+        svc = NotificationSvc(history, dispatcher=dispatcher)
+        svc.register_agent(MagicMock())
+        svc.send_notificaiton('msg', 'id')
+        history.add_history.assert_not_called()
+        on_done = dispatcher.submit.call_args[0][3]
+        on_done(['id'], True)
+        history.add_history.assert_called_once_with('id')
+
+    def test_send_notificaiton_dispatched_history_batched(self):
+        history = self.get_history()
+        dispatcher = MagicMock()
+        svc = NotificationSvc(history, dispatcher=dispatcher)
+        svc.register_agent(MagicMock())
+        svc.send_notificaiton('msg', 'a')
+        svc.send_notificaiton('msg', 'b')
+        dispatcher.submit.call_args[0][3](['a', 'b'], True)
+        history.batch.assert_called_once_with()
+        self.assertEqual(2, history.add_history.call_count)
+
+    def test_send_notificaiton_dispatched_failure_calls_on_failed(self):
+        dispatcher = MagicMock()
+        svc = NotificationSvc(self.get_history(), dispatcher=dispatcher)
+        svc.register_agent(MagicMock())
+        on_failed = MagicMock()
+        svc.send_notificaiton('msg', 'id', on_failed=on_failed)
+        dispatcher.submit.call_args[0][3](['id'], False)
+        on_failed.assert_called_once_with()
+
+    def test_send_notificaiton_dispatched_delivered_skips_on_failed(self):
+        dispatcher = MagicMock()
+        svc = NotificationSvc(self.get_history(), dispatcher=dispatcher)
+        svc.register_agent(MagicMock())
+        on_failed = MagicMock()
+        svc.send_notificaiton('msg', 'id', on_failed=on_failed)
+        dispatcher.submit.call_args[0][3](['id'], True)
+        on_failed.assert_not_called()
+
+    def test_send_notificaiton_inline_failure_calls_on_failed(self):
+        svc = NotificationSvc(self.get_history())
+        agent = MagicMock()
+        agent.send.side_effect = ValueError()
+        svc.register_agent(agent)
+        on_failed = MagicMock()
+        svc.send_notificaiton('msg', 'id', on_failed=on_failed)
+        on_failed.assert_called_once_with()
+
+    def test_send_notificaiton_dispatched_not_queued_twice(self):
+        dispatcher = MagicMock()
+        svc = NotificationSvc(self.get_history(), dispatcher=dispatcher)
+        svc.register_agent(MagicMock())
+        svc.send_notificaiton('msg', 'id')
+        svc.send_notificaiton('msg', 'id')
+        self.assertEqual(1, dispatcher.submit.call_count)
+
+    def test_send_notificaiton_dispatched_failure_can_retry(self):
+        history = self.get_history()
+        dispatcher = MagicMock()
+        svc = NotificationSvc(history, dispatcher=dispatcher)
+        svc.register_agent(MagicMock())
+        svc.send_notificaiton('msg', 'id')
+        dispatcher.submit.call_args[0][3](['id'], False)
+        svc.send_notificaiton('msg', 'id')
+        history.add_history.assert_not_called()
+        self.assertEqual(2, dispatcher.submit.call_count)
+
+    def test_send_notificaiton_with_dispatcher_end_to_end(self):
+        history = self.get_history()
+        dispatcher = NotificationDispatcher(batch_window=0)
+        svc = NotificationSvc(history, dispatcher=dispatcher)
+        agent = MagicMock()
+        svc.register_agent(agent)
+        svc.send_notificaiton('msg', 'id')
+        dispatcher.shutdown()
+        agent.send_batch.assert_called_once_with(['msg'])
+        history.add_history.assert_called_once_with('id')
+
+    def test_send_notificaiton_alias_already_notified(self):
+        svc = NotificationSvc(self.get_history(['https://example.com']))
+        agent = MagicMock()
+        svc.register_agent(agent)
+        svc.send_notificaiton('msg', 'newegg:123', aliases=['https://example.com'])
+        agent.send.assert_not_called()
+
+    def test_send_notificaiton_only_given_agents(self):
+        svc = NotificationSvc(self.get_history())
+        agents = [svc.register_agent(MagicMock()), svc.register_agent(MagicMock())]
+        svc.send_notificaiton('msg', 'id', agents=agents[1:])
+        agents[0].send.assert_not_called()
+        agents[1].send.assert_called_once_with('msg')
+
+    def test_send_notificaiton_shared_across_agents_sent_once(self):
+        svc = NotificationSvc(self.get_history())
+        agents = [svc.register_agent(MagicMock()), svc.register_agent(MagicMock())]
+        svc.send_notificaiton('msg', 'id', agents=agents[:1])
+        svc.send_notificaiton('msg', 'id', agents=agents[1:])
+        agents[1].send.assert_not_called()
+
+    def test_register_agent_same_key_reused(self):
+        svc = NotificationSvc(self.get_history())
+        first = DiscordAgent('https://example.com/webhook', 'discord')
+        second = DiscordAgent('https://example.com/webhook', 'discord')
+        self.assertIs(first, svc.register_agent(first))
+        self.assertIs(first, svc.register_agent(second))
+        self.assertEqual([first], svc.notificaiton_agents)
+
+    def test_register_agent_different_webhooks(self):
+        svc = NotificationSvc(self.get_history())
+        svc.register_agent(DiscordAgent('https://example.com/one', 'discord'))
+        svc.register_agent(DiscordAgent('https://example.com/two', 'discord'))
+        self.assertEqual(2, len(svc.notificaiton_agents))
+
+    def test_clear_notification_removes_identifier_and_aliases(self):
+        history = self.get_history(['newegg:1', 'https://example.com'])
+        svc = NotificationSvc(history)
+        svc.clear_notification('newegg:1', aliases=['https://example.com', 'https://other.com'])
+        self.assertEqual(
+            ['newegg:1', 'https://example.com'],
+            [c[0][0] for c in history.remove_history.call_args_list]
+        )
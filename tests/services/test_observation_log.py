@@ -0,0 +1,116 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.services.observation_log import ObservationLog
+
+
+def product(in_stock=True, price='$100.00', url='https://example.com/1', sku='123'):
+    return ProductInfo(title='Widget', url=url, in_stock=in_stock, price=price, sku=sku)
+
+
+class TestObservationLog(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'observations.log')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_record_buffered_until_flush(self):
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product()], now=10)
+        self.assertEqual(0, len(observation_log.read()))
+        observation_log.flush()
+        self.assertEqual(1, len(observation_log.read()))
+
+    def test_record_flushes_at_flush_size(self):
+        observation_log = ObservationLog(self.path, flush_size=2)
+        observation_log.record([product(), product(url='https://example.com/2')], now=10)
+        self.assertEqual(2, len(observation_log.read()))
+
+    def test_record_flushes_after_flush_interval(self):
+        observation_log = ObservationLog(self.path, flush_interval=0)
+        observation_log.record([product()], now=10)
+        self.assertEqual(1, len(observation_log.read()))
+
+    def test_read_columns(self):
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product(), product(url='https://example.com/2', in_stock=False, price=None, sku=None)],
+                               now=10)
+        observation_log.flush()
+        observations = observation_log.read()
+        self.assertEqual([10, 10], list(observations.timestamps))
+        self.assertEqual([1, 0], list(observations.in_stock))
+        self.assertEqual('https://example.com/2', observations.strings[observations.url_ids[1]])
+        self.assertEqual('123', observations.strings[observations.sku_ids[0]])
+        self.assertEqual('', observations.strings[observations.sku_ids[1]])
+
+    def test_get_url_history(self):
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product(price='$1,299.99')], now=10)
+        observation_log.record([product(in_stock=False, price=None), product(url='https://example.com/2')], now=20)
+        observation_log.flush()
+        self.assertEqual(
+            [(10, True, 1299.99), (20, False, None)],
+            observation_log.read().get_url_history('https://example.com/1')
+        )
+
+    def test_get_url_history_unknown_url(self):
+        self.assertEqual([], ObservationLog(self.path).read().get_url_history('https://example.com/1'))
+
+    def test_reopen_appends_and_reuses_strings(self):
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product()], now=10)
+        observation_log.flush()
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product(), product(url='https://example.com/2')], now=20)
+        observation_log.flush()
+        observations = observation_log.read()
+        self.assertEqual(['', 'https://example.com/1', '123', 'https://example.com/2'], observations.strings)
+        self.assertEqual([(10, True, 100.0), (20, True, 100.0)],
+                         observations.get_url_history('https://example.com/1'))
+
+    def test_reopen_reads_only_strings(self):
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product(), product(url='https://example.com/2', sku=None)], now=10)
+        observation_log.flush()
+        with patch('stockstalker.services.observation_log.zlib.decompress') as decompress:
+            observation_log = ObservationLog(self.path)
+        decompress.assert_not_called()
+        self.assertEqual(['', 'https://example.com/1', '123', 'https://example.com/2'], observation_log.strings)
+
+    def test_read_ignores_partial_segment(self):
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product()], now=10)
+        observation_log.flush()
+        with open(self.path, 'ab') as f:
+            f.write(b'SS')
+        self.assertEqual(1, len(observation_log.read()))
+
+    def test_reopen_truncates_torn_segment(self):
+        observation_log = ObservationLog(self.path)
+        observation_log.record([product()], now=10)
+        observation_log.flush()
+        complete_size = os.path.getsize(self.path)
+        observation_log.record([product(url='https://example.com/2')], now=20)
+        observation_log.flush()
+        os.truncate(self.path, os.path.getsize(self.path) - 30)
+        self.assertEqual(1, len(observation_log.read()))
+        observation_log = ObservationLog(self.path)
+        self.assertEqual(complete_size, os.path.getsize(self.path))
+        self.assertEqual(['', 'https://example.com/1', '123'], observation_log.strings)
+        observation_log.record([product(url='https://example.com/3')], now=30)
+        observation_log.flush()
+        observations = observation_log.read()
+        self.assertEqual(2, len(observations))
+        self.assertEqual([(30, True, 100.0)], observations.get_url_history('https://example.com/3'))
+
+    def test_read_rejects_other_files(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not an observation log')
+        with self.assertRaises(ValueError):
+            ObservationLog(self.path)
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from stockstalker.services.page_cache import PageCache
+
+
+class TestPageCache(TestCase):
+
+    def test_get_validator_headers_unknown_url(self):
+        self.assertEqual({}, PageCache().get_validator_headers('https://example.com'))
+
+    def test_get_validator_headers_no_result_yet(self):
+        cache = PageCache()
+        cache.set_validators('https://example.com', etag='"abc"')
+        self.assertEqual({}, cache.get_validator_headers('https://example.com'))
+
+    def test_get_validator_headers_with_result(self):
+        cache = PageCache()
+        cache.set_validators('https://example.com', etag='"abc"', last_modified='Wed, 21 Oct 2020 07:28:00 GMT')
+        cache.set_result('https://example.com', [])
+        self.assertEqual(
+            {'If-None-Match': '"abc"', 'If-Modified-Since': 'Wed, 21 Oct 2020 07:28:00 GMT'},
+            cache.get_validator_headers('https://example.com')
+        )
+
+    def test_set_validators_not_used_until_result_stored(self):
+        cache = PageCache()
+        cache.set_validators('https://example.com', etag='"abc"')
+        cache.set_result('https://example.com', ['old'])
+        cache.set_validators('https://example.com', etag='"def"')
+        self.assertEqual({'If-None-Match': '"abc"'}, cache.get_validator_headers('https://example.com'))
+        cache.set_result('https://example.com', ['new'])
+        self.assertEqual({'If-None-Match': '"def"'}, cache.get_validator_headers('https://example.com'))
+
+    def test_set_result_none_still_counts(self):
+        cache = PageCache()
+        cache.set_result('https://example.com', None)
+        self.assertTrue(cache.has_result('https://example.com'))
+
+    def test_matches_digest(self):
+        cache = PageCache()
+        digest = cache.get_digest('<html></html>')
+        cache.set_result('https://example.com', [], digest=digest)
+        self.assertTrue(cache.matches_digest('https://example.com', digest))
+        self.assertFalse(cache.matches_digest('https://example.com', cache.get_digest('<html> </html>')))
+
+    def test_matches_digest_unknown_url(self):
+        cache = PageCache()
+        self.assertFalse(cache.matches_digest('https://example.com', cache.get_digest('<html></html>')))
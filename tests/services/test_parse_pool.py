@@ -0,0 +1,80 @@
+import os
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from stockstalker.common import metrics
+from stockstalker.parsers.newegg_parser import NeweggParser
+from stockstalker.services.parse_pool import ParsePool, parse_page_source
+from stockstalker.util.constants import SEARCH_PAGE, PRODUCT_PAGE
+
+EXAMPLE_PAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'example_pages')
+
+
+def read_example_page(name):
+    with open(os.path.join(EXAMPLE_PAGE_DIR, name), 'r') as f:
+        return f.read()
+
+
+class TestParsePool(TestCase):
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.pool = ParsePool(processes=2)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.pool.shutdown()
+
+    def test_parse_search_page_matches_in_process(self):
+        parser = NeweggParser(MagicMock(), 'newegg')
+        page_source = read_example_page('newegg_search_page.html')
+        self.assertEqual(
+            parser.parse_search_page_source(page_source),
+            self.pool.parse(parser.get_parse_spec(), SEARCH_PAGE, page_source)
+        )
+
+    def test_parse_product_page_matches_in_process(self):
+        parser = NeweggParser(MagicMock(), 'newegg')
+        page_source = read_example_page('newegg_product_instock.html')
+        result = self.pool.parse(parser.get_parse_spec(), PRODUCT_PAGE, page_source, 'https://newegg.com/p/1')
+        self.assertEqual(parser.parse_product_page_source(page_source, 'https://newegg.com/p/1'), result)
+        self.assertEqual('https://newegg.com/p/1', result.url)
+
+    def test_parse_keeps_ignore_lists(self):
+        parser = NeweggParser(MagicMock(), 'newegg', ignore_urls=['https://newegg.com/p/1'])
+        page_source = read_example_page('newegg_product_instock.html')
+        self.assertIsNone(self.pool.parse(parser.get_parse_spec(), PRODUCT_PAGE, page_source, 'https://newegg.com/p/1'))
+
+    def test_parse_records_worker_timings(self):
+        parser = NeweggParser(MagicMock(), 'newegg-timings')
+        page_source = read_example_page('newegg_search_page.html')
+        self.pool.parse(parser.get_parse_spec(), SEARCH_PAGE, page_source)
+        self.assertEqual(1, metrics.build_page_seconds.get_count('newegg-timings'))
+
+    def test_get_parse_spec_cached_until_ignore_lists_change(self):
+        parser = NeweggParser(MagicMock(), 'newegg')
+        spec = parser.get_parse_spec()
+        self.assertIs(spec, parser.get_parse_spec())
+        parser.ignore_urls = ['https://newegg.com/p/1']
+        self.assertEqual(('https://newegg.com/p/1',), parser.get_parse_spec().ignore_urls)
+        parser.ignore_title_keywords = ['combo']
+        self.assertEqual(('combo',), parser.get_parse_spec().ignore_title_keywords)
+
+    def test_check_product_page_parses_in_pool(self):
+        parser = NeweggParser(MagicMock(), 'newegg', parse_pool=self.pool)
+        page_source = read_example_page('newegg_product_instock.html')
+        with patch.object(parser, '_load_page', return_value=page_source), \
+                patch.object(parser, 'parse_product_page_source') as in_process:
+            result = parser.check_product_page('https://newegg.com/p/1')
+        in_process.assert_not_called()
+        self.assertTrue(result.in_stock)
+
+    def test_parse_page_source_unknown_page_type(self):
+        spec = NeweggParser(MagicMock(), 'newegg').get_parse_spec()
+        self.assertRaises(ValueError, parse_page_source, spec, 'bad', '<html></html>')
+
+    def test_parse_page_source_returns_observations(self):
+        spec = NeweggParser(MagicMock(), 'newegg').get_parse_spec()
+        result, observations = parse_page_source(spec, SEARCH_PAGE, read_example_page('newegg_search_page.html'))
+        self.assertTrue(result)
+        self.assertIn('stockstalker_build_page_seconds', [name for name, _, _ in observations])
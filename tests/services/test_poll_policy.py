@@ -0,0 +1,72 @@
+from unittest import TestCase
+
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.services.poll_policy import AdaptivePollPolicy
+
+HOUR = 3600
+DAY = 86400
+
+
+class TestAdaptivePollPolicy(TestCase):
+
+    def get_policy(self):
+        return AdaptivePollPolicy(min_interval=15, max_interval=HOUR, backoff=2, hot_period=HOUR, quiet_period=DAY)
+
+    def test_next_interval_first_check_uses_base(self):
+        self.assertEqual(60, self.get_policy().next_interval('url', 60, 'a', now=0))
+
+    def test_next_interval_unchanged_after_first_check_uses_base(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 60, 'a', now=0)
+        self.assertEqual(60, policy.next_interval('url', 60, 'a', now=60))
+
+    def test_next_interval_change_polls_fast(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 60, 'a', now=0)
+        self.assertEqual(15, policy.next_interval('url', 60, 'b', now=100))
+
+    def test_next_interval_stays_fast_while_hot(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 60, 'a', now=0)
+        policy.next_interval('url', 60, 'b', now=100)
+        self.assertEqual(15, policy.next_interval('url', 60, 'b', now=100 + HOUR - 1))
+
+    def test_next_interval_back_to_base_after_hot(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 60, 'a', now=0)
+        policy.next_interval('url', 60, 'b', now=100)
+        self.assertEqual(60, policy.next_interval('url', 60, 'b', now=100 + HOUR))
+
+    def test_next_interval_backs_off_when_quiet(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 60, 'a', now=0)
+        self.assertEqual(120, policy.next_interval('url', 60, 'a', now=DAY))
+        self.assertEqual(240, policy.next_interval('url', 60, 'a', now=DAY + 120))
+        self.assertEqual(480, policy.next_interval('url', 60, 'a', now=DAY + 360))
+
+    def test_next_interval_backoff_capped(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 60, 'a', now=0)
+        intervals = [policy.next_interval('url', 60, 'a', now=DAY + i) for i in range(20)]
+        self.assertEqual(HOUR, intervals[-1])
+
+    def test_next_interval_base_above_max_not_shrunk(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 2 * HOUR, 'a', now=0)
+        self.assertEqual(2 * HOUR, policy.next_interval('url', 2 * HOUR, 'a', now=DAY))
+
+    def test_next_interval_change_after_backoff_resets(self):
+        policy = self.get_policy()
+        policy.next_interval('url', 60, 'a', now=0)
+        policy.next_interval('url', 60, 'a', now=DAY)
+        self.assertEqual(15, policy.next_interval('url', 60, 'b', now=DAY + 120))
+
+    def test_get_signature_stock_change(self):
+        in_stock = [ProductInfo(title='a', url='https://example.com', in_stock=True, price='$1')]
+        out_of_stock = [ProductInfo(title='a', url='https://example.com', in_stock=False, price='$1')]
+        self.assertNotEqual(AdaptivePollPolicy.get_signature(in_stock), AdaptivePollPolicy.get_signature(out_of_stock))
+
+    def test_get_signature_order_independent(self):
+        a = ProductInfo(title='a', url='https://example.com/a', in_stock=True)
+        b = ProductInfo(title='b', url='https://example.com/b', in_stock=False)
+        self.assertEqual(AdaptivePollPolicy.get_signature([a, b]), AdaptivePollPolicy.get_signature([b, a]))
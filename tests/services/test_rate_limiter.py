@@ -0,0 +1,152 @@
+from unittest import TestCase, mock
+
+from stockstalker.services.rate_limiter import HostRateLimiter
+
+
+class FakeTime:
+    """
+    Clock that only moves when slept on
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept += seconds
+        self.now += seconds
+
+
+class TestHostRateLimiter(TestCase):
+
+    def setUp(self) -> None:
+        self.clock = FakeTime()
+        patcher = mock.patch('stockstalker.services.rate_limiter.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_acquire_burst_does_not_wait(self):
+        limiter = HostRateLimiter(rate=1, burst=3)
+        for _ in range(3):
+            self.assertTrue(limiter.acquire('example.com'))
+        self.assertEqual(0, self.clock.slept)
+
+    def test_acquire_waits_for_token_after_burst(self):
+        limiter = HostRateLimiter(rate=2, burst=1)
+        limiter.acquire('example.com')
+        limiter.acquire('example.com')
+        self.assertAlmostEqual(0.5, self.clock.slept)
+
+    def test_acquire_hosts_limited_separately(self):
+        limiter = HostRateLimiter(rate=1, burst=1)
+        limiter.acquire('a.com')
+        limiter.acquire('b.com')
+        self.assertEqual(0, self.clock.slept)
+
+    def test_acquire_host_rate_override(self):
+        limiter = HostRateLimiter(rate=1, burst=1, host_rates={'slow.com': 0.25})
+        limiter.acquire('slow.com')
+        limiter.acquire('slow.com')
+        self.assertAlmostEqual(4, self.clock.slept)
+
+    def test_on_response_429_halves_rate(self):
+        limiter = HostRateLimiter(rate=2, burst=1)
+        limiter.on_response('example.com', 429)
+        self.assertEqual(1, limiter.hosts['example.com'].rate)
+
+    def test_on_response_rate_not_below_min(self):
+        limiter = HostRateLimiter(rate=1, burst=1, min_rate=0.5, failure_threshold=10)
+        for _ in range(5):
+            limiter.on_response('example.com', 503)
+        self.assertEqual(0.5, limiter.hosts['example.com'].rate)
+
+    def test_on_response_success_recovers_rate(self):
+        limiter = HostRateLimiter(rate=2, burst=1)
+        limiter.on_response('example.com', 429)
+        for _ in range(20):
+            limiter.on_response('example.com', 200)
+        self.assertEqual(2, limiter.hosts['example.com'].rate)
+
+    def test_on_response_retry_after_seconds(self):
+        limiter = HostRateLimiter(rate=10, burst=5, max_wait=60)
+        limiter.on_response('example.com', 429, retry_after='30')
+        limiter.acquire('example.com')
+        self.assertAlmostEqual(30, self.clock.slept)
+
+    def test_on_response_retry_after_date(self):
+        self.clock.now = 1602979200.0  # Sun, 18 Oct 2020 00:00:00 GMT
+        limiter = HostRateLimiter(rate=10, burst=5, max_wait=120)
+        limiter.on_response('example.com', 503, retry_after='Sun, 18 Oct 2020 00:01:00 GMT')
+        limiter.acquire('example.com')
+        self.assertAlmostEqual(60, self.clock.slept)
+
+    def test_acquire_retry_after_longer_than_max_wait_fails_fast(self):
+        limiter = HostRateLimiter(rate=10, burst=5, max_wait=10)
+        limiter.on_response('example.com', 429, retry_after='30')
+        self.assertFalse(limiter.acquire('example.com'))
+        self.assertEqual(0, self.clock.slept)
+        self.assertFalse(limiter.is_open('example.com'))
+        self.clock.now += 30
+        self.assertTrue(limiter.acquire('example.com'))
+
+    def test_on_response_bad_retry_after_uses_rate(self):
+        limiter = HostRateLimiter(rate=2, burst=5)
+        limiter.on_response('example.com', 429, retry_after='soon')
+        limiter.acquire('example.com')
+        self.assertAlmostEqual(1, self.clock.slept)
+
+    def test_circuit_opens_after_failures(self):
+        limiter = HostRateLimiter(failure_threshold=3, cooldown=60)
+        for _ in range(3):
+            limiter.on_failure('example.com')
+        self.assertTrue(limiter.is_open('example.com'))
+        self.assertFalse(limiter.acquire('example.com'))
+        self.assertTrue(limiter.acquire('other.com'))
+
+    def test_circuit_success_resets_failures(self):
+        limiter = HostRateLimiter(failure_threshold=3)
+        limiter.on_failure('example.com')
+        limiter.on_failure('example.com')
+        limiter.on_response('example.com', 200)
+        limiter.on_failure('example.com')
+        self.assertFalse(limiter.is_open('example.com'))
+
+    def test_circuit_client_errors_not_failures(self):
+        limiter = HostRateLimiter(failure_threshold=1)
+        limiter.on_response('example.com', 404)
+        self.assertFalse(limiter.is_open('example.com'))
+
+    def test_circuit_allows_trial_after_cooldown(self):
+        limiter = HostRateLimiter(failure_threshold=3, cooldown=60)
+        for _ in range(3):
+            limiter.on_failure('example.com')
+        self.clock.now += 60
+        self.assertTrue(limiter.acquire('example.com'))
+        limiter.on_failure('example.com')
+        self.assertTrue(limiter.is_open('example.com'))
+
+    def test_circuit_allows_single_trial_after_cooldown(self):
+        limiter = HostRateLimiter(failure_threshold=3, cooldown=60)
+        for _ in range(3):
+            limiter.on_failure('example.com')
+        self.clock.now += 60
+        self.assertTrue(limiter.acquire('example.com'))
+        self.assertFalse(limiter.acquire('example.com'))
+        limiter.on_response('example.com', 200)
+        self.assertTrue(limiter.acquire('example.com'))
+        self.assertTrue(limiter.acquire('example.com'))
+
+    def test_circuit_new_trial_if_trial_never_reports(self):
+        limiter = HostRateLimiter(failure_threshold=3, cooldown=60)
+        for _ in range(3):
+            limiter.on_failure('example.com')
+        self.clock.now += 60
+        self.assertTrue(limiter.acquire('example.com'))
+        self.clock.now += 60
+        self.assertTrue(limiter.acquire('example.com'))
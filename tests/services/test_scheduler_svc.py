@@ -0,0 +1,114 @@
+import threading
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from stockstalker.parsers.parser_base import ParserBase
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.services.fetch_engine import FetchEngine
+from stockstalker.services.poll_policy import AdaptivePollPolicy
+from stockstalker.services.scheduler_svc import StockScheduler
+from stockstalker.util.constants import SEARCH_PAGE, PRODUCT_PAGE
+
+
+class TestStockScheduler(TestCase):
+
+    def get_parser(self):
+        return ParserBase(
+            MagicMock(),
+            'newegg',
+            search_pages=['https://newegg.com/search'],
+            product_pages=['https://newegg.com/hot', 'https://newegg.com/cold'],
+            search_page_interval=600,
+            product_page_interval=60,
+            poll_intervals={'https://newegg.com/hot': 15}
+        )
+
+    def test_add_parser_job_per_url(self):
+        scheduler = StockScheduler(FetchEngine(), blocking=False)
+        scheduler.add_parser(self.get_parser())
+        intervals = {job.args[1]: job.trigger.interval.total_seconds() for job in scheduler.scheduler.get_jobs()}
+        self.assertEqual(
+            {'https://newegg.com/search': 600, 'https://newegg.com/hot': 15, 'https://newegg.com/cold': 60},
+            intervals
+        )
+
+    def test_add_parser_jobs_jittered_and_not_overlapping(self):
+        scheduler = StockScheduler(FetchEngine(), jitter=0.2, blocking=False)
+        scheduler.add_parser(self.get_parser())
+        for job in scheduler.scheduler.get_jobs():
+            self.assertEqual(job.trigger.interval.total_seconds() * 0.2, job.trigger.jitter)
+            self.assertEqual(1, job.max_instances)
+            self.assertTrue(job.coalesce)
+
+    def test_check_url_notifies_results(self):
+        engine = FetchEngine()
+        engine.check_url = MagicMock(return_value=['result'])
+        parser = self.get_parser()
+        parser.notify_in_stock = MagicMock()
+        StockScheduler(engine, blocking=False).check_url(parser, 'https://newegg.com/hot', PRODUCT_PAGE)
+        engine.check_url.assert_called_once_with(parser, 'https://newegg.com/hot', PRODUCT_PAGE)
+        parser.notify_in_stock.assert_called_once_with(['result'])
+
+    def test_check_url_skips_url_already_running(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_check(*args):
+            started.set()
+            release.wait(5)
+            return []
+
+        engine = FetchEngine()
+        engine.check_url = MagicMock(side_effect=slow_check)
+        parser = self.get_parser()
+        scheduler = StockScheduler(engine, blocking=False)
+        thread = threading.Thread(target=scheduler.check_url, args=(parser, 'https://newegg.com/search', SEARCH_PAGE))
+        thread.start()
+        started.wait(5)
+        scheduler.check_url(parser, 'https://newegg.com/search', SEARCH_PAGE)
+        release.set()
+        thread.join(5)
+        self.assertEqual(1, engine.check_url.call_count)
+        self.assertEqual(set(), scheduler._running_urls)
+
+    def test_check_url_adaptive_reschedules_on_change(self):
+        engine = FetchEngine()
+        engine.check_url = MagicMock(side_effect=[
+            [ProductInfo(title='a', url='https://newegg.com/cold', in_stock=False)],
+            [ProductInfo(title='a', url='https://newegg.com/cold', in_stock=True)],
+        ])
+        parser = self.get_parser()
+        parser.notify_in_stock = MagicMock()
+        scheduler = StockScheduler(engine, blocking=False, poll_policy=AdaptivePollPolicy(min_interval=15))
+        scheduler.add_parser(parser)
+        job_id = scheduler._get_job_id(parser, 'https://newegg.com/cold', PRODUCT_PAGE)
+        scheduler.check_url(parser, 'https://newegg.com/cold', PRODUCT_PAGE)
+        self.assertEqual(60, scheduler.scheduler.get_job(job_id).trigger.interval.total_seconds())
+        scheduler.check_url(parser, 'https://newegg.com/cold', PRODUCT_PAGE)
+        self.assertEqual(15, scheduler.scheduler.get_job(job_id).trigger.interval.total_seconds())
+
+    def test_check_url_adaptive_ignores_failed_check(self):
+        engine = FetchEngine()
+        result = ProductInfo(title='a', url='https://newegg.com/cold', in_stock=False)
+        engine.check_url = MagicMock(side_effect=[[result], [], [result]])
+        parser = self.get_parser()
+        parser.notify_in_stock = MagicMock()
+        scheduler = StockScheduler(engine, blocking=False, poll_policy=AdaptivePollPolicy(min_interval=15))
+        scheduler.add_parser(parser)
+        job_id = scheduler._get_job_id(parser, 'https://newegg.com/cold', PRODUCT_PAGE)
+        for _ in range(3):
+            scheduler.check_url(parser, 'https://newegg.com/cold', PRODUCT_PAGE)
+            self.assertEqual(60, scheduler.scheduler.get_job(job_id).trigger.interval.total_seconds())
+
+    def test_check_url_adaptive_ignores_page_body_change(self):
+        engine = FetchEngine()
+        engine.check_url = MagicMock(return_value=[ProductInfo(title='a', url='https://newegg.com/cold', in_stock=True)])
+        parser = self.get_parser()
+        parser.notify_in_stock = MagicMock()
+        scheduler = StockScheduler(engine, blocking=False, poll_policy=AdaptivePollPolicy(min_interval=15))
+        scheduler.add_parser(parser)
+        job_id = scheduler._get_job_id(parser, 'https://newegg.com/cold', PRODUCT_PAGE)
+        for nonce in ('<html>1</html>', '<html>2</html>'):
+            parser.page_cache.set_result('https://newegg.com/cold', [], digest=parser.page_cache.get_digest(nonce))
+            scheduler.check_url(parser, 'https://newegg.com/cold', PRODUCT_PAGE)
+            self.assertEqual(60, scheduler.scheduler.get_job(job_id).trigger.interval.total_seconds())
@@ -0,0 +1,106 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from stockstalker.models.product_info import ProductInfo
+from stockstalker.services.stock_state_store import StockStateStore
+from stockstalker.util.constants import RESTOCK, PRICE_DROP, SOLD_OUT
+
+
+def product(in_stock=True, price='$100.00', url='https://example.com/1'):
+    return ProductInfo(title='Widget', url=url, in_stock=in_stock, price=price)
+
+
+class TestStockStateStore(TestCase):
+
+    def get_kinds(self, store, products, now=0):
+        return [change.kind for change in store.update(products, now=now)]
+
+    def test_update_first_seen_in_stock_restock(self):
+        self.assertEqual([RESTOCK], self.get_kinds(StockStateStore(), [product()]))
+
+    def test_update_first_seen_out_of_stock_no_change(self):
+        self.assertEqual([], self.get_kinds(StockStateStore(), [product(in_stock=False)]))
+
+    def test_update_still_in_stock_no_change(self):
+        store = StockStateStore()
+        store.update([product()])
+        self.assertEqual([], self.get_kinds(store, [product()]))
+
+    def test_update_sold_out_then_restock(self):
+        store = StockStateStore()
+        store.update([product()])
+        self.assertEqual([SOLD_OUT], self.get_kinds(store, [product(in_stock=False)]))
+        self.assertEqual([RESTOCK], self.get_kinds(store, [product()]))
+
+    def test_update_price_drop_past_threshold(self):
+        store = StockStateStore(price_drop_threshold=0.1)
+        store.update([product(price='$100.00')])
+        self.assertEqual([], self.get_kinds(store, [product(price='$95.00')]))
+        self.assertEqual([PRICE_DROP], self.get_kinds(store, [product(price='$90.00')]))
+
+    def test_update_price_drop_measured_from_last_alert(self):
+        store = StockStateStore(price_drop_threshold=0.1)
+        store.update([product(price='$100.00')])
+        for price in ('$97.00', '$94.00', '$91.00'):
+            store.update([product(price=price)])
+        self.assertEqual([PRICE_DROP], self.get_kinds(store, [product(price='$89.00')]))
+        self.assertEqual([], self.get_kinds(store, [product(price='$85.00')]))
+
+    def test_update_dropped_prices_reset_on_sold_out(self):
+        store = StockStateStore(price_drop_threshold=0.1)
+        store.update([product(price='$100.00')])
+        store.update([product(price='$80.00')])
+        self.assertEqual([80.0], store.get_state('https://example.com/1').dropped_prices)
+        change = store.update([product(in_stock=False)])[0]
+        self.assertEqual([80.0], change.previous.dropped_prices)
+        self.assertEqual([], store.get_state('https://example.com/1').dropped_prices)
+
+    def test_revert_restock_reported_again(self):
+        store = StockStateStore()
+        store.revert(store.update([product()])[0])
+        self.assertEqual([RESTOCK], self.get_kinds(store, [product()]))
+
+    def test_revert_price_drop_reported_again(self):
+        store = StockStateStore(price_drop_threshold=0.1)
+        store.update([product(price='$100.00')])
+        store.revert(store.update([product(price='$80.00')])[0])
+        self.assertEqual([], store.get_state('https://example.com/1').dropped_prices)
+        self.assertEqual([PRICE_DROP], self.get_kinds(store, [product(price='$80.00')]))
+
+    def test_update_price_rise_no_change(self):
+        store = StockStateStore()
+        store.update([product(price='$100.00')])
+        self.assertEqual([], self.get_kinds(store, [product(price='$150.00')]))
+
+    def test_update_only_changes_returned(self):
+        store = StockStateStore()
+        products = [product(url=f'https://example.com/{i}', in_stock=False) for i in range(2000)]
+        store.update(products)
+        for i in (5, 500, 1500):
+            products[i] = product(url=f'https://example.com/{i}')
+        changes = store.update(products)
+        self.assertEqual(['https://example.com/5', 'https://example.com/500', 'https://example.com/1500'],
+                         [change.product.url for change in changes])
+
+    def test_update_records_state(self):
+        store = StockStateStore()
+        store.update([product(price='$1,299.99')], now=42)
+        state = store.get_state('https://example.com/1')
+        self.assertEqual((True, 1299.99, 42), (state.in_stock, state.price, state.updated))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'state.json')
+            store = StockStateStore(path=path)
+            store.update([product()])
+            store.save()
+            self.assertEqual([], self.get_kinds(StockStateStore(path=path), [product()]))
+
+    def test_update_saves_after_save_interval(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'state.json')
+            StockStateStore(path=path, save_interval=3600).update([product()])
+            self.assertFalse(os.path.isfile(path))
+            StockStateStore(path=path, save_interval=0).update([product()])
+            self.assertEqual([], self.get_kinds(StockStateStore(path=path), [product()]))
@@ -0,0 +1,28 @@
+from unittest import TestCase
+
+from stockstalker.services.traffic_meter import TrafficMeter
+
+
+class TestTrafficMeter(TestCase):
+
+    def test_record_adds_up_per_host(self):
+        meter = TrafficMeter()
+        meter.record('www.newegg.com', 100, 500)
+        meter.record('www.newegg.com', 50, 200)
+        meter.record('www.bestbuy.com', 10, 10)
+        traffic = meter.get_hosts()['www.newegg.com']
+        self.assertEqual(2, traffic.requests)
+        self.assertEqual(150, traffic.wire_bytes)
+        self.assertEqual(700, traffic.decoded_bytes)
+        self.assertEqual(1, meter.get_hosts()['www.bestbuy.com'].requests)
+
+    def test_compression_ratio(self):
+        meter = TrafficMeter()
+        meter.record('www.newegg.com', 100, 500)
+        self.assertEqual(5, meter.get_hosts()['www.newegg.com'].compression_ratio)
+
+    def test_get_hosts_returns_copy(self):
+        meter = TrafficMeter()
+        meter.record('www.newegg.com', 100, 500)
+        meter.get_hosts()['www.newegg.com'].requests = 10
+        self.assertEqual(1, meter.get_hosts()['www.newegg.com'].requests)
@@ -2,7 +2,7 @@ import os
 from unittest import TestCase
 
 from stockstalker.common.exceptions import InvalidConfigDirectory
-from stockstalker.util.helpers import load_configs_from_dir
+from stockstalker.util.helpers import load_configs_from_dir, parse_price
 
 
 class TestHelpers(TestCase):
@@ -11,4 +11,19 @@ class TestHelpers(TestCase):
 
     def test_load_configs_from_dir_invalid_config_one_config(self):
         configs = load_configs_from_dir(os.path.dirname(__file__))
-        self.assertTrue(len(configs) == 1)
\ No newline at end of file
+        self.assertTrue(len(configs) == 1)
+
+    def test_parse_price_dollars(self):
+        self.assertEqual(699.99, parse_price('$699.99'))
+
+    def test_parse_price_thousands(self):
+        self.assertEqual(2199, parse_price('2,199'))
+
+    def test_parse_price_range_uses_first(self):
+        self.assertEqual(59.88, parse_price('$59.88 - $79.88'))
+
+    def test_parse_price_no_number(self):
+        self.assertIsNone(parse_price('See price in cart'))
+
+    def test_parse_price_none(self):
+        self.assertIsNone(parse_price(None))
@@ -0,0 +1,64 @@
+from unittest import TestCase, mock
+
+import requests
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+from stockstalker.util.http_helpers import build_session, get_wire_bytes, Http2Session
+
+
+class TestHttpHelpers(TestCase):
+
+    def test_build_session_pool_size(self):
+        session = build_session(pool_size=25)
+        adapter = session.get_adapter('https://www.newegg.com')
+        self.assertEqual(25, adapter._pool_maxsize)
+        self.assertEqual(25, adapter._pool_connections)
+
+    def test_build_session_same_adapter_for_http_and_https(self):
+        session = build_session()
+        self.assertIs(session.get_adapter('http://walmart.com'), session.get_adapter('https://walmart.com'))
+
+    @mock.patch('stockstalker.util.http_helpers.httpx', None)
+    def test_build_session_http2_unavailable_falls_back(self):
+        self.assertIsInstance(build_session(http2=True), requests.Session)
+
+    def test_build_session_accepts_every_decodable_encoding(self):
+        self.assertEqual(ACCEPT_ENCODING, build_session().headers['Accept-Encoding'])
+
+    def test_get_wire_bytes_httpx_response(self):
+        response = mock.Mock(spec=['num_bytes_downloaded'], num_bytes_downloaded=123)
+        self.assertEqual(123, get_wire_bytes(response))
+
+    def test_get_wire_bytes_unknown_none(self):
+        self.assertIsNone(get_wire_bytes(mock.Mock(spec=['text'])))
+
+    def get_mock_httpx(self):
+        httpx = mock.MagicMock()
+        httpx.TimeoutException = type('TimeoutException', (Exception,), {})
+        httpx.TransportError = type('TransportError', (Exception,), {})
+        return httpx
+
+    def test_http2_session_get_forwards_request(self):
+        httpx = self.get_mock_httpx()
+        response = mock.Mock(status_code=304, headers={'ETag': '"abc"'}, text='')
+        httpx.Client.return_value.get.return_value = response
+        with mock.patch('stockstalker.util.http_helpers.httpx', httpx):
+            session = Http2Session(pool_size=5)
+            result = session.get('https://www.newegg.com', headers={'User-Agent': 'ua'}, cookies={'a': 'b'}, timeout=3)
+        httpx.Limits.assert_called_once_with(max_connections=5, max_keepalive_connections=5)
+        self.assertTrue(httpx.Client.call_args[1]['http2'])
+        httpx.Client.return_value.get.assert_called_once_with(
+            'https://www.newegg.com', headers={'User-Agent': 'ua'}, cookies={'a': 'b'}, timeout=3
+        )
+        self.assertEqual(304, result.status_code)
+        self.assertEqual('"abc"', result.headers['ETag'])
+
+    def test_http2_session_get_maps_errors(self):
+        httpx = self.get_mock_httpx()
+        with mock.patch('stockstalker.util.http_helpers.httpx', httpx):
+            session = Http2Session(pool_size=5)
+            httpx.Client.return_value.get.side_effect = httpx.TimeoutException('slow')
+            self.assertRaises(requests.exceptions.Timeout, session.get, 'https://www.newegg.com')
+            httpx.Client.return_value.get.side_effect = httpx.TransportError('reset')
+            self.assertRaises(requests.exceptions.ConnectionError, session.get, 'https://www.newegg.com')